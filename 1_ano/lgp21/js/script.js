@@ -18,6 +18,7 @@
     const zoomBtn = document.getElementById('zoom-btn');
     const modalImage = document.getElementById('modal-image');
     const zoomOverlay = document.getElementById('zoom-overlay');
+    const zoomImage = document.getElementById('zoom-image');
     const closeZoomBtn = document.getElementById('close-zoom-btn');
     const lyricsContainer = document.getElementById('lyrics');
     const container = document.getElementById('main-view');
@@ -234,7 +235,20 @@
         textoCompletoBtn.focus();
     }
 
+    // The full-resolution image is only named in data-srcset/data-src until the first zoom
+    function loadZoomImage() {
+        zoomOverlay.querySelectorAll('source[data-srcset]').forEach(function(source) {
+            source.srcset = source.dataset.srcset;
+            source.removeAttribute('data-srcset');
+        });
+        if (zoomImage.dataset.src) {
+            zoomImage.src = zoomImage.dataset.src;
+            zoomImage.removeAttribute('data-src');
+        }
+    }
+
     function openZoom() {
+        loadZoomImage();
         zoomOverlay.classList.add('active');
         document.body.style.overflow = 'hidden';
         closeZoomBtn.focus();
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Skip-if-unchanged, atomic file writes for everything the scripts generate.
+
+A file is only written when its new content differs from what is on disk,
+so unchanged outputs keep their mtime (and stay out of rsync/CDN deltas).
+When it is written, the content goes to a temporary file in the same
+folder which then replaces the target in one rename, so readers never see
+a half-written file. The permissions of the replaced file are kept.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+# ioctl(2) request that makes a file share the extents of another (Linux FICLONE)
+FICLONE = 0x40049409
+
+# Files actually modified by this process (for run summaries)
+_modified_count = 0
+
+
+def modified_count() -> int:
+    """Number of files this process has actually written so far."""
+    return _modified_count
+
+
+def _file_mode(path: Path) -> int:
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_bytes_if_changed(path, payload: bytes) -> bool:
+    """
+    Atomically replace a file with payload, unless it already holds exactly that.
+
+    Returns:
+        True if the file was written
+    """
+    global _modified_count
+    path = Path(path)
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == payload:
+                return False
+    except FileNotFoundError:
+        pass
+
+    mode = _file_mode(path)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    _modified_count += 1
+    return True
+
+
+def write_text_if_changed(path, content: str, encoding: str = 'utf-8') -> bool:
+    """
+    Text version of write_bytes_if_changed(), with the platform's newlines.
+
+    Returns:
+        True if the file was written
+    """
+    if os.linesep != '\n':
+        content = content.replace('\n', os.linesep)
+    return write_bytes_if_changed(path, content.encode(encoding))
+
+
+def copy_if_changed(src, dest) -> bool:
+    """
+    Copy a file to dest, unless dest already holds the same bytes.
+
+    Returns:
+        True if dest was written
+    """
+    with open(src, 'rb') as f:
+        return write_bytes_if_changed(dest, f.read())
+
+
+def _same_bytes(a: Path, b: Path) -> bool:
+    if os.path.getsize(a) != os.path.getsize(b):
+        return False
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        return fa.read() == fb.read()
+
+
+def link_if_changed(src, dest, reflink: bool = False) -> bool:
+    """
+    Make dest a hard link to src, or with reflink=True a copy-on-write clone.
+
+    A hard link is skipped when dest already is src; a clone when dest
+    already holds the same bytes. Where the filesystem cannot link or
+    clone (another device, no reflink support, Windows), the file is
+    copied with copy_if_changed() instead.
+
+    Returns:
+        True if dest was written
+    """
+    global _modified_count
+    src, dest = Path(src), Path(dest)
+    try:
+        if os.path.samefile(src, dest) or (reflink and _same_bytes(src, dest)):
+            return False
+    except FileNotFoundError:
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=str(dest.parent), prefix=f".{dest.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if reflink:
+                import fcntl
+                with open(src, 'rb') as source:
+                    fcntl.ioctl(f.fileno(), FICLONE, source.fileno())
+        if reflink:
+            os.chmod(tmp_path, os.stat(src).st_mode & 0o7777)
+        else:
+            os.unlink(tmp_path)
+            os.link(src, tmp_path)
+        os.replace(tmp_path, dest)
+    except (OSError, ImportError):
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        return copy_if_changed(src, dest)
+
+    _modified_count += 1
+    return True
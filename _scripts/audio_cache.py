@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Cache of decoded 16 kHz mono PCM audio, shared across runs and model sizes.
+
+Whisper decodes every mp3 with ffmpeg before inference. This module keeps
+the decoded float32 samples as .npy files in _cache/pcm, keyed by the
+SHA-256 of the source audio, and hands them back memory-mapped
+(copy-on-write), so repeated runs skip the decode and never copy the
+samples into memory.
+
+Usage:
+    python audio_cache.py <audio_file> [...]   # Decode and cache audio files
+    python audio_cache.py --stats              # Show cache size and entry count
+    python audio_cache.py --clear              # Remove every cached entry
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not installed.")
+    print("Install with: pip install numpy")
+    sys.exit(1)
+
+from transcription_cache import file_sha256, evict_lru, write_entry
+
+# Default cache location: <project_root>/_cache/pcm
+DEFAULT_PCM_CACHE_DIR = Path(__file__).parent.parent / "_cache" / "pcm"
+
+# Default size bound (bytes); one minute of audio is about 3.8 MB
+DEFAULT_PCM_MAX_BYTES = 1024 * 1024 * 1024
+
+# Whisper's input sample rate
+SAMPLE_RATE = 16000
+
+
+def decode_audio(audio_path: str) -> np.ndarray:
+    """Decode an audio file to 16 kHz mono float32 with ffmpeg (via Whisper)."""
+    from whisper.audio import load_audio
+
+    return load_audio(audio_path, sr=SAMPLE_RATE)
+
+
+class PcmCache:
+    """Size-bounded LRU cache of decoded audio, returned as memory maps."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_PCM_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Directory for cache entries (default: _cache/pcm)
+            max_bytes: Size bound for the whole cache directory
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_PCM_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, audio_path: str) -> Path:
+        return self.cache_dir / f"{file_sha256(audio_path)}_{SAMPLE_RATE}.npy"
+
+    def load(self, audio_path: str) -> np.ndarray:
+        """
+        Return the decoded samples of an audio file, decoding only on a miss.
+
+        The array is a copy-on-write memory map: it can be handed to torch
+        without copying, and nothing written to it reaches the cache file.
+        """
+        path = self._entry_path(audio_path)
+        if path.exists():
+            # Mark as recently used
+            os.utime(path, None)
+        else:
+            samples = decode_audio(audio_path)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            write_entry(self.cache_dir, path, lambda f: np.save(f, samples.astype(np.float32, copy=False)))
+            evict_lru(self.cache_dir, self.max_bytes, "*.npy")
+
+        return np.load(path, mmap_mode='c')
+
+    def size(self) -> int:
+        """Total size in bytes of the cache entries and pending temp files."""
+        if not self.cache_dir.exists():
+            return 0
+        return sum(p.stat().st_size for pattern in ("*.npy", "*.tmp") for p in self.cache_dir.glob(pattern))
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number of entries removed."""
+        if not self.cache_dir.exists():
+            return 0
+        return evict_lru(self.cache_dir, 0, "*.npy")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Decode audio into the PCM cache, or inspect/clear it"
+    )
+    parser.add_argument(
+        "audio_file",
+        nargs="*",
+        help="Audio files to decode into the cache"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=f"Cache directory (default: {DEFAULT_PCM_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Show cache size and entry count"
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Remove every cached entry"
+    )
+
+    args = parser.parse_args()
+    cache = PcmCache(args.cache_dir)
+
+    if args.clear:
+        removed = cache.clear()
+        print(f"Removed {removed} cache entries from {cache.cache_dir}")
+    elif args.stats:
+        entries = len(list(cache.cache_dir.glob("*.npy"))) if cache.cache_dir.exists() else 0
+        print(f"Cache directory: {cache.cache_dir}")
+        print(f"  Entries: {entries}")
+        print(f"  Size: {cache.size() / (1024 * 1024):.2f} MB")
+    elif args.audio_file:
+        for audio_file in args.audio_file:
+            samples = cache.load(audio_file)
+            print(f"{audio_file}: {len(samples) / SAMPLE_RATE:.2f}s")
+    else:
+        parser.print_help()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Speech-tuned, loudness-normalized mono encodes of the narration audio.
+
+Each narration mp3 is encoded with the local ffmpeg as Opus (WebM) and
+as an AAC fallback (MP4, moov atom first so playback can start before
+the download ends), both mono at a low bitrate and normalized to the
+same loudness with a two-pass linear loudnorm. Pages list them as
+<source> entries before the original mp3, so the browser fetches the
+smallest file it can play.
+
+The encodes must not move the words in time: nothing is trimmed, the
+encoder delay is signalled in the container (Opus pre-skip, MP4 edit
+list) and the duration of every encode is checked against the source,
+so the existing data-start/data-end values stay valid.
+
+Encodes are cached in _cache/audio by the SHA-256 of the source audio,
+the encoder settings and the ffmpeg version, so an unchanged mp3 is never
+encoded twice. ffmpeg is optional: without it, pages keep the plain mp3
+markup.
+
+Usage:
+    python audio_variants.py <audio_file> [...]   # Encode audio (or find it in the cache)
+    python audio_variants.py --all                # Every narration in _assets/audios
+    python audio_variants.py --clear              # Remove every cached encode
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from atomic_write import write_text_if_changed
+from transcription_cache import file_sha256
+
+# Default cache location: <project_root>/_cache/audio
+DEFAULT_AUDIO_CACHE_DIR = Path(__file__).parent.parent / "_cache" / "audio"
+
+# Loudness target (EBU R128 style): integrated LUFS, true peak dBTP, loudness range LU
+LOUDNESS = {'I': -16.0, 'TP': -1.5, 'LRA': 11.0}
+
+# Encodes, in the order the <source> elements are listed in: suffix, MIME type, ffmpeg arguments
+ENCODINGS = {
+    'opus': (".webm", 'audio/webm; codecs="opus"',
+             ["-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-ar", "48000"]),
+    'aac': (".m4a", 'audio/mp4; codecs="mp4a.40.2"',
+            ["-c:a", "aac", "-b:a", "48k", "-ar", "44100", "-movflags", "+faststart"]),
+}
+
+# Largest accepted difference (seconds) between the duration of an encode and its source
+MAX_DURATION_DRIFT = 0.05
+
+# Format version of the cache entries; bump to invalidate old entries
+VARIANTS_FORMAT = 1
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_version() -> str:
+    """First line of `ffmpeg -version`."""
+    result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, check=True)
+    return result.stdout.splitlines()[0] if result.stdout else "unknown"
+
+
+def probe_duration(audio_path: Path) -> float:
+    """Duration of an audio file in seconds, as ffprobe reports it."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+         "-of", "default=noprint_wrappers=1:nokey=1", str(audio_path)],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip())
+
+
+def measure_loudness(audio_path: Path) -> Dict[str, str]:
+    """First loudnorm pass: the measured input loudness of a file."""
+    target = f"I={LOUDNESS['I']}:TP={LOUDNESS['TP']}:LRA={LOUDNESS['LRA']}"
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostats", "-i", str(audio_path),
+         "-af", f"loudnorm={target}:print_format=json", "-f", "null", "-"],
+        capture_output=True, text=True, check=True
+    )
+    # The measurement is the last JSON object ffmpeg prints
+    stats = result.stderr[result.stderr.rindex("{"):result.stderr.rindex("}") + 1]
+    return json.loads(stats)
+
+
+def loudnorm_filter(measured: Dict[str, str]) -> str:
+    """Second loudnorm pass: linear gain to the target from the measured values."""
+    return (
+        f"loudnorm=I={LOUDNESS['I']}:TP={LOUDNESS['TP']}:LRA={LOUDNESS['LRA']}"
+        f":measured_I={measured['input_i']}:measured_TP={measured['input_tp']}"
+        f":measured_LRA={measured['input_lra']}:measured_thresh={measured['input_thresh']}"
+        f":offset={measured['target_offset']}:linear=true"
+    )
+
+
+class AudioVariants:
+    """Cache of encoded narration audio, one folder per source file and settings."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_AUDIO_CACHE_DIR
+        self.hits = 0
+        self.encoded = 0
+
+    def key(self, audio_path: Path) -> str:
+        parts = [
+            f"format={VARIANTS_FORMAT}",
+            f"audio={file_sha256(str(audio_path))}",
+            f"loudness={json.dumps(LOUDNESS, sort_keys=True)}",
+            f"encodings={json.dumps(ENCODINGS, sort_keys=True)}",
+            f"ffmpeg={ffmpeg_version()}",
+        ]
+        return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+    def variants(self, audio_path: Path) -> Optional[Dict]:
+        """
+        Encodes of a narration file, from the cache or freshly encoded.
+
+        Returns:
+            {"duration", "files": [{"encoding", "type", "suffix", "path"}]}, or
+            None if ffmpeg is not installed
+
+        Raises:
+            RuntimeError: If an encode does not keep the source's duration
+        """
+        if not ffmpeg_available():
+            return None
+
+        entry_dir = self.cache_dir / self.key(audio_path)
+        entry = self._load(entry_dir)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        duration = probe_duration(audio_path)
+        audio_filter = loudnorm_filter(measure_loudness(audio_path))
+
+        files = []
+        for encoding, (suffix, mime, arguments) in ENCODINGS.items():
+            output = entry_dir / f"{encoding}{suffix}"
+            tmp_output = entry_dir / f".{encoding}.tmp{suffix}"
+            subprocess.run(
+                ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", str(audio_path),
+                 "-vn", "-map_metadata", "-1", "-ac", "1", "-af", audio_filter,
+                 *arguments, str(tmp_output)],
+                check=True
+            )
+            drift = abs(probe_duration(tmp_output) - duration)
+            if drift > MAX_DURATION_DRIFT:
+                tmp_output.unlink()
+                raise RuntimeError(f"{encoding} encode of {audio_path} changes its duration "
+                                   f"by {drift:.3f} s")
+            os.replace(tmp_output, output)
+            files.append({'encoding': encoding, 'type': mime, 'suffix': suffix, 'path': output.name})
+
+        entry = {'duration': duration, 'files': files}
+        write_text_if_changed(entry_dir / "variants.json", json.dumps(entry, indent=2))
+        self.encoded += 1
+        return self._load(entry_dir)
+
+    def _load(self, entry_dir: Path) -> Optional[Dict]:
+        try:
+            with open(entry_dir / "variants.json", 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        for variant in entry['files']:
+            variant['path'] = str(entry_dir / Path(variant['path']).name)
+            if not Path(variant['path']).exists():
+                return None
+        return entry
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number of entries removed."""
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for entry_dir in self.cache_dir.iterdir():
+            if entry_dir.is_dir():
+                shutil.rmtree(entry_dir)
+                removed += 1
+        return removed
+
+
+def variant_name(audio_name: str, variant: Dict) -> str:
+    """File name of an encode in a page, e.g. 11_lgp40.webm."""
+    return f"{Path(audio_name).stem}{variant['suffix']}"
+
+
+def variant_suffixes() -> List[str]:
+    return [suffix for suffix, _, _ in ENCODINGS.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Encode mono, loudness-normalized Opus/AAC versions of narration audio"
+    )
+    parser.add_argument(
+        "audio_files",
+        nargs="*",
+        help="Narration mp3 files to encode"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Encode every narration in _assets/audios"
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Remove every cached encode"
+    )
+
+    args = parser.parse_args()
+    cache = AudioVariants()
+
+    if args.clear:
+        print(f"Removed {cache.clear()} cached encodes from {cache.cache_dir}")
+        return 0
+
+    audio_files = [Path(p) for p in args.audio_files]
+    if args.all:
+        audios_dir = Path(__file__).parent.parent / "_assets" / "audios"
+        for year in ['1_ano', '2_ano']:
+            audio_files.extend(sorted((audios_dir / year).glob("*.mp3")))
+    if not audio_files:
+        parser.print_help()
+        return 1
+
+    if not ffmpeg_available():
+        print("Error: ffmpeg not found.")
+        print("Install ffmpeg and make sure ffmpeg and ffprobe are on the PATH")
+        return 1
+
+    for audio_file in audio_files:
+        start = time.perf_counter()
+        try:
+            entry = cache.variants(audio_file)
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            print(f"  {audio_file.name}: ERROR {e}")
+            continue
+        elapsed = time.perf_counter() - start
+        print(f"  {audio_file.name} ({audio_file.stat().st_size // 1024} KB, "
+              f"{entry['duration']:.2f} s), {elapsed:.2f} s")
+        for variant in entry['files']:
+            print(f"    {variant['encoding']:<5} {Path(variant['path']).stat().st_size // 1024:>6} KB")
+
+    print(f"Encoded: {cache.encoded}, cached: {cache.hits}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,295 +1,396 @@
 #!/usr/bin/env python3
 """
-Script para criar múltiplos objetos de leitura guiada em lote
+Script para criar objetos de leitura guiada em lote, a partir dos manifestos
+
+Cada ano tem um manifesto em _roteiros/<ano>.json com o prefixo dos seus
+arquivos (ex.: "11" para 11_lgp40.mp3) e, por página, o título e os blocos
+do texto (h1, h2 ou p). Um "\n" no texto de um bloco quebra a linha (<br>);
+um bloco com "narrado": false (ex.: um título que não está na gravação)
+aparece na página sem timestamps. Um novo ano ou livro é só um novo manifesto.
+
+Uso:
+    python batch_create_lg.py                        # Todas as páginas de todos os anos
+    python batch_create_lg.py 2_ano                  # Todas as páginas do 2º ano
+    python batch_create_lg.py 1_ano/40 2_ano/15      # Páginas específicas
+    python batch_create_lg.py --alinhar              # Alinha o roteiro ao áudio
+    python batch_create_lg.py --reusar -j 4          # Timestamps existentes, 4 páginas por vez
+    python batch_create_lg.py --assets shared        # css, js, fontes e logos em shared/
+
+Os arquivos estáticos do template (css, js, fontes, logos) são copiados
+para cada página (--assets copy, padrão), ligados por hard link ou reflink
+(hardlink, reflink; as páginas continuam independentes sem duplicar os
+dados no disco) ou mantidos uma única vez em shared/ (shared). Áudio,
+imagem e timestamps seguem o mesmo modo, exceto em shared, onde são
+copiados. Nenhum arquivo cujo conteúdo já confere é gravado de novo.
+
+As ilustrações ganham variantes WebP/AVIF em várias larguras
+(image_variants.py, requer Pillow), referenciadas por <picture>/srcset;
+sem Pillow, ou com --sem-variantes, as páginas usam só o PNG. Da
+mesma forma, o áudio ganha versões mono Opus e AAC com volume
+normalizado (audio_variants.py, requer ffmpeg), listadas antes do mp3;
+uma versão cuja duração difere do mp3 é recusada e a página falha.
+
+Timestamps cujo silêncio inicial e final foi aparado (etapa trim do
+regenerate_all.py, ver silence_trim.py) registram o corte; com --reusar,
+a página recebe o mp3 aparado correspondente em vez do original.
+
+As fontes Inter são cortadas aos caracteres usados nos manifestos e no
+template e enviadas como WOFF2, com o style.css ajustado (font_subset.py,
+requer fontTools e brotli); o corte só é refeito quando esse conjunto de
+caracteres muda. Sem fontTools, ou com --fontes-completas, as páginas
+usam os TTF completos.
 """
-import os
-import shutil
-import subprocess
+import argparse
 import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-# Diretório base
-BASE_DIR = Path(r"C:\programacao\od_leituras_guiadas")
-
-# Mapeamento de páginas para roteiros
-ROTEIROS = {
-    "40": {
-        "titulo": "Bilhete da Mamãe",
-        "texto": [
-            {"tipo": "h1", "conteudo": "FILHA,"},
-            {"tipo": "p", "conteudo": "SEU SANDUÍCHE ESTÁ NA GELADEIRA. FUI AO MERCADO E JÁ VOLTO."},
-            {"tipo": "p", "conteudo": "BEIJOS, MAMÃE"}
-        ]
-    },
-    "51": {
-        "titulo": "De Onde Veio o Papel?",
-        "texto": [
-            {"tipo": "h1", "conteudo": "DE ONDE VEIO O PAPEL?"},
-            {"tipo": "p", "conteudo": "SIM, FOI NA CHINA QUE SURGIU O PAPEL. É QUASE CERTO QUE SEU INVENTOR TENHA SIDO UM CHINÊS CHAMADO CAI LUN, QUE FOI ENCARREGADO PELO IMPERADOR DE DESENVOLVER E TESTAR VÁRIAS TECNOLOGIAS E EQUIPAMENTOS. [...]"}
-        ]
-    },
-    "52": {
-        "titulo": "Por Que os Camaleões Mudam de Cor?",
-        "texto": [
-            {"tipo": "h1", "conteudo": "POR QUE OS CAMALEÕES MUDAM DE COR?"},
-            {"tipo": "p", "conteudo": "O CAMALEÃO POSSUI CÉLULAS EM SUA PELE QUE SÃO CAPAZES DE MUDAR DE COR DE ACORDO COM AS REAÇÕES DO SISTEMA NERVOSO DO ANIMAL. ISSO ACONTECE PELA NECESSIDADE DE SE CAMUFLAR E SE PROTEGER DE PREDADORES [...]."}
-        ]
-    },
-    "74": {
-        "titulo": "Relâmpago",
-        "texto": [
-            {"tipo": "h1", "conteudo": "RELÂMPAGO"},
-            {"tipo": "p", "conteudo": "O MEU CACHORRO RELÂMPAGO ACORDOU-SE COM SARAMPO. VEIO A DONA MANUELA: DEVE SER VARICELA! VEIO A DONA DORA: DEVE SER CATAPORA! E A DONA FABÍOLA: PARECE SER VARÍOLA! POR FIM, A VETERINÁRIA: ACHO TUDO UM DISPARATE, POIS O CACHORRO SE MANCHOU FOI COM MOLHO DE TOMATE!"}
-        ]
-    },
-    "76": {
-        "titulo": "A Semana Inteira",
-        "texto": [
-            {"tipo": "h1", "conteudo": "A SEMANA INTEIRA"},
-            {"tipo": "p", "conteudo": "A SEGUNDA FOI À FEIRA, PRECISAVA DE FEIJÃO; A TERÇA FOI À FEIRA, PRA COMPRAR UM PIMENTÃO; A QUARTA FOI À FEIRA, PRA BUSCAR QUIABO E PÃO; A QUINTA FOI À FEIRA, POIS GOSTAVA DE AGRIÃO; A SEXTA FOI À FEIRA, TEM BANANA? TEM MAMÃO? SÁBADO NÃO TEM FEIRA E DOMINGO TAMBÉM NÃO."}
-        ]
-    },
-    "80": {
-        "titulo": "Sofia e o Dente de Leite",
-        "texto": [
-            {"tipo": "h1", "conteudo": "SOFIA E O DENTE DE LEITE"},
-            {"tipo": "p", "conteudo": "O QUE VOCÊ SENTIU QUANDO O PRIMEIRO DENTE DE LEITE COMEÇOU A AMOLECER? ELE CAIU DE UMA VEZ OU FICOU BALANÇANDO? DEU MEDO? PEDIU AJUDA A ALGUÉM, MESMO QUE FOSSE À FADA DO DENTE? POIS É. TODO MUNDO PASSA POR ESSAS SITUAÇÕES. SOFIA E O DENTE DE LEITE CONTA, DE FORMA POÉTICA, A AVENTURA DE UMA MENINA DIANTE DO DESAFIO DE ARRANCAR O SEU PRIMEIRO DENTINHO."}
-        ]
-    },
-    "82_1": {
-        "titulo": "Sobre o Autor",
-        "texto": [
-            {"tipo": "h1", "conteudo": "SOBRE O AUTOR"},
-            {"tipo": "p", "conteudo": "HENRIQUE RODRIGUES NASCEU NO RIO DE JANEIRO, EM 1975. ESTUDOU LITERATURA POR MUITOS ANOS E PUBLICOU 15 LIVROS PARA CRIANÇAS, JOVENS E ADULTOS. QUANDO ERA PEQUENO, ARRANCOU SOZINHO TODOS OS SEUS DENTES DE LEITE."}
-        ]
-    },
-    "82_2": {
-        "titulo": "Sobre a Ilustradora",
-        "texto": [
-            {"tipo": "h1", "conteudo": "SOBRE A ILUSTRADORA"},
-            {"tipo": "p", "conteudo": "BRUNA ASSIS BRASIL NASCEU EM CURITIBA, EM 1986. FORMADA EM JORNALISMO E DESIGN GRÁFICO E PÓS-GRADUADA EM ILUSTRAÇÃO CRIATIVA PELA EINA, DE BARCELONA, NA ESPANHA, SEMPRE TEVE GRANDE INTERESSE PELA ARTE DA FOTOGRAFIA. E FOI ASSIM, MISTURANDO CORES E TEXTURAS REAIS AO TRAÇADO DOS SEUS DESENHOS, QUE ELA SE DESCOBRIU ILUSTRADORA. BRUNA NÃO LARGA SEUS LÁPIS E PAPÉIS POR NADA, A NÃO SER PARA LER UM BOM LIVRO."}
-        ]
+# Permite importar os módulos de _scripts
+sys.path.insert(0, str(Path(__file__).parent))
+
+from generate_timestamps import generate_timestamps_batch, save_timestamps
+from transcription_cache import TranscriptionCache
+from audio_cache import PcmCache
+from audio_variants import AudioVariants, ffmpeg_available
+from image_variants import ImageVariants, available_formats
+from silence_trim import TrimmedAudio
+from font_subset import FontSubsets, used_characters
+from page_template import (ASSET_MODES, ASSETS_COPY, ASSETS_SHARED, DEFAULT_TEMPLATE_DIR, aligned_blocks,
+                           load_template, narrated, place_file, script_words)
+from timestamp_format import TIMESTAMP_SUFFIXES, load_timestamp_data
+
+# Raiz do projeto e pasta dos manifestos
+PROJECT_ROOT = Path(__file__).parent.parent
+MANIFESTOS_DIR = PROJECT_ROOT / "_roteiros"
+
+
+def carregar_manifestos(pasta=MANIFESTOS_DIR):
+    """Manifestos de todos os anos, por ano, na ordem dos nomes"""
+    manifestos = {}
+    for caminho in sorted(Path(pasta).glob("*.json")):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            manifesto = json.load(f)
+        manifestos[manifesto['ano']] = manifesto
+    return manifestos
+
+
+def selecionar_paginas(manifestos, selecao):
+    """
+    Páginas (ano, pagina) a construir, na ordem dos manifestos.
+
+    Cada item da seleção é um ano ("2_ano"), uma página de um ano
+    ("1_ano/40") ou uma página em qualquer ano ("40"). Sem seleção,
+    todas as páginas.
+
+    Raises:
+        ValueError: Se um item não corresponder a nenhuma página
+    """
+    todas = [(ano, pagina) for ano, manifesto in manifestos.items() for pagina in manifesto['paginas']]
+    if not selecao:
+        return todas
+
+    escolhidas = set()
+    for item in selecao:
+        ano, _, pagina = item.rpartition("/")
+        if not ano and item in manifestos:
+            ano, pagina = item, ""
+        pagina = pagina.removeprefix("lgp")
+        encontradas = {(a, p) for a, p in todas
+                       if (not ano or a == ano) and (not pagina or p == pagina)}
+        if not encontradas:
+            raise ValueError(f"Página não encontrada nos manifestos: {item}")
+        escolhidas |= encontradas
+    return [chave for chave in todas if chave in escolhidas]
+
+
+def caminhos(ano, prefixo, pagina):
+    """Arquivos de origem e pasta de destino de uma página"""
+    nome = f"{prefixo}_lgp{pagina}"
+    # Imagem (pode ter ou não o prefixo do ano)
+    imagem = PROJECT_ROOT / "_assets" / "imagens" / ano / f"lgp{pagina}.png"
+    if not imagem.exists():
+        imagem = PROJECT_ROOT / "_assets" / "imagens" / ano / f"{nome}.png"
+    return {
+        'nome': nome,
+        'audio': PROJECT_ROOT / "_assets" / "audios" / ano / f"{nome}.mp3",
+        'imagem': imagem,
+        'timestamps': PROJECT_ROOT / "_timestamps" / ano / f"{nome}.json",
+        'destino': PROJECT_ROOT / ano / f"lgp{pagina}",
     }
-}
-
-def gerar_timestamps(audio_path, pagina):
-    """Gera os timestamps para um arquivo de áudio"""
-    print(f"Gerando timestamps para lgp{pagina}...")
-    cmd = [
-        "py", "-3.13",
-        str(BASE_DIR / "_scripts" / "generate_timestamps.py"),
-        str(audio_path),
-        "--language", "pt"
-    ]
-    result = subprocess.run(cmd, cwd=BASE_DIR, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Erro ao gerar timestamps: {result.stderr}")
-        return None
-
-    # Ler o JSON de timestamps gerado
-    timestamp_file = BASE_DIR / "_timestamps" / "1_ano" / f"11_lgp{pagina}.json"
-    if timestamp_file.exists():
-        with open(timestamp_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return None
 
-def criar_pasta_lgp(pagina):
-    """Cria a pasta do objeto de leitura guiada"""
-    dest = BASE_DIR / f"lgp{pagina}"
-    template = BASE_DIR / "lgp21"
-
-    if dest.exists():
-        print(f"Pasta lgp{pagina} já existe, pulando...")
-        return False
-
-    print(f"Criando pasta lgp{pagina}...")
-    shutil.copytree(template, dest)
-    return True
-
-def copiar_arquivos(pagina):
-    """Copia áudio, imagem e timestamps"""
-    print(f"Copiando arquivos para lgp{pagina}...")
-
-    # Áudio
-    audio_src = BASE_DIR / "_assets" / "audios" / "1_ano" / f"11_lgp{pagina}.mp3"
-    audio_dest = BASE_DIR / f"lgp{pagina}" / "assets" / "audio" / f"11_lgp{pagina}.mp3"
-    if audio_src.exists():
-        shutil.copy2(audio_src, audio_dest)
-
-    # Imagem (pode ter ou não o prefixo "11_")
-    img_src = BASE_DIR / "_assets" / "imagens" / "1_ano" / f"lgp{pagina}.png"
-    if not img_src.exists():
-        img_src = BASE_DIR / "_assets" / "imagens" / "1_ano" / f"11_lgp{pagina}.png"
-
-    img_dest = BASE_DIR / f"lgp{pagina}" / "assets" / "images" / f"11_lgp{pagina}.png"
-    if img_src.exists():
-        shutil.copy2(img_src, img_dest)
-
-    # Timestamps
-    ts_src = BASE_DIR / "_timestamps" / "1_ano" / f"11_lgp{pagina}.json"
-    ts_dest = BASE_DIR / f"lgp{pagina}" / "timestamps.json"
-    if ts_src.exists():
-        shutil.copy2(ts_src, ts_dest)
-
-def criar_html_spans(timestamps_data, roteiro):
-    """Cria os spans HTML com timestamps baseado no roteiro"""
-    words = timestamps_data['words']
-    word_index = 0
-    html_parts = []
-
-    for bloco in roteiro:
-        tipo = bloco['tipo']
-        texto = bloco['conteudo']
-        palavras_texto = texto.split()
-
-        spans = []
-        for palavra in palavras_texto:
-            if word_index < len(words):
-                word_data = words[word_index]
-                # Normalizar a palavra do JSON removendo pontuação extra
-                palavra_json = word_data['word'].upper()
-                palavra_limpa = palavra.upper().replace(',', '').replace('.', '').replace('!', '').replace('?', '').replace(';', '').replace(':', '').replace('[...]', '')
-
-                # Verificar se corresponde (aproximadamente)
-                if palavra_limpa in palavra_json or palavra_json in palavra_limpa:
-                    span = f'<span data-start="{word_data["start"]}" data-end="{word_data["end"]}">{palavra}</span>'
-                    spans.append(span)
-                    word_index += 1
-                else:
-                    # Tentar encontrar a palavra correta
-                    spans.append(f'<span data-start="{word_data["start"]}" data-end="{word_data["end"]}">{palavra}</span>')
-                    word_index += 1
-            else:
-                # Sem mais timestamps, usar o último
-                if word_index > 0:
-                    last_word = words[word_index - 1]
-                    spans.append(f'<span data-start="{last_word["end"]}" data-end="{last_word["end"] + 0.5}">{palavra}</span>')
-
-        if tipo == 'h1':
-            html_parts.append(('h1', '\n                '.join(spans)))
-        else:
-            html_parts.append(('p', '\n                    '.join(spans)))
 
-    return html_parts
+def texto_do_roteiro(roteiro):
+    """Texto narrado do roteiro da página, na ordem dos blocos (sem os blocos não narrados)"""
+    return " ".join(palavra for bloco in roteiro['texto'] if narrated(bloco) for palavra in script_words(bloco))
+
+
+def textos_dos_manifestos(manifestos):
+    """Títulos e textos de todas as páginas de todos os anos"""
+    for manifesto in manifestos.values():
+        for roteiro in manifesto['paginas'].values():
+            yield roteiro['titulo']
+            for bloco in roteiro['texto']:
+                yield bloco['conteudo']
 
-def atualizar_html(pagina, roteiro_info, timestamps_data):
-    """Atualiza o arquivo HTML com o novo roteiro"""
-    print(f"Atualizando HTML para lgp{pagina}...")
 
-    html_file = BASE_DIR / f"lgp{pagina}" / "index.html"
+def timestamps_existentes(caminho):
+    """Timestamps já gerados de uma página (JSON ou .tsb), ou None"""
+    for sufixo in TIMESTAMP_SUFFIXES:
+        arquivo = caminho.with_suffix(sufixo)
+        if arquivo.exists():
+            return load_timestamp_data(arquivo)
+    return None
 
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
 
-    # Atualizar título
-    content = content.replace(
-        '<title>Leitura Guiada - Regras de Convivência da Turma</title>',
-        f'<title>Leitura Guiada - {roteiro_info["titulo"]}</title>'
+def gerar_timestamps(manifestos, paginas, alinhar=False, reusar=False):
+    """
+    Gera os timestamps das páginas de todos os anos carregando o modelo uma única vez.
+
+    Com alinhar=True, o texto do roteiro é alinhado ao áudio (alinhamento forçado)
+    em vez de transcrito, gerando exatamente um timestamp por palavra do roteiro.
+    Com reusar=True, páginas que já têm timestamps em _timestamps não são processadas.
+    """
+    timestamps = {}
+    audios = {}
+    for ano, pagina in paginas:
+        arquivos = caminhos(ano, manifestos[ano]['prefixo'], pagina)
+        if reusar:
+            dados = timestamps_existentes(arquivos['timestamps'])
+            if dados is not None:
+                timestamps[(ano, pagina)] = dados
+                continue
+        if arquivos['audio'].exists():
+            audios[(ano, pagina)] = arquivos
+
+    if not audios:
+        return timestamps
+
+    print(f"Gerando timestamps para {len(audios)} áudios...")
+    resultados = generate_timestamps_batch(
+        [str(arquivos['audio']) for arquivos in audios.values()],
+        language="pt",
+        cache=TranscriptionCache(),
+        pcm_cache=PcmCache(),
+        texts=[texto_do_roteiro(manifestos[ano]['paginas'][pagina]) for ano, pagina in audios]
+        if alinhar else None
     )
 
-    # Criar spans HTML
-    html_spans = criar_html_spans(timestamps_data, roteiro_info['texto'])
+    for chave, dados in zip(audios, resultados):
+        timestamp_file = audios[chave]['timestamps']
+        timestamp_file.parent.mkdir(parents=True, exist_ok=True)
+        save_timestamps(dados, str(timestamp_file))
+        timestamps[chave] = dados
+    return timestamps
+
+
+def copiar_arquivos(arquivos, assets=ASSETS_COPY):
+    """
+    Copia (ou liga, conforme o modo) áudio, imagem e timestamps.
+
+    Returns:
+        Número de arquivos gravados
+    """
+    destino = arquivos['destino']
+    nome = arquivos['nome']
+    modo = ASSETS_COPY if assets == ASSETS_SHARED else assets
+    copias = [
+        (arquivos['audio'], destino / "assets" / "audio" / f"{nome}.mp3"),
+        (arquivos['imagem'], destino / "assets" / "images" / f"{nome}.png"),
+        (arquivos['timestamps'], destino / "timestamps.json"),
+    ]
 
-    # Construir novo conteúdo
-    h1_content = ""
-    p_contents = []
+    gravados = 0
+    for origem, alvo in copias:
+        if origem.exists():
+            gravados += place_file(origem, alvo, modo)
+    return gravados
+
+
+def gerar_pagina(arquivos, pagina, roteiro, timestamps_data, assets=ASSETS_COPY, variantes=True,
+                 fontes=None):
+    """
+    Gera a pasta do objeto a partir do template compilado (lgp21).
+
+    O HTML é renderizado a partir do roteiro e dos timestamps; só são
+    gravados os arquivos cujo conteúdo mudou. fontes substitui arquivos
+    estáticos do template (subconjuntos WOFF2 das fontes, ver font_subset.py).
+
+    Returns:
+        Número de arquivos gravados
+    """
+    image_variants = None
+    if variantes and arquivos['imagem'].exists():
+        image_variants = ImageVariants().variants(arquivos['imagem'])
+    audio_variants = AudioVariants().variants(arquivos['audio']) if variantes else None
+
+    return load_template().write_page(
+        arquivos['destino'],
+        assets=assets,
+        static_overrides=fontes,
+        image_variants=image_variants,
+        audio_variants=audio_variants,
+        titulo=roteiro['titulo'],
+        pagina=pagina.replace("_", " "),
+        blocos=aligned_blocks(roteiro['texto'], timestamps_data['words']),
+        audio=f"{arquivos['nome']}.mp3",
+        imagem=f"{arquivos['nome']}.png"
+    )
 
-    for tipo, spans in html_spans:
-        if tipo == 'h1':
-            h1_content = spans
-        else:
-            p_contents.append(spans)
-
-    # Montar o HTML do artigo
-    novo_artigo = f'''            <h1 class="title">
-                {h1_content}
-            </h1>
-            <div class="text-content" id="lyrics" aria-live="polite">
-'''
-
-    for p_content in p_contents:
-        novo_artigo += f'''                <p>
-                    {p_content}
-                </p>
-'''
-
-    novo_artigo += '            </div>'
-
-    # Substituir o conteúdo do artigo usando regex
-    import re
-    pattern = r'<h1 class="title">.*?</div>'
-    content = re.sub(pattern, novo_artigo, content, flags=re.DOTALL)
-
-    # Atualizar caminhos de arquivos
-    content = content.replace('11_lgp21.mp3', f'11_lgp{pagina}.mp3')
-    content = content.replace('11_lgp21.png', f'11_lgp{pagina}.png')
-    content = content.replace('Página 21', f'Página {pagina.replace("_", " ")}')
-    content = content.replace('página 21', f'página {pagina.replace("_", " ")}')
-
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-
-def processar_pagina(pagina):
-    """Processa uma página completa"""
-    print(f"\n{'='*60}")
-    print(f"Processando lgp{pagina}")
-    print(f"{'='*60}")
 
-    # Verificar se áudio existe
-    audio_path = BASE_DIR / "_assets" / "audios" / "1_ano" / f"11_lgp{pagina}.mp3"
-    if not audio_path.exists():
-        print(f"Áudio não encontrado: {audio_path}")
-        return False
-
-    # Gerar timestamps
-    timestamps_data = gerar_timestamps(audio_path, pagina)
-    if not timestamps_data:
-        print(f"Falha ao gerar timestamps para lgp{pagina}")
-        return False
-
-    # Criar pasta
-    if not criar_pasta_lgp(pagina):
-        print(f"Pasta lgp{pagina} já existe, continuando...")
-
-    # Copiar arquivos
-    copiar_arquivos(pagina)
-
-    # Atualizar HTML
-    roteiro = ROTEIROS.get(pagina)
-    if roteiro:
-        atualizar_html(pagina, roteiro, timestamps_data)
+def processar_pagina(ano, prefixo, pagina, roteiro, timestamps_data, assets=ASSETS_COPY, variantes=True,
+                     fontes=None):
+    """
+    Constrói uma página completa.
+
+    Returns:
+        Dicionário com o resultado e o tempo da página
+    """
+    inicio = time.perf_counter()
+    resultado = {'pagina': f"{ano}/lgp{pagina}", 'sucesso': False, 'arquivos': 0}
+    arquivos = caminhos(ano, prefixo, pagina)
+
+    if not arquivos['audio'].exists():
+        resultado['erro'] = f"Áudio não encontrado: {arquivos['audio']}"
+    elif not timestamps_data:
+        resultado['erro'] = "Falha ao gerar timestamps"
     else:
-        print(f"Roteiro não encontrado para lgp{pagina}")
-        return False
+        try:
+            # Timestamps de um áudio aparado (silence_trim.py) vão com o áudio aparado
+            arquivos['audio'] = TrimmedAudio().for_data(arquivos['audio'], timestamps_data)
+            resultado['arquivos'] = gerar_pagina(arquivos, pagina, roteiro, timestamps_data, assets, variantes,
+                                                 fontes)
+            resultado['arquivos'] += copiar_arquivos(arquivos, assets)
+            resultado['sucesso'] = True
+        except Exception as e:
+            resultado['erro'] = str(e)
+
+    resultado['tempo'] = time.perf_counter() - inicio
+    return resultado
+
+
+def processar_paginas(tarefas, jobs=1):
+    """
+    Constrói as páginas, em sequência ou em paralelo (processos).
+
+    Produz o resultado de cada página na ordem das tarefas.
+    """
+    jobs = max(1, min(jobs, len(tarefas)))
+    if jobs == 1:
+        for tarefa in tarefas:
+            yield processar_pagina(*tarefa)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futuros = [executor.submit(processar_pagina, *tarefa) for tarefa in tarefas]
+        for futuro in futuros:
+            yield futuro.result()
 
-    print(f"[OK] lgp{pagina} criado com sucesso!")
-    return True
 
 def main():
     """Função principal"""
-    paginas = ["40", "51", "52", "74", "76", "80", "82_1", "82_2"]
+    parser = argparse.ArgumentParser(
+        description="Cria objetos de leitura guiada a partir dos manifestos em _roteiros/"
+    )
+    parser.add_argument(
+        "paginas",
+        nargs="*",
+        help="Anos (2_ano), páginas (1_ano/40) ou números de página (40); padrão: todas"
+    )
+    parser.add_argument(
+        "--alinhar",
+        action="store_true",
+        help="Alinha o texto dos roteiros ao áudio em vez de transcrever livremente"
+    )
+    parser.add_argument(
+        "--reusar",
+        action="store_true",
+        help="Usa os timestamps já existentes em _timestamps em vez de gerá-los de novo"
+    )
+    parser.add_argument(
+        "--assets",
+        choices=ASSET_MODES,
+        default=ASSETS_COPY,
+        help="Como os arquivos estáticos chegam às páginas (padrão: %(default)s)"
+    )
+    parser.add_argument(
+        "--sem-variantes",
+        action="store_true",
+        help="Não gera variantes WebP/AVIF das ilustrações nem Opus/AAC do áudio (só PNG e mp3)"
+    )
+    parser.add_argument(
+        "--fontes-completas",
+        action="store_true",
+        help="Mantém as fontes TTF completas em vez dos subconjuntos WOFF2"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Número de páginas construídas em paralelo (padrão: 1)"
+    )
+    args = parser.parse_args()
+
+    manifestos = carregar_manifestos()
+    try:
+        paginas = selecionar_paginas(manifestos, args.paginas)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if not args.sem_variantes and not available_formats():
+        print("Aviso: Pillow não instalado, as ilustrações não cacheadas ficam só em PNG.")
+        print("Instale com: pip install Pillow")
+    if not args.sem_variantes and not ffmpeg_available():
+        print("Aviso: ffmpeg não encontrado, o áudio fica só em mp3.")
+
+    fontes = None
+    if not args.fontes_completas:
+        # Caracteres de todos os manifestos, não só das páginas escolhidas, para o corte ser o mesmo em todas
+        caracteres = used_characters(textos_dos_manifestos(manifestos), DEFAULT_TEMPLATE_DIR)
+        fontes = FontSubsets().overrides(DEFAULT_TEMPLATE_DIR, caracteres)
+        if fontes is None:
+            print("Aviso: fontTools não instalado, as páginas usam as fontes TTF completas.")
+            print("Instale com: pip install fonttools brotli")
 
     print("Iniciando criação em lote de objetos de leitura guiada...")
     print(f"Total de páginas a processar: {len(paginas)}")
 
+    inicio = time.perf_counter()
+    timestamps = gerar_timestamps(manifestos, paginas, alinhar=args.alinhar, reusar=args.reusar)
+    tempo_timestamps = time.perf_counter() - inicio
+
+    tarefas = [
+        (ano, manifestos[ano]['prefixo'], pagina, manifestos[ano]['paginas'][pagina],
+         timestamps.get((ano, pagina)), args.assets, not args.sem_variantes, fontes)
+        for ano, pagina in paginas
+    ]
+
     sucesso = 0
     falhas = 0
-
-    for pagina in paginas:
-        try:
-            if processar_pagina(pagina):
-                sucesso += 1
-            else:
-                falhas += 1
-        except Exception as e:
-            print(f"Erro ao processar lgp{pagina}: {e}")
+    arquivos = 0
+    inicio = time.perf_counter()
+    for resultado in processar_paginas(tarefas, args.jobs):
+        tempo = f"{resultado['tempo'] * 1000:8.1f} ms"
+        if resultado['sucesso']:
+            sucesso += 1
+            arquivos += resultado['arquivos']
+            print(f"[OK]   {resultado['pagina']:<16} {tempo}  ({resultado['arquivos']} arquivos gravados)")
+        else:
             falhas += 1
+            print(f"[ERRO] {resultado['pagina']:<16} {tempo}  {resultado['erro']}")
+    tempo_paginas = time.perf_counter() - inicio
 
     print(f"\n{'='*60}")
     print(f"Processamento concluído!")
     print(f"Sucesso: {sucesso}")
     print(f"Falhas: {falhas}")
+    print(f"Arquivos gravados: {arquivos}")
+    print(f"Tempo: timestamps {tempo_timestamps:.2f} s, páginas {tempo_paginas:.2f} s")
     print(f"{'='*60}")
 
+    return 1 if falhas else 0
+
+
 if __name__ == "__main__":
-    main()
+    exit(main())
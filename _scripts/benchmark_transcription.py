@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Benchmark transcription speed and timestamp accuracy across Whisper models.
+
+Every configuration runs in a fresh worker process over the audio files in
+_assets/audios/1_ano and 2_ano. Per configuration it records the model
+load time, the real-time factor (transcription seconds per audio second),
+the peak RSS of the worker and the word-start error against the
+committed _timestamps JSON. Reference words are paired with the
+transcribed words by word_alignment.align_sequences; only pairs with the
+same normalized word are measured. Only start times are compared: the
+committed ends were stretched to the next word by fill_gaps, so they are
+not what the model produced.
+
+A configuration is a model name or a cascade ("tiny,base,small"); single
+models can also run with the VAD front end (--vad). Audio is decoded into the PCM
+cache before timing, so ffmpeg is not part of the measured time.
+
+Usage:
+    python benchmark_transcription.py                           # tiny and base on every file
+    python benchmark_transcription.py --models tiny base small --limit 5
+    python benchmark_transcription.py --models tiny base --vad
+    python benchmark_transcription.py --baseline _cache/benchmarks/previous.json
+
+Output:
+    JSON report (default: _cache/benchmarks/benchmark_<date>.json) and a
+    summary table. With --baseline, the table also shows the change of each
+    metric against an earlier report.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from audio_cache import PcmCache, SAMPLE_RATE
+from atomic_write import write_text_if_changed
+from word_alignment import align_sequences, normalize_word
+
+try:
+    import resource
+except ImportError:
+    # Windows: peak RSS is not reported
+    resource = None
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "_cache" / "benchmarks"
+
+DEFAULT_MODELS = ["tiny", "base"]
+
+# Report format version; bump when fields change meaning
+REPORT_FORMAT = 1
+
+
+def collect_benchmark_files(years: List[str], limit: Optional[int] = None) -> List[Path]:
+    """Source audio files that have a committed timestamp JSON to compare against."""
+    files = []
+    for year in years:
+        audio_dir = PROJECT_ROOT / "_assets" / "audios" / year
+        if not audio_dir.exists():
+            continue
+        for audio_path in sorted(audio_dir.glob("*.mp3")):
+            if reference_path(audio_path).exists():
+                files.append(audio_path)
+    return files[:limit] if limit else files
+
+
+def reference_path(audio_path: Path) -> Path:
+    """Committed timestamp JSON for a source audio file."""
+    return PROJECT_ROOT / "_timestamps" / audio_path.parent.name / f"{audio_path.stem}.json"
+
+
+def reference_offset(data: dict) -> float:
+    """
+    Seconds to add to the committed starts to put them back on the timeline
+    of the source audio (undoing the lead pass and the silence trim).
+    """
+    return data.get('lead_offset', 0.0) + data.get('trim_offset', 0.0)
+
+
+def start_errors(reference: List[Dict], words: List[Dict], offset: float = 0.0) -> List[float]:
+    """
+    Absolute start differences (seconds) of the words both lists agree on.
+
+    Words are paired with the banded alignment, so an inserted or dropped
+    word does not shift the comparison of the rest of the file. `offset` is
+    added to the reference starts (see reference_offset).
+    """
+    source = [normalize_word(w['word']) for w in words]
+    target = [normalize_word(w['word']) for w in reference]
+    errors = []
+    for source_index, target_index in align_sequences(source, target):
+        if source_index is None or target_index is None:
+            continue
+        if not source[source_index] or source[source_index] != target[target_index]:
+            continue
+        errors.append(abs(words[source_index]['start'] - (reference[target_index]['start'] + offset)))
+    return errors
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_configuration(model_name: str, audio_paths: List[str], language: str, vad: bool,
+                      min_confidence: float, threads: int) -> dict:
+    """
+    Benchmark one configuration. Runs in its own process so RSS and load time are not shared.
+    """
+    import torch
+    from generate_timestamps import ModelCache, cascade_model_names, process_with_model
+
+    torch.set_num_threads(threads)
+    pcm_cache = PcmCache()
+    models = ModelCache()
+
+    # Models of a cascade after the first are loaded on demand and counted in their file's time
+    load_start = time.perf_counter()
+    models.get(cascade_model_names(model_name)[0])
+    load_seconds = time.perf_counter() - load_start
+
+    files = []
+    for audio_path in audio_paths:
+        samples = pcm_cache.load(audio_path)
+        duration = len(samples) / SAMPLE_RATE
+
+        start = time.perf_counter()
+        result = process_with_model(models, audio_path, language, model_name, pcm_cache=pcm_cache,
+                                    vad=vad, min_confidence=min_confidence)
+        seconds = time.perf_counter() - start
+
+        with open(reference_path(Path(audio_path)), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        reference = data.get('words', [])
+        errors = start_errors(reference, result['words'], reference_offset(data))
+
+        files.append({
+            'audio_file': os.path.relpath(audio_path, PROJECT_ROOT),
+            'duration': round(duration, 3),
+            'seconds': round(seconds, 3),
+            'rtf': round(seconds / duration, 4) if duration else None,
+            'words': len(result['words']),
+            'reference_words': len(reference),
+            'matched_words': len(errors),
+            'mean_start_error_ms': round(1000 * statistics.mean(errors), 1) if errors else None,
+        })
+
+    return summarize_configuration(model_name, vad, load_seconds, files, _peak_rss_mb())
+
+
+def summarize_configuration(model_name: str, vad: bool, load_seconds: float,
+                            files: List[Dict], peak_rss_mb: Optional[float]) -> dict:
+    """Aggregate per-file measurements into one configuration result."""
+    audio_seconds = sum(f['duration'] for f in files)
+    transcribe_seconds = sum(f['seconds'] for f in files)
+    reference_words = sum(f['reference_words'] for f in files)
+    matched_words = sum(f['matched_words'] for f in files)
+    # Weight each file's error by the number of words it was measured on
+    weighted = [(f['mean_start_error_ms'], f['matched_words']) for f in files
+                if f['mean_start_error_ms'] is not None]
+
+    return {
+        'config': configuration_name(model_name, vad),
+        'model': model_name,
+        'vad': vad,
+        'load_seconds': round(load_seconds, 3),
+        'audio_seconds': round(audio_seconds, 3),
+        'transcribe_seconds': round(transcribe_seconds, 3),
+        'rtf': round(transcribe_seconds / audio_seconds, 4) if audio_seconds else None,
+        'peak_rss_mb': round(peak_rss_mb, 1) if peak_rss_mb is not None else None,
+        'matched_ratio': round(matched_words / reference_words, 4) if reference_words else None,
+        'mean_start_error_ms': (
+            round(sum(e * n for e, n in weighted) / sum(n for _, n in weighted), 1)
+            if weighted else None
+        ),
+        'median_file_error_ms': (
+            round(statistics.median(e for e, _ in weighted), 1) if weighted else None
+        ),
+        'files': files,
+    }
+
+
+def configuration_name(model_name: str, vad: bool) -> str:
+    return f"{model_name}+vad" if vad else model_name
+
+
+TABLE_COLUMNS = [
+    ('config', 'Config', '{}'),
+    ('load_seconds', 'Load (s)', '{:.2f}'),
+    ('rtf', 'RTF', '{:.3f}'),
+    ('peak_rss_mb', 'Peak RSS (MB)', '{:.0f}'),
+    ('matched_ratio', 'Matched', '{:.0%}'),
+    ('mean_start_error_ms', 'Start err (ms)', '{:.0f}'),
+]
+
+
+def format_table(results: List[Dict], baseline: Optional[Dict[str, Dict]] = None) -> str:
+    """Render configuration results as a plain-text table, with deltas against a baseline."""
+    rows = [[title for _, title, _ in TABLE_COLUMNS]]
+    for result in results:
+        previous = (baseline or {}).get(result['config'])
+        row = []
+        for key, _, fmt in TABLE_COLUMNS:
+            value = result.get(key)
+            cell = fmt.format(value) if value is not None else "-"
+            if previous is not None and key != 'config' and value is not None \
+                    and previous.get(key) is not None:
+                delta = value - previous[key]
+                cell += f" ({'+' if delta >= 0 else '-'}{fmt.format(abs(delta))})"
+            row.append(cell)
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(TABLE_COLUMNS))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def load_baseline(path: str) -> Dict[str, Dict]:
+    """Configuration results of an earlier report, keyed by configuration name."""
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return {result['config']: result for result in report.get('results', [])}
+
+
+def run_benchmark(model_names: List[str], audio_paths: List[Path], language: str = "pt",
+                  vad: bool = False, min_confidence: float = 0.6,
+                  threads: Optional[int] = None) -> List[Dict]:
+    """Run every configuration in a fresh spawn process and collect the results."""
+    threads = threads or os.cpu_count() or 1
+    paths = [str(path) for path in audio_paths]
+
+    # Decode everything once up front so no configuration pays for ffmpeg
+    pcm_cache = PcmCache()
+    for path in paths:
+        pcm_cache.load(path)
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for model_name in model_names:
+        print(f"\n=== {configuration_name(model_name, vad)} ===")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_configuration, model_name, paths, language, vad,
+                                     min_confidence, threads).result()
+        print(f"  RTF {result['rtf']}, start error {result['mean_start_error_ms']} ms")
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Whisper models on the project recordings"
+    )
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=DEFAULT_MODELS,
+        help="Models or cascades to compare, e.g. tiny base tiny,base,small (default: tiny base)"
+    )
+    parser.add_argument(
+        "--years",
+        nargs="+",
+        default=["1_ano", "2_ano"],
+        help="Audio folders under _assets/audios (default: 1_ano 2_ano)"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="Only benchmark the first N files"
+    )
+    parser.add_argument(
+        "--language", "-l",
+        default="pt",
+        help="Language code (default: pt)"
+    )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Benchmark with the VAD front end (single models only)"
+    )
+    parser.add_argument(
+        "--min-confidence",
+        type=float,
+        default=0.6,
+        help="Cascade threshold (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        help="Torch threads per run (default: all CPUs)"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        help="Report path (default: _cache/benchmarks/benchmark_<date>.json)"
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Earlier report to compare against"
+    )
+
+    args = parser.parse_args()
+    if args.vad and any("," in model for model in args.models):
+        parser.error("--vad does not apply to cascades")
+
+    audio_paths = collect_benchmark_files(args.years, args.limit)
+    if not audio_paths:
+        print("Error: No audio files with committed timestamps found")
+        return 1
+
+    print(f"Benchmarking {len(args.models)} configuration(s) on {len(audio_paths)} files")
+    results = run_benchmark(args.models, audio_paths, language=args.language, vad=args.vad,
+                            min_confidence=args.min_confidence, threads=args.threads)
+
+    report = {
+        'format': REPORT_FORMAT,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'platform': sys.platform,
+        'cpu_count': os.cpu_count(),
+        'language': args.language,
+        'results': results,
+    }
+
+    output_path = Path(args.output) if args.output else \
+        DEFAULT_OUTPUT_DIR / f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_text_if_changed(output_path, json.dumps(report, ensure_ascii=False, indent=2))
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    print()
+    print(format_table(results, baseline))
+    print(f"\nReport saved to: {output_path}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Dependency manifest for incremental rebuilds.
+
+For every OED the manifest records the hashes of its inputs: the source
+audio in _assets/audios, the timestamp JSON, the roteiro text (the words of
+the HTML spans), the generated index.html, the version of the build
+template, the post-processing pass chain and the pipeline stages. An OED whose fingerprint
+matches the manifest can be skipped.
+
+Usage:
+    python build_manifest.py            # Show which OEDs are up to date
+    python build_manifest.py --clear    # Forget every recorded build
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from transcription_cache import file_sha256
+from atomic_write import write_text_if_changed
+from update_html_timestamps import SPAN_PATTERN, find_html_for_timestamp
+from timestamp_format import iter_timestamp_files
+from postprocess_timestamps import DEFAULT_PASSES, parse_passes
+
+# Default manifest location: <project_root>/_cache/build_manifest.json
+DEFAULT_MANIFEST_PATH = Path(__file__).parent.parent / "_cache" / "build_manifest.json"
+
+# Bump when the generated output changes in a way the script hashes do not capture
+TEMPLATE_VERSION = 1
+
+# Scripts whose logic shapes the generated JSON/HTML
+TEMPLATE_SOURCES = [
+    "postprocess_timestamps.py",
+    "update_html_timestamps.py",
+    "word_alignment.py",
+    "regenerate_all.py",
+    "oed_pipeline.py",
+    "span_index.py",
+    "timestamp_format.py",
+    "silence_trim.py",
+    "vad.py",
+    "audio_variants.py",
+    "page_template.py",
+]
+
+
+def template_version() -> str:
+    """Hash of TEMPLATE_VERSION and the sources of the build scripts."""
+    digest = hashlib.sha256(f"template={TEMPLATE_VERSION}".encode('utf-8'))
+    script_dir = Path(__file__).parent
+    for name in TEMPLATE_SOURCES:
+        path = script_dir / name
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def roteiro_hash(html_path: Path) -> Optional[str]:
+    """Hash of the roteiro text as rendered in the HTML word spans."""
+    if not html_path.exists():
+        return None
+    with open(html_path, 'r', encoding='utf-8') as f:
+        words = SPAN_PATTERN.findall(f.read())
+    return hashlib.sha256(" ".join(words).encode('utf-8')).hexdigest()
+
+
+def audio_for_timestamp(timestamp_path: Path, project_root: Path) -> Path:
+    """Return the source audio for a timestamp file (e.g. _assets/audios/1_ano/11_lgp36.mp3)."""
+    return project_root / "_assets" / "audios" / timestamp_path.parent.name / f"{timestamp_path.stem}.mp3"
+
+
+def _optional_hash(path: Path) -> Optional[str]:
+    return file_sha256(str(path)) if path.exists() else None
+
+
+def passes_hash(passes: Optional[List[Tuple[str, Optional[float]]]] = None) -> str:
+    """Hash of a parsed pass chain, names and values (default: DEFAULT_PASSES)."""
+    if passes is None:
+        passes = parse_passes(DEFAULT_PASSES)
+    return hashlib.sha256(json.dumps([list(p) for p in passes]).encode('utf-8')).hexdigest()
+
+
+def stages_key(stages: Optional[List[str]] = None) -> str:
+    """The pipeline stage list, e.g. "postprocess,html" (default: DEFAULT_STAGES)."""
+    from oed_pipeline import DEFAULT_STAGES, parse_stages
+
+    return ",".join(stages if stages is not None else parse_stages(DEFAULT_STAGES))
+
+
+def oed_fingerprint(timestamp_path: Path, html_path: Path, project_root: Path,
+                    passes: Optional[List[Tuple[str, Optional[float]]]] = None,
+                    stages: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+    """Collect the input hashes of one OED, built with the given pass chain and stages."""
+    return {
+        'audio': _optional_hash(audio_for_timestamp(timestamp_path, project_root)),
+        'timestamps': _optional_hash(timestamp_path),
+        'roteiro': roteiro_hash(html_path),
+        'html': _optional_hash(html_path),
+        'template': template_version(),
+        'passes': passes_hash(passes),
+        'stages': stages_key(stages),
+    }
+
+
+class BuildManifest:
+    """Per-OED input fingerprints of the last successful build."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else DEFAULT_MANIFEST_PATH
+        self.entries: Dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('oeds', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def is_current(self, key: str, fingerprint: dict) -> bool:
+        """True if the OED was last built from exactly these inputs."""
+        return self.entries.get(key) == fingerprint
+
+    def changed_inputs(self, key: str, fingerprint: dict) -> list:
+        """Names of the inputs that differ from the recorded build."""
+        recorded = self.entries.get(key)
+        if recorded is None:
+            return ['new']
+        return [name for name, value in fingerprint.items() if recorded.get(name) != value]
+
+    def record(self, key: str, fingerprint: dict) -> None:
+        self.entries[key] = fingerprint
+
+    def forget(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_if_changed(self.path, json.dumps({'oeds': self.entries}, ensure_ascii=False,
+                                                    indent=2, sort_keys=True))
+
+
+def manifest_key(timestamp_path: Path, project_root: Path) -> str:
+    """Stable manifest key for an OED, e.g. '1_ano/11_lgp36'."""
+    try:
+        relative = timestamp_path.resolve().relative_to((project_root / "_timestamps").resolve())
+    except ValueError:
+        relative = Path(timestamp_path.parent.name) / timestamp_path.name
+    return relative.with_suffix('').as_posix()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect the incremental build manifest"
+    )
+    parser.add_argument(
+        "--manifest",
+        help=f"Manifest path (default: {DEFAULT_MANIFEST_PATH})"
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Forget every recorded build (next incremental run rebuilds everything)"
+    )
+
+    args = parser.parse_args()
+    manifest = BuildManifest(args.manifest)
+
+    if args.clear:
+        manifest.entries = {}
+        manifest.save()
+        print(f"Cleared {manifest.path}")
+        return 0
+
+    project_root = Path(__file__).parent.parent
+    for year in ['1_ano', '2_ano']:
+        year_path = project_root / "_timestamps" / year
+        if not year_path.exists():
+            continue
+        for json_file in iter_timestamp_files(year_path):
+            key = manifest_key(json_file, project_root)
+            html_path = find_html_for_timestamp(json_file, project_root)
+            changed = manifest.changed_inputs(key, oed_fingerprint(json_file, html_path, project_root))
+            print(f"  {key}: {'up to date' if not changed else 'changed (' + ', '.join(changed) + ')'}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
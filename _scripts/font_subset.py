@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+WOFF2 subsets of the template fonts, cut to the glyphs the pages use.
+
+Every page ships the full Inter TTFs of the template, while the texts
+only use a few dozen characters. The characters of every roteiro in the
+manifests, plus the text of the template page itself (buttons, labels),
+are collected in both cases, and each font referenced by an @font-face
+rule of the template css is subset to them with fontTools and saved as
+WOFF2. The css is rewritten to load the WOFF2 files; the page builder
+ships both instead of the TTFs (see page_template.write_page).
+
+Subsets are cached in _cache/fonts by the SHA-256 of the fonts, the
+template css and the character set, so they are recomputed only when
+the glyph set (or a font) changes. fontTools (with brotli) is optional:
+without it, pages keep the full TTFs.
+
+Usage:
+    python font_subset.py            # Subset the fonts to the characters of the manifests
+    python font_subset.py --clear    # Remove every cached subset
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from atomic_write import write_text_if_changed
+from transcription_cache import file_sha256
+
+# Default cache location: <project_root>/_cache/fonts
+DEFAULT_FONT_CACHE_DIR = Path(__file__).parent.parent / "_cache" / "fonts"
+
+# A TTF/OTF source of an @font-face rule: url('../assets/fonts/X.ttf') format('truetype')
+FONT_URL_PATTERN = re.compile(
+    r"url\((['\"]?)([^'\")]+\.(?:ttf|otf))\1\)\s*format\((['\"])(?:truetype|opentype)\3\)"
+)
+
+# Markup whose text is not shown on the page
+HIDDEN_MARKUP_PATTERN = re.compile(r"<(script|style|title)\b.*?</\1>|<!--.*?-->", flags=re.DOTALL)
+TAG_PATTERN = re.compile(r"<[^>]*>")
+
+# Format version of the cache entries; bump to invalidate old entries
+SUBSET_FORMAT = 1
+
+subset = None
+
+
+def _import_subset():
+    """Import fontTools.subset on first use; None if fontTools or brotli is missing."""
+    global subset
+    if subset is None:
+        try:
+            import brotli  # noqa: F401  (WOFF2 compression)
+            from fontTools import subset as fonttools_subset
+        except ImportError:
+            return None
+        subset = fonttools_subset
+    return subset
+
+
+def subsetting_available() -> bool:
+    return _import_subset() is not None
+
+
+def visible_text(source: str) -> str:
+    """The text of an HTML document, without markup, scripts and styles."""
+    return html.unescape(TAG_PATTERN.sub(" ", HIDDEN_MARKUP_PATTERN.sub(" ", source)))
+
+
+def used_characters(texts: Iterable[str], template_dir: Path) -> str:
+    """
+    The characters of the given texts and of the template page, in both
+    cases (the css uppercases some text), sorted.
+    """
+    with open(Path(template_dir) / "index.html", 'r', encoding='utf-8') as f:
+        characters = set(visible_text(f.read()))
+    for text in texts:
+        characters.update(text)
+    characters.update({c.upper() for c in characters} | {c.lower() for c in characters})
+    return "".join(sorted(c for c in characters if c.isprintable() or c == " "))
+
+
+def stylesheet_fonts(template_dir: Path, stylesheet: str) -> Dict[str, str]:
+    """Fonts of a template css: URL in the css -> path relative to the template folder."""
+    with open(Path(template_dir) / stylesheet, 'r', encoding='utf-8') as f:
+        css = f.read()
+    base = Path(stylesheet).parent
+    return {m.group(2): _normalize((base / m.group(2)).as_posix()) for m in FONT_URL_PATTERN.finditer(css)}
+
+
+def _normalize(relative: str) -> str:
+    """Resolve ".." in a relative POSIX path without touching the file system."""
+    parts = []
+    for part in relative.split("/"):
+        if part == "..":
+            parts.pop()
+        elif part not in ("", "."):
+            parts.append(part)
+    return "/".join(parts)
+
+
+def woff2_name(relative: str) -> str:
+    return Path(relative).with_suffix(".woff2").as_posix()
+
+
+class FontSubsets:
+    """Cache of subset fonts and rewritten css, one folder per template and character set."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_FONT_CACHE_DIR
+        self.hits = 0
+        self.encoded = 0
+
+    def _stylesheets(self, template_dir: Path) -> Dict[str, Dict[str, str]]:
+        """Template css files with @font-face fonts, and their fonts."""
+        stylesheets = {}
+        for path in sorted(Path(template_dir).rglob("*.css")):
+            relative = path.relative_to(template_dir).as_posix()
+            fonts = stylesheet_fonts(template_dir, relative)
+            if fonts:
+                stylesheets[relative] = fonts
+        return stylesheets
+
+    def key(self, template_dir: Path, characters: str) -> str:
+        parts = [f"format={SUBSET_FORMAT}", f"characters={characters}"]
+        for stylesheet, fonts in self._stylesheets(template_dir).items():
+            parts.append(f"{stylesheet}={file_sha256(str(Path(template_dir) / stylesheet))}")
+            for relative in sorted(set(fonts.values())):
+                parts.append(f"{relative}={file_sha256(str(Path(template_dir) / relative))}")
+        return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+    def overrides(self, template_dir: Path, characters: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Static files that replace the template's on the pages, from the cache
+        or freshly subset.
+
+        Returns:
+            {path relative to the template folder: replacement file, or None
+            for a file the pages no longer need}, or None if the subsets are
+            not cached and fontTools is not installed
+        """
+        template_dir = Path(template_dir)
+        entry_dir = self.cache_dir / self.key(template_dir, characters)
+        entry = self._load(entry_dir)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        subsetter_module = _import_subset()
+        if subsetter_module is None:
+            return None
+
+        files: Dict[str, Optional[str]] = {}
+        for stylesheet, fonts in self._stylesheets(template_dir).items():
+            for relative in sorted(set(fonts.values())):
+                options = subsetter_module.Options()
+                options.flavor = "woff2"
+                font = subsetter_module.load_font(str(template_dir / relative), options)
+                subsetter = subsetter_module.Subsetter(options)
+                subsetter.populate(text=characters)
+                subsetter.subset(font)
+                output = entry_dir / woff2_name(relative)
+                output.parent.mkdir(parents=True, exist_ok=True)
+                subsetter_module.save_font(font, str(output), options)
+                font.close()
+                files[relative] = None
+                files[woff2_name(relative)] = woff2_name(relative)
+
+            with open(template_dir / stylesheet, 'r', encoding='utf-8') as f:
+                css = f.read()
+            css = FONT_URL_PATTERN.sub(
+                lambda m: f"url({m.group(1)}{woff2_name(m.group(2))}{m.group(1)}) "
+                          f"format({m.group(3)}woff2{m.group(3)})",
+                css
+            )
+            (entry_dir / stylesheet).parent.mkdir(parents=True, exist_ok=True)
+            write_text_if_changed(entry_dir / stylesheet, css)
+            files[stylesheet] = stylesheet
+
+        entry = {'characters': characters, 'files': files}
+        write_text_if_changed(entry_dir / "subset.json", json.dumps(entry, indent=2, ensure_ascii=False))
+        self.encoded += 1
+        return self._load(entry_dir)
+
+    def _load(self, entry_dir: Path) -> Optional[Dict[str, Optional[str]]]:
+        try:
+            with open(entry_dir / "subset.json", 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        files = {}
+        for relative, name in entry['files'].items():
+            files[relative] = str(entry_dir / name) if name is not None else None
+            if name is not None and not Path(files[relative]).exists():
+                return None
+        return files
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number of entries removed."""
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for entry_dir in self.cache_dir.iterdir():
+            if entry_dir.is_dir():
+                shutil.rmtree(entry_dir)
+                removed += 1
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Subset the template fonts to the characters of the manifests, as WOFF2"
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Remove every cached subset"
+    )
+
+    args = parser.parse_args()
+    cache = FontSubsets()
+
+    if args.clear:
+        print(f"Removed {cache.clear()} cached subsets from {cache.cache_dir}")
+        return 0
+
+    from batch_create_lg import carregar_manifestos, textos_dos_manifestos
+    from page_template import DEFAULT_TEMPLATE_DIR
+
+    if not subsetting_available():
+        print("Warning: fontTools not installed, only cached subsets are available.")
+        print("Install with: pip install fonttools brotli")
+
+    characters = used_characters(textos_dos_manifestos(carregar_manifestos()), DEFAULT_TEMPLATE_DIR)
+    start = time.perf_counter()
+    files = cache.overrides(DEFAULT_TEMPLATE_DIR, characters)
+    elapsed = time.perf_counter() - start
+    print(f"Characters ({len(characters)}): {characters}")
+    if files is None:
+        print("Not cached")
+        return 1
+
+    for relative, path in files.items():
+        if path is None:
+            size = (DEFAULT_TEMPLATE_DIR / relative).stat().st_size
+            print(f"  {relative:<40} {size // 1024:>6} KB  (dropped)")
+        else:
+            print(f"  {relative:<40} {Path(path).stat().st_size // 1024:>6} KB")
+    print(f"Subset: {cache.encoded}, cached: {cache.hits} ({elapsed:.2f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -4,70 +4,627 @@ Generate word-level timestamps from audio files using whisper-timestamped.
 
 Usage:
     python generate_timestamps.py <audio_file> [--language pt] [--model base]
+    python generate_timestamps.py --batch <audio_file_or_dir> [...] [--language pt] [--model base] [--jobs N]
+    python generate_timestamps.py <audio_file> --no-cache   # Always run Whisper
+    python generate_timestamps.py <audio_file> --refresh    # Re-transcribe and update the cache
+    python generate_timestamps.py <audio_file> --align-to <text_or_txt_file>
+    python generate_timestamps.py <audio_file> --vad        # Transcribe only the speech regions
+    python generate_timestamps.py <audio_file> --cascade tiny,base,small [--min-confidence 0.6]
 
 Example:
     python scripts/generate_timestamps.py _assets/audios/1_ano/11_lgp21.mp3 --language pt
+    python scripts/generate_timestamps.py --batch _assets/audios/2_ano
+    python scripts/generate_timestamps.py --batch _assets/audios/2_ano --jobs 8
 
 Output:
     JSON file in _timestamps/ folder with word-level timing data.
+    In batch mode the model is loaded once and reused for every file.
+    With --jobs N, files are spread over N worker processes, each with its
+    own model and an equal share of the CPU threads.
+    Transcriptions are cached in _cache/transcriptions by audio hash, model,
+    language and whisper-timestamped version; a cache hit needs no model.
+    With --align-to, the known roteiro text is force-aligned to the audio
+    (no beam search) and exactly one timestamp is produced per roteiro word.
+    Decoded 16 kHz audio is cached in _cache/pcm by audio hash and fed to the
+    model memory-mapped, so trying another model or language skips ffmpeg.
+    With --vad, a cheap energy pass finds the speech regions and only those
+    chunks are streamed through the model; long pauses cost nothing.
+    With --cascade, the first (fast) model transcribes everything and only
+    segments with a word below --min-confidence are re-decoded by the next
+    (larger) model. Per-word confidence is kept in the output. A cascade
+    always transcribes the whole file, so it cannot be combined with
+    --vad or --align-to.
 """
 
 import argparse
-import json
+import hashlib
+import multiprocessing
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterator, List, Dict, Optional
 
-try:
-    import whisper_timestamped as whisper
-except ImportError:
-    print("Error: whisper-timestamped not installed.")
-    print("Install with: pip install openai-whisper whisper-timestamped torch")
-    sys.exit(1)
+from transcription_cache import TranscriptionCache, DEFAULT_MAX_BYTES
+from audio_cache import PcmCache, decode_audio, SAMPLE_RATE
+from vad import detect_speech, speech_chunks
+from timestamp_format import save_timestamp_data
 
+# whisper-timestamped (and torch) are imported on first use, so runs that are
+# fully served from the transcription cache never pay for them.
+whisper = None
 
-def generate_timestamps(audio_path: str, language: str = "pt", model_name: str = "base") -> dict:
+
+def _import_whisper():
+    """Import whisper-timestamped on first use."""
+    global whisper
+    if whisper is None:
+        try:
+            import whisper_timestamped
+        except ImportError:
+            print("Error: whisper-timestamped not installed.")
+            print("Install with: pip install openai-whisper whisper-timestamped torch")
+            sys.exit(1)
+        whisper = whisper_timestamped
+    return whisper
+
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".ogg", ".flac"}
+
+# Forced alignment: max text tokens per 30s window (decoder context is 448)
+MAX_ALIGN_TOKENS = 400
+
+# Forced alignment: words ending this close (seconds) to the end of a window
+# may have been squeezed in by the alignment and are re-aligned in the next one
+ALIGN_EDGE_MARGIN = 1.0
+
+# Forced alignment: cap for a single word, so trailing silence is not absorbed
+MAX_ALIGNED_WORD_DURATION = 2.0
+
+MODEL_NAMES = ["tiny", "base", "small", "medium", "large"]
+
+# Cascade: segments with any word below this confidence go to the next model
+DEFAULT_MIN_CONFIDENCE = 0.6
+
+# Cascade: audio context (seconds) added around a segment that is re-decoded
+CASCADE_PADDING = 0.3
+
+
+def load_model(model_name: str = "base"):
+    """Load a Whisper model once so it can be reused across files."""
+    print(f"Loading Whisper model '{model_name}'...")
+    return _import_whisper().load_model(model_name)
+
+
+class ModelCache:
+    """Whisper models loaded on first use and kept for the rest of the run."""
+
+    def __init__(self):
+        self._models = {}
+
+    def get(self, model_name: str):
+        if model_name not in self._models:
+            self._models[model_name] = load_model(model_name)
+        return self._models[model_name]
+
+
+def cascade_model_names(model_name: str) -> List[str]:
+    """Split a cascade spec ('tiny,base,small') into model names; a plain name gives one."""
+    return [name.strip() for name in model_name.split(",") if name.strip()]
+
+
+def _audio_input(audio_path: str, pcm_cache: Optional[PcmCache]):
+    """Decoded samples as a zero-copy torch tensor when a PCM cache is used, else the path."""
+    if pcm_cache is None:
+        return audio_path
+    import torch
+
+    return torch.from_numpy(pcm_cache.load(audio_path))
+
+
+def _extract_words(result: dict, offset: float = 0.0) -> Iterator[Dict]:
+    """Yield the words of a whisper-timestamped result, shifted by offset seconds."""
+    for segment in result.get("segments", []):
+        for word_info in segment.get("words", []):
+            yield {
+                "word": word_info["text"].strip().upper(),
+                "start": round(word_info["start"] + offset, 3),
+                "end": round(word_info["end"] + offset, 3),
+                "confidence": round(word_info.get("confidence", 1.0), 3)
+            }
+
+
+def _iter_vad_words(model, samples, language: str) -> Iterator[Dict]:
     """
-    Generate word-level timestamps from an audio file.
+    Transcribe only the speech regions of the audio, one chunk at a time.
+
+    Each chunk is a view into the samples; its words are yielded with
+    absolute timestamps before the next chunk is decoded, so only one
+    chunk's result is alive at any time.
+    """
+    import torch
+
+    regions = detect_speech(samples)
+    speech = sum(end - start for start, end in regions)
+    print(f"  Speech: {speech:.2f}s of {len(samples) / SAMPLE_RATE:.2f}s in {len(regions)} regions")
+
+    for start, end in speech_chunks(regions):
+        chunk = samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+        result = _import_whisper().transcribe(model, torch.from_numpy(chunk), language=language)
+        yield from _extract_words(result, offset=start)
+
+
+def transcribe_with_model(model, audio_path: str, language: str = "pt", model_name: str = "base",
+                          pcm_cache: Optional[PcmCache] = None, vad: bool = False) -> dict:
+    """
+    Generate word-level timestamps for one audio file with an already loaded model.
 
     Args:
+        model: Model returned by load_model()
         audio_path: Path to the audio file (mp3, wav, etc.)
         language: Language code (default: "pt" for Portuguese)
-        model_name: Whisper model to use (tiny, base, small, medium, large)
+        model_name: Name of the loaded model, recorded in the output
+        pcm_cache: Decoded audio cache (default: let Whisper decode the file)
+        vad: Transcribe only the speech regions found by vad.detect_speech()
 
     Returns:
         Dictionary with word-level timestamps
     """
-    print(f"Loading Whisper model '{model_name}'...")
-    model = whisper.load_model(model_name)
-
     print(f"Processing audio: {audio_path}")
-    result = whisper.transcribe(model, audio_path, language=language)
 
-    # Extract word-level timestamps
+    if vad:
+        samples = pcm_cache.load(audio_path) if pcm_cache is not None else decode_audio(audio_path)
+        words = list(_iter_vad_words(model, samples, language))
+        duration = round(len(samples) / SAMPLE_RATE, 3)
+        full_text = " ".join(word["word"] for word in words)
+    else:
+        audio = _audio_input(audio_path, pcm_cache)
+        result = _import_whisper().transcribe(model, audio, language=language)
+
+        # Extract word-level timestamps
+        words = list(_extract_words(result))
+        duration = result.get("duration", 0)
+        full_text = result.get("text", "").strip().upper()
+
+    return {
+        "audio_file": os.path.basename(audio_path),
+        "language": language,
+        "model": model_name,
+        "duration": duration,
+        "words": words,
+        "full_text": full_text
+    }
+
+
+def align_with_model(model, audio_path: str, text: str, language: str = "pt", model_name: str = "base",
+                     pcm_cache: Optional[PcmCache] = None) -> dict:
+    """
+    Force-align a known transcript to an audio file with an already loaded model.
+
+    The text is tokenized and aligned with Whisper's cross-attention DTW
+    (whisper.timing.find_alignment), one 30s window at a time, so there is
+    no decoding or beam search. Words are split on whitespace, exactly as the
+    batch builders split the roteiro, and each gets one timestamp.
+
+    Args:
+        model: Model returned by load_model()
+        audio_path: Path to the audio file (mp3, wav, etc.)
+        text: Known transcript (roteiro text)
+        language: Language code (default: "pt" for Portuguese)
+        model_name: Name of the loaded model, recorded in the output
+        pcm_cache: Decoded audio cache (default: decode the file with ffmpeg)
+
+    Returns:
+        Dictionary with word-level timestamps, one entry per word of text
+    """
+    _import_whisper()
+    from whisper.audio import (
+        load_audio, log_mel_spectrogram, pad_or_trim,
+        N_FRAMES, N_SAMPLES, SAMPLE_RATE, FRAMES_PER_SECOND
+    )
+    from whisper.timing import find_alignment
+    from whisper.tokenizer import get_tokenizer
+
+    print(f"Aligning audio: {audio_path}")
+    roteiro_words = text.split()
+    tokenizer = get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language,
+        task="transcribe"
+    )
+    word_tokens = [tokenizer.encode(" " + word) for word in roteiro_words]
+
+    audio = _audio_input(audio_path, pcm_cache)
+    if isinstance(audio, str):
+        audio = load_audio(audio)
+    duration = len(audio) / SAMPLE_RATE
+    mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    total_frames = mel.shape[-1] - N_FRAMES
+    dtype = next(model.parameters()).dtype
+
+    timings = []
+    seek = 0
+    i = 0
+    while i < len(roteiro_words):
+        segment_frames = min(N_FRAMES, total_frames - seek)
+        if segment_frames <= 0:
+            # Audio ran out: pin the remaining words to the end
+            timings.extend((duration, duration) for _ in roteiro_words[i:])
+            break
+
+        # As many words as fit in the decoder context
+        j = i
+        n_tokens = 0
+        while j < len(roteiro_words) and (j == i or n_tokens + len(word_tokens[j]) <= MAX_ALIGN_TOKENS):
+            n_tokens += len(word_tokens[j])
+            j += 1
+
+        mel_segment = pad_or_trim(mel[:, seek:seek + segment_frames], N_FRAMES).to(model.device).to(dtype)
+        tokens = [token for k in range(i, j) for token in word_tokens[k]]
+        alignment = find_alignment(model, tokenizer, tokens, mel_segment, segment_frames)
+
+        # Whisper splits the tokens into (sub)words; map times back per token,
+        # then take first/last token of each roteiro word.
+        token_times = []
+        for timing in alignment:
+            token_times.extend((timing.start, timing.end) for _ in timing.tokens)
+        spans = []
+        position = 0
+        for k in range(i, j):
+            if not word_tokens[k] or not token_times:
+                # Nothing to align (no tokens, or find_alignment returned []):
+                # pin the word to the previous word's end, or the window start
+                pinned = spans[-1][1] if spans else 0.0
+                spans.append((pinned, pinned))
+                continue
+            first = token_times[min(position, len(token_times) - 1)]
+            position += len(word_tokens[k])
+            last = token_times[min(position - 1, len(token_times) - 1)]
+            spans.append((first[0], last[1]))
+
+        window_end = segment_frames / FRAMES_PER_SECOND
+        final_window = seek + segment_frames >= total_frames and j == len(roteiro_words)
+        if final_window:
+            accepted = len(spans)
+        else:
+            accepted = 0
+            while accepted < len(spans) and spans[accepted][1] <= window_end - ALIGN_EDGE_MARGIN:
+                accepted += 1
+            accepted = max(1, accepted)
+
+        offset = seek / FRAMES_PER_SECOND
+        timings.extend((offset + start, offset + end) for start, end in spans[:accepted])
+        i += accepted
+        seek = max(seek + 1, seek + int(round(spans[accepted - 1][1] * FRAMES_PER_SECOND)))
+
     words = []
-    for segment in result.get("segments", []):
-        for word_info in segment.get("words", []):
-            words.append({
-                "word": word_info["text"].strip().upper(),
-                "start": round(word_info["start"], 3),
-                "end": round(word_info["end"], 3)
-            })
+    for word, (start, end) in zip(roteiro_words, timings):
+        end = min(end, start + MAX_ALIGNED_WORD_DURATION)
+        words.append({
+            "word": word.upper(),
+            "start": round(float(start), 3),
+            "end": round(float(end), 3)
+        })
 
     return {
         "audio_file": os.path.basename(audio_path),
         "language": language,
         "model": model_name,
-        "duration": result.get("duration", 0),
+        "alignment": "forced",
+        "duration": round(duration, 3),
         "words": words,
-        "full_text": result.get("text", "").strip().upper()
+        "full_text": " ".join(roteiro_words).upper()
     }
 
 
+def transcribe_cascade(models: ModelCache, audio_path: str, language: str = "pt",
+                       model_names: Optional[List[str]] = None,
+                       min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+                       pcm_cache: Optional[PcmCache] = None) -> dict:
+    """
+    Transcribe with a fast model and re-decode only low-confidence segments with larger ones.
+
+    Every model after the first only sees the segments in which some word
+    is still below min_confidence; its words replace that segment's words.
+    Larger models are loaded only if some segment needs them.
+
+    Args:
+        models: Model cache, so each model is loaded at most once per process
+        audio_path: Path to the audio file (mp3, wav, etc.)
+        language: Language code (default: "pt" for Portuguese)
+        model_names: Models from fastest to most accurate (default: tiny, base, small)
+        min_confidence: Word confidence below which a segment is re-decoded
+        pcm_cache: Decoded audio cache (default: decode the file with ffmpeg)
+
+    Returns:
+        Dictionary with word-level timestamps
+    """
+    import torch
+
+    model_names = model_names or ["tiny", "base", "small"]
+    whisper_module = _import_whisper()
+
+    print(f"Processing audio: {audio_path} (cascade {' -> '.join(model_names)})")
+    samples = pcm_cache.load(audio_path) if pcm_cache is not None else decode_audio(audio_path)
+    duration = len(samples) / SAMPLE_RATE
+
+    result = whisper_module.transcribe(models.get(model_names[0]), torch.from_numpy(samples), language=language)
+    # [start, end, words] per segment
+    segments = [
+        [segment["start"], segment["end"], list(_extract_words({"segments": [segment]}))]
+        for segment in result.get("segments", [])
+    ]
+
+    redecoded = {}
+    for name in model_names[1:]:
+        low = [
+            i for i, (_, _, words) in enumerate(segments)
+            if any(word["confidence"] < min_confidence for word in words)
+        ]
+        if not low:
+            break
+
+        print(f"  Re-decoding {len(low)} of {len(segments)} segments with '{name}'")
+        model = models.get(name)
+        for i in low:
+            # Some context around the segment, without reaching into its neighbours
+            start = max(0.0, segments[i][0] - CASCADE_PADDING)
+            end = min(duration, segments[i][1] + CASCADE_PADDING)
+            if i > 0:
+                start = max(start, segments[i - 1][1])
+            if i + 1 < len(segments):
+                end = min(end, segments[i + 1][0])
+            if end <= start:
+                continue
+
+            chunk = samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+            chunk_result = whisper_module.transcribe(model, torch.from_numpy(chunk), language=language)
+            words = list(_extract_words(chunk_result, offset=start))
+            if words:
+                segments[i][2] = words
+        redecoded[name] = len(low)
+
+    words = [word for _, _, segment_words in segments for word in segment_words]
+    return {
+        "audio_file": os.path.basename(audio_path),
+        "language": language,
+        "model": ",".join(model_names),
+        "cascade": {
+            "min_confidence": min_confidence,
+            "redecoded_segments": redecoded
+        },
+        "duration": round(duration, 3),
+        "words": words,
+        "full_text": " ".join(word["word"] for word in words)
+    }
+
+
+def check_cascade_options(model_names: List[str], align: bool, vad: bool) -> None:
+    """
+    Refuse options a cascade cannot honour: it always transcribes the whole
+    file, so neither forced alignment nor VAD would take effect.
+    """
+    if len(model_names) > 1 and (align or vad):
+        raise ValueError("A cascade cannot be combined with forced alignment or VAD")
+
+
+def process_with_model(models: ModelCache, audio_path: str, language: str, model_name: str,
+                       text: Optional[str] = None, pcm_cache: Optional[PcmCache] = None,
+                       vad: bool = False, min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> dict:
+    """
+    Timestamps of one file with already loaded models, without the cache.
+
+    Force-aligns when a transcript is given, runs the cascade for a cascade
+    spec, else transcribes. Models are loaded into `models` on first use.
+
+    Raises:
+        ValueError: For a cascade with a transcript or with vad
+    """
+    model_names = cascade_model_names(model_name)
+    check_cascade_options(model_names, text is not None, vad)
+    if len(model_names) > 1:
+        return transcribe_cascade(models, audio_path, language=language, model_names=model_names,
+                                  min_confidence=min_confidence, pcm_cache=pcm_cache)
+    if text is not None:
+        return align_with_model(models.get(model_name), audio_path, text, language=language,
+                                model_name=model_name, pcm_cache=pcm_cache)
+    return transcribe_with_model(models.get(model_name), audio_path, language=language,
+                                 model_name=model_name, pcm_cache=pcm_cache, vad=vad)
+
+
+def generate_timestamps(audio_path: str, language: str = "pt", model_name: str = "base",
+                        cache: Optional[TranscriptionCache] = None, align_to: Optional[str] = None,
+                        pcm_cache: Optional[PcmCache] = None, vad: bool = False,
+                        min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> dict:
+    """
+    Generate word-level timestamps from an audio file.
+
+    Args:
+        audio_path: Path to the audio file (mp3, wav, etc.)
+        language: Language code (default: "pt" for Portuguese)
+        model_name: Whisper model to use (tiny, base, small, medium, large), or
+            a comma-separated cascade such as "tiny,base,small" (not with
+            align_to or vad)
+        cache: Transcription cache to read from and write to (default: no cache)
+        align_to: Known transcript to force-align instead of transcribing
+        pcm_cache: Decoded audio cache (default: let Whisper decode the file)
+        vad: Transcribe only the detected speech regions (ignored with align_to)
+        min_confidence: Cascade threshold for re-decoding a segment
+
+    Returns:
+        Dictionary with word-level timestamps
+    """
+    texts = [align_to] if align_to is not None else None
+    return generate_timestamps_batch([audio_path], language=language, model_name=model_name,
+                                     cache=cache, texts=texts, pcm_cache=pcm_cache, vad=vad,
+                                     min_confidence=min_confidence)[0]
+
+
+# Models owned by each worker process in parallel batch mode
+_worker_models = None
+
+
+def _init_worker(model_name: str, threads: int):
+    """Process pool initializer: pin the torch thread count and load the (first) model once."""
+    global _worker_models
+    import torch
+
+    torch.set_num_threads(threads)
+    _worker_models = ModelCache()
+    _worker_models.get(cascade_model_names(model_name)[0])
+
+
+def _transcribe_in_worker(audio_path: str, language: str, model_name: str, text: Optional[str],
+                         pcm_cache: Optional[PcmCache], vad: bool, min_confidence: float) -> dict:
+    """Transcribe (or align) one file with the models owned by this worker process."""
+    return process_with_model(_worker_models, audio_path, language, model_name, text, pcm_cache,
+                              vad, min_confidence)
+
+
+def _transcribe_many(audio_paths: List[str], language: str, model_name: str, jobs: int,
+                     texts: List[Optional[str]], pcm_cache: Optional[PcmCache] = None,
+                     vad: bool = False, min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> List[Dict]:
+    """Transcribe files sequentially or over a process pool, preserving input order."""
+    jobs = max(1, min(jobs, len(audio_paths)))
+    if jobs == 1:
+        models = ModelCache()
+        return [
+            process_with_model(models, str(path), language, model_name, text, pcm_cache, vad, min_confidence)
+            for path, text in zip(audio_paths, texts)
+        ]
+
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    print(f"Starting {jobs} workers with {threads} threads each...")
+
+    # Submit the longest files first so no worker is left with a big file at the end,
+    # but return results in the original order.
+    order = sorted(range(len(audio_paths)), key=lambda i: os.path.getsize(audio_paths[i]), reverse=True)
+
+    # spawn: forking a process that already initialized torch is not safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context,
+                             initializer=_init_worker, initargs=(model_name, threads)) as executor:
+        futures = {
+            i: executor.submit(_transcribe_in_worker, str(audio_paths[i]), language, model_name,
+                               texts[i], pcm_cache, vad, min_confidence)
+            for i in order
+        }
+        return [futures[i].result() for i in range(len(audio_paths))]
+
+
+def generate_timestamps_batch(audio_paths: List[str], language: str = "pt", model_name: str = "base",
+                              jobs: int = 1, cache: Optional[TranscriptionCache] = None,
+                              texts: Optional[List[str]] = None,
+                              pcm_cache: Optional[PcmCache] = None, vad: bool = False,
+                              min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> List[Dict]:
+    """
+    Generate word-level timestamps for many audio files with a single model load.
+
+    Args:
+        audio_paths: Paths to the audio files
+        language: Language code (default: "pt" for Portuguese)
+        model_name: Whisper model to use (tiny, base, small, medium, large), or
+            a comma-separated cascade such as "tiny,base,small" (not with
+            texts or vad)
+        jobs: Number of worker processes; each loads its own model and gets
+            cpu_count // jobs torch threads (default: 1, no pool)
+        cache: Transcription cache; only cache misses are transcribed and
+            no model is loaded when every file is a hit (default: no cache)
+        texts: Known transcripts, one per audio file; when given, each file is
+            force-aligned to its text instead of transcribed (default: None)
+        pcm_cache: Decoded audio cache shared by all files and workers
+            (default: let Whisper decode each file)
+        vad: Transcribe only the speech regions of each file; does not apply
+            to files that are force-aligned (default: False)
+        min_confidence: Cascade threshold for re-decoding a segment
+
+    Returns:
+        List of timestamp dictionaries, in the same order as audio_paths
+
+    Raises:
+        ValueError: For a cascade with texts or with vad
+    """
+    if not audio_paths:
+        return []
+
+    if texts is None:
+        texts = [None] * len(audio_paths)
+    check_cascade_options(cascade_model_names(model_name), any(text is not None for text in texts), vad)
+
+    results: List[Optional[Dict]] = [None] * len(audio_paths)
+    keys = {}
+    pending = []
+
+    for i, path in enumerate(audio_paths):
+        if cache is None:
+            pending.append(i)
+            continue
+
+        extra = ""
+        if len(cascade_model_names(model_name)) > 1:
+            extra = f"cascade:{min_confidence}"
+        elif texts[i] is not None:
+            extra = "align:" + hashlib.sha256(texts[i].encode('utf-8')).hexdigest()
+        elif vad:
+            extra = "vad"
+        keys[i] = cache.key(str(path), model_name, language, extra)
+        cached = cache.get(keys[i])
+        if cached is None:
+            pending.append(i)
+        else:
+            print(f"Cache hit: {path}")
+            results[i] = {"audio_file": os.path.basename(str(path)), **cached}
+
+    if pending:
+        transcribed = _transcribe_many(
+            [str(audio_paths[i]) for i in pending], language, model_name, jobs,
+            [texts[i] for i in pending], pcm_cache, vad, min_confidence
+        )
+        for i, data in zip(pending, transcribed):
+            results[i] = data
+            if cache is not None:
+                # The entry is content-addressed, so the file name is not part of it
+                cache.put(keys[i], {k: v for k, v in data.items() if k != "audio_file"})
+
+    return results
+
+
+def collect_audio_files(inputs: List[str]) -> List[Path]:
+    """Expand files and directories into a sorted list of audio files."""
+    audio_files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            audio_files.extend(
+                sorted(p for p in path.iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS)
+            )
+        else:
+            audio_files.append(path)
+    return audio_files
+
+
+def default_output_path(audio_path: Path) -> Path:
+    """Return _timestamps/<year>/<filename>.json for an audio file."""
+    # Auto-detect year folder from path (e.g., "1_ano" or "2_ano")
+    year_folder = "1_ano"  # default
+    for part in audio_path.parts:
+        if part in ["1_ano", "2_ano"]:
+            year_folder = part
+            break
+
+    # Get script directory to find project root
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    output_dir = project_root / "_timestamps" / year_folder
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    return output_dir / f"{audio_path.stem}.json"
+
+
 def save_timestamps(data: dict, output_path: str):
-    """Save timestamps to JSON file."""
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Save timestamps to a JSON file (or .tsb, by the output suffix)."""
+    save_timestamp_data(data, output_path)
     print(f"Timestamps saved to: {output_path}")
 
 
@@ -77,7 +634,13 @@ def main():
     )
     parser.add_argument(
         "audio_file",
-        help="Path to the audio file (mp3, wav, etc.)"
+        nargs="+",
+        help="Path to the audio file (mp3, wav, etc.); with --batch, files and/or directories"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Transcribe many files (or whole directories) with a single model load"
     )
     parser.add_argument(
         "--language", "-l",
@@ -87,18 +650,140 @@ def main():
     parser.add_argument(
         "--model", "-m",
         default="base",
-        choices=["tiny", "base", "small", "medium", "large"],
+        choices=MODEL_NAMES,
         help="Whisper model size (default: base)"
     )
+    parser.add_argument(
+        "--cascade",
+        metavar="MODELS",
+        help="Comma-separated models from fast to accurate (e.g. tiny,base,small); "
+             "only low-confidence segments reach the larger models. "
+             "Always transcribes the whole file, so not with --vad or --align-to"
+    )
+    parser.add_argument(
+        "--min-confidence",
+        type=float,
+        default=DEFAULT_MIN_CONFIDENCE,
+        help="Cascade: re-decode segments with a word below this confidence (default: %(default)s)"
+    )
     parser.add_argument(
         "--output", "-o",
         help="Output JSON file path (default: _timestamps/<year>/<filename>.json)"
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Worker processes for --batch, one model per worker (default: 1)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the transcription cache"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached transcriptions and overwrite them with fresh ones"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Transcription cache directory (default: _cache/transcriptions)"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Size bound of the transcription cache in MB (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--no-pcm-cache",
+        action="store_true",
+        help="Decode the audio with ffmpeg on every run instead of using _cache/pcm"
+    )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Skip silence: transcribe only the speech regions found by an energy pass"
+    )
+    parser.add_argument(
+        "--align-to",
+        metavar="TEXT",
+        help="Known transcript (text, or path to a .txt file) to force-align instead of transcribing"
+    )
 
     args = parser.parse_args()
 
+    cache = None
+    if not args.no_cache:
+        cache = TranscriptionCache(
+            args.cache_dir,
+            max_bytes=args.cache_max_mb * 1024 * 1024,
+            refresh=args.refresh
+        )
+
+    pcm_cache = None if args.no_pcm_cache else PcmCache()
+
+    model_name = args.model
+    if args.cascade:
+        names = cascade_model_names(args.cascade)
+        unknown = [name for name in names if name not in MODEL_NAMES]
+        if unknown or len(names) < 2:
+            parser.error(f"--cascade needs at least two of: {', '.join(MODEL_NAMES)}")
+        if args.vad or args.align_to is not None:
+            parser.error("--cascade cannot be combined with --vad or --align-to")
+        model_name = ",".join(names)
+
+    align_to = None
+    if args.align_to is not None:
+        align_path = Path(args.align_to)
+        if align_path.suffix == ".txt" and align_path.is_file():
+            align_to = align_path.read_text(encoding="utf-8")
+        else:
+            align_to = args.align_to
+
+    if args.batch:
+        if args.output:
+            parser.error("--output cannot be used with --batch")
+        if align_to is not None:
+            parser.error("--align-to cannot be used with --batch")
+
+        audio_paths = collect_audio_files(args.audio_file)
+        missing = [p for p in audio_paths if not p.exists()]
+        if missing:
+            for path in missing:
+                print(f"Error: Audio file not found: {path}")
+            sys.exit(1)
+        if not audio_paths:
+            print("Error: No audio files found")
+            sys.exit(1)
+
+        results = generate_timestamps_batch(
+            [str(p) for p in audio_paths],
+            language=args.language,
+            model_name=model_name,
+            jobs=args.jobs,
+            cache=cache,
+            pcm_cache=pcm_cache,
+            vad=args.vad,
+            min_confidence=args.min_confidence
+        )
+
+        for audio_path, timestamps in zip(audio_paths, results):
+            save_timestamps(timestamps, str(default_output_path(audio_path)))
+
+        print(f"\nSummary:")
+        print(f"  Files processed: {len(results)}")
+        print(f"  Words detected: {sum(len(r['words']) for r in results)}")
+        if cache is not None:
+            print(f"  Cache hits: {cache.hits}")
+        return
+
+    if len(args.audio_file) > 1:
+        parser.error("multiple audio files require --batch")
+
     # Validate input file
-    audio_path = Path(args.audio_file)
+    audio_path = Path(args.audio_file[0])
     if not audio_path.exists():
         print(f"Error: Audio file not found: {audio_path}")
         sys.exit(1)
@@ -107,28 +792,16 @@ def main():
     timestamps = generate_timestamps(
         str(audio_path),
         language=args.language,
-        model_name=args.model
+        model_name=model_name,
+        cache=cache,
+        align_to=align_to,
+        pcm_cache=pcm_cache,
+        vad=args.vad,
+        min_confidence=args.min_confidence
     )
 
     # Determine output path
-    if args.output:
-        output_path = args.output
-    else:
-        # Auto-detect year folder from path (e.g., "1_ano" or "2_ano")
-        year_folder = "1_ano"  # default
-        path_parts = audio_path.parts
-        for part in path_parts:
-            if part in ["1_ano", "2_ano"]:
-                year_folder = part
-                break
-
-        # Get script directory to find project root
-        script_dir = Path(__file__).parent
-        project_root = script_dir.parent
-        output_dir = project_root / "_timestamps" / year_folder
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        output_path = output_dir / f"{audio_path.stem}.json"
+    output_path = args.output or default_output_path(audio_path)
 
     # Save timestamps
     save_timestamps(timestamps, str(output_path))
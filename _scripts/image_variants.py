@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Responsive WebP/AVIF variants of the page illustrations.
+
+Each illustration is encoded at a few widths (never wider than the
+source, plus the source width itself) as WebP and, where Pillow can
+write it, AVIF. Pages reference them through <picture>/srcset, so a
+tablet downloads a variant sized for its screen instead of the full PNG,
+and the zoom view loads the full-width variant only when it is opened.
+The PNG stays as the fallback for browsers without either format.
+
+Encoded files are cached in _cache/images by the SHA-256 of the source
+image, the encoder settings and the formats written, so an unchanged
+illustration is never encoded twice. Pillow is optional: without it, images that are not in
+the cache yet keep the plain PNG markup.
+
+Usage:
+    python image_variants.py <image> [...]   # Encode images (or find them in the cache)
+    python image_variants.py --all           # Every illustration in _assets/imagens
+    python image_variants.py --clear         # Remove every cached variant
+"""
+
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from atomic_write import write_bytes_if_changed, write_text_if_changed
+from transcription_cache import file_sha256
+
+# Default cache location: <project_root>/_cache/images
+DEFAULT_IMAGE_CACHE_DIR = Path(__file__).parent.parent / "_cache" / "images"
+
+# Target widths in pixels; the source width is always added
+DEFAULT_WIDTHS = (640, 1280)
+
+# Encoder quality per format, and the order the <source> elements are listed in
+QUALITY = {'avif': 55, 'webp': 80}
+MIME_TYPES = {'avif': "image/avif", 'webp': "image/webp"}
+
+# Format version of the cache entries; bump to invalidate old entries
+VARIANTS_FORMAT = 1
+
+Image = None
+
+
+def _import_pil():
+    """Import Pillow on first use; None if it is not installed."""
+    global Image
+    if Image is None:
+        try:
+            from PIL import Image as pil_image
+        except ImportError:
+            return None
+        try:
+            # AVIF for Pillow < 11.2
+            import pillow_avif  # noqa: F401
+        except ImportError:
+            pass
+        Image = pil_image
+    return Image
+
+
+def available_formats() -> List[str]:
+    """Formats the installed Pillow can write, in QUALITY order (empty without Pillow)."""
+    pil = _import_pil()
+    if pil is None:
+        return []
+    pil.init()
+    return [fmt for fmt in QUALITY if fmt.upper() in pil.SAVE]
+
+
+def format_sets() -> List[List[str]]:
+    """Every non-empty set of formats, largest first, each in QUALITY order."""
+    return [list(combination) for size in range(len(QUALITY), 0, -1)
+            for combination in itertools.combinations(QUALITY, size)]
+
+
+def variant_widths(source_width: int, widths: Sequence[int] = DEFAULT_WIDTHS) -> List[int]:
+    return sorted({w for w in widths if w < source_width} | {source_width})
+
+
+class ImageVariants:
+    """Cache of encoded variants, one folder per source image and settings."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, widths: Sequence[int] = DEFAULT_WIDTHS):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_IMAGE_CACHE_DIR
+        self.widths = tuple(widths)
+        self.hits = 0
+        self.encoded = 0
+
+    def key(self, image_path: Path, formats: Sequence[str]) -> str:
+        parts = [
+            f"format={VARIANTS_FORMAT}",
+            f"image={file_sha256(str(image_path))}",
+            f"widths={','.join(map(str, self.widths))}",
+            f"quality={json.dumps(QUALITY, sort_keys=True)}",
+            f"formats={','.join(formats)}",
+        ]
+        return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+    def variants(self, image_path: Path) -> Optional[Dict]:
+        """
+        Variants of an image, from the cache or freshly encoded.
+
+        Entries are keyed by the formats they hold, so a Pillow that gains
+        (or loses) AVIF support encodes a new set instead of reusing the
+        old one. Without Pillow, the richest cached set is used.
+
+        Returns:
+            {"width", "height", "files": [{"format", "width", "path"}]}, or
+            None if the image is not cached and Pillow is not installed
+        """
+        formats = available_formats()
+        for candidate in [formats] if formats else format_sets():
+            entry = self._load(self.cache_dir / self.key(image_path, candidate))
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+        if not formats:
+            return None
+
+        entry_dir = self.cache_dir / self.key(image_path, formats)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        with Image.open(image_path) as source:
+            source.load()
+            if source.mode not in ("RGB", "RGBA"):
+                has_alpha = "A" in source.getbands() or "transparency" in source.info
+                source = source.convert("RGBA" if has_alpha else "RGB")
+            width, height = source.size
+
+            files = []
+            resample = getattr(Image, "Resampling", Image).LANCZOS
+            for target in variant_widths(width, self.widths):
+                resized = source if target == width else \
+                    source.resize((target, round(height * target / width)), resample)
+                for fmt in formats:
+                    buffer = io.BytesIO()
+                    options = {'quality': QUALITY[fmt]}
+                    if fmt == 'webp':
+                        options['method'] = 6
+                    resized.save(buffer, fmt.upper(), **options)
+                    name = f"{target}.{fmt}"
+                    write_bytes_if_changed(entry_dir / name, buffer.getvalue())
+                    files.append({'format': fmt, 'width': target, 'path': name})
+
+        entry = {'width': width, 'height': height, 'files': files}
+        write_text_if_changed(entry_dir / "variants.json", json.dumps(entry, indent=2))
+        self.encoded += 1
+        return self._load(entry_dir)
+
+    def _load(self, entry_dir: Path) -> Optional[Dict]:
+        try:
+            with open(entry_dir / "variants.json", 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        for variant in entry['files']:
+            variant['path'] = str(entry_dir / Path(variant['path']).name)
+            if not Path(variant['path']).exists():
+                return None
+        return entry
+
+    def size(self) -> int:
+        """Total size in bytes of the cached variants."""
+        if not self.cache_dir.exists():
+            return 0
+        return sum(p.stat().st_size for p in self.cache_dir.rglob("*") if p.is_file())
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number of entries removed."""
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for entry_dir in self.cache_dir.iterdir():
+            if entry_dir.is_dir():
+                shutil.rmtree(entry_dir)
+                removed += 1
+        return removed
+
+
+def variant_name(image_name: str, variant: Dict) -> str:
+    """File name of a variant in a page, e.g. 11_lgp40-640.webp."""
+    return f"{Path(image_name).stem}-{variant['width']}.{variant['format']}"
+
+
+def srcsets(image_name: str, entry: Dict, prefix: str = "assets/images/") -> List[tuple]:
+    """(MIME type, srcset) per format, in QUALITY order."""
+    result = []
+    for fmt in QUALITY:
+        files = [v for v in entry['files'] if v['format'] == fmt]
+        if files:
+            result.append((MIME_TYPES[fmt], ", ".join(
+                f"{prefix}{variant_name(image_name, v)} {v['width']}w" for v in files)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Encode responsive WebP/AVIF variants of page illustrations"
+    )
+    parser.add_argument(
+        "images",
+        nargs="*",
+        help="PNG illustrations to encode"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Encode every illustration in _assets/imagens"
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Remove every cached variant"
+    )
+
+    args = parser.parse_args()
+    cache = ImageVariants()
+
+    if args.clear:
+        print(f"Removed {cache.clear()} cached images from {cache.cache_dir}")
+        return 0
+
+    images = [Path(p) for p in args.images]
+    if args.all:
+        images_dir = Path(__file__).parent.parent / "_assets" / "imagens"
+        for year in ['1_ano', '2_ano']:
+            images.extend(sorted((images_dir / year).glob("*.png")))
+    if not images:
+        parser.print_help()
+        return 1
+
+    if not available_formats():
+        print("Warning: Pillow not installed, only cached images are available.")
+        print("Install with: pip install Pillow")
+
+    for image in images:
+        start = time.perf_counter()
+        entry = cache.variants(image)
+        elapsed = time.perf_counter() - start
+        if entry is None:
+            print(f"  {image.name}: not cached")
+            continue
+        original = image.stat().st_size
+        print(f"  {image.name} ({original // 1024} KB, {entry['width']}x{entry['height']}), {elapsed:.2f} s")
+        for variant in entry['files']:
+            print(f"    {variant['width']:>5}w {variant['format']:<5} "
+                  f"{Path(variant['path']).stat().st_size // 1024:>6} KB")
+
+    print(f"Encoded: {cache.encoded}, cached: {cache.hits}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+In-memory build pipeline for a single OED.
+
+The timestamp file is loaded once, handed through the stages in memory
+and, together with the HTML, flushed once at the end. Only files a stage
+actually changed are written.
+
+Stages:
+    postprocess   run the post-processing pass chain over the words
+    trim          cut the leading/trailing silence from the page audio and
+                  shift the words and spans by the same offset (optional,
+                  see silence_trim.py)
+    audio         place the page audio matching the words (and its encodes)
+                  from the source audio, e.g. after the source changed
+    html          rewrite the word spans of index.html with the timestamps
+
+Usage (from regenerate_all.py):
+    python regenerate_all.py --stages postprocess,html   # default
+    python regenerate_all.py --stages html               # only push timestamps into the HTML
+    python regenerate_all.py --stages postprocess,trim,html   # also trim silence
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from postprocess_timestamps import count_gaps, postprocess_data
+from update_html_timestamps import rewrite_spans, find_html_for_timestamp
+from span_index import SpanIndex
+from timestamp_format import load_timestamp_data, save_timestamp_data
+from audio_cache import PcmCache
+from audio_variants import AudioVariants, variant_name as audio_variant_name, variant_suffixes as audio_variant_suffixes
+from build_manifest import audio_for_timestamp
+from silence_trim import TrimmedAudio, shift_words, speech_bounds
+from atomic_write import copy_if_changed, write_text_if_changed
+from page_template import drop_audio_sources
+
+DEFAULT_STAGES = "postprocess,html"
+
+# Stages that read the source audio
+AUDIO_STAGES = ('trim', 'audio')
+
+
+class OedBuild:
+    """State of one OED while it goes through the pipeline."""
+
+    def __init__(self, timestamp_path: Path, project_root: Path, passes: Optional[list] = None,
+                 dry_run: bool = False):
+        self.timestamp_path = timestamp_path
+        self.project_root = project_root
+        self.html_path = find_html_for_timestamp(timestamp_path, project_root)
+        self.passes = passes
+        self.dry_run = dry_run
+
+        self.data = load_timestamp_data(timestamp_path)
+        self.data_changed = False
+        self._html = None
+        self.html_changed = False
+        # Span positions of the current HTML, when a stage knows them
+        self.html_spans = None
+        self.span_index = SpanIndex()
+        # (audio to ship, its place in the page) per file, when a stage changes the page audio
+        self.page_audio: List[tuple] = []
+        # Page audio files no longer matching the words
+        self.stale_audio: List[Path] = []
+
+        self.result = {
+            'file': timestamp_path.name,
+            'success': False,
+            'gaps_fixed': 0,
+            'html_updated': False,
+            'files_modified': 0
+        }
+
+    @property
+    def html(self) -> Optional[str]:
+        """The HTML document, read on first use (None if the OED has no page)."""
+        if self._html is None and self.html_path.exists():
+            with open(self.html_path, 'r', encoding='utf-8') as f:
+                self._html = f.read()
+        return self._html
+
+    @html.setter
+    def html(self, content: str) -> None:
+        self.html_changed = self.html_changed or content != self._html
+        self._html = content
+
+    def flush(self) -> None:
+        """Write the files the stages changed (and whose bytes actually differ)."""
+        if self.dry_run:
+            return
+        if self.data_changed:
+            self.result['files_modified'] += save_timestamp_data(self.data, self.timestamp_path)
+        if self.html_changed:
+            self.result['files_modified'] += write_text_if_changed(self.html_path, self._html)
+        for source, target in self.page_audio:
+            self.result['files_modified'] += copy_if_changed(source, target)
+        for path in self.stale_audio:
+            if path.exists():
+                path.unlink()
+                self.result['files_modified'] += 1
+        if self.html_spans is not None:
+            self.span_index.store(self.html_path, self._html, self.html_spans)
+
+
+def stage_postprocess(build: OedBuild) -> None:
+    words = build.data.get('words', [])
+    if build.dry_run:
+        build.result['gaps_fixed'] = count_gaps(words)
+        print(f"  Would fix {build.result['gaps_fixed']} gaps in {build.timestamp_path.name}")
+        return
+
+    before = [(w['start'], w['end']) for w in words]
+    keys = ('postprocessed', 'gaps_fixed', 'lead_offset', 'lead_clamped')
+    flags = [build.data.get(key) for key in keys]
+    build.result['gaps_fixed'] = postprocess_data(build.data, build.passes)
+    build.data_changed = build.data_changed \
+        or before != [(w['start'], w['end']) for w in words] \
+        or flags != [build.data.get(key) for key in keys]
+
+
+def stage_trim(build: OedBuild) -> None:
+    audio_path = audio_for_timestamp(build.timestamp_path, build.project_root)
+    if not audio_path.exists():
+        return
+    if build.dry_run:
+        print(f"  Would trim the silence of {audio_path.name}")
+        return
+
+    bounds = speech_bounds(PcmCache().load(str(audio_path)))
+    build.data_changed = shift_words(build.data, bounds) or build.data_changed
+    ship_page_audio(build, audio_path)
+    # The spans move with the words, whatever stages follow
+    stage_html(build)
+
+
+def stage_audio(build: OedBuild) -> None:
+    audio_path = audio_for_timestamp(build.timestamp_path, build.project_root)
+    if not audio_path.exists():
+        return
+    if build.dry_run:
+        print(f"  Would place {audio_path.name} in the page")
+        return
+    ship_page_audio(build, audio_path)
+
+
+def ship_page_audio(build: OedBuild, audio_path: Path) -> None:
+    """
+    Place the audio matching the words (trimmed if the data records a cut)
+    in the page, with its Opus/AAC encodes if the page lists them.
+
+    Encodes are rebuilt from that same audio; if they cannot be (no
+    ffmpeg), they are removed along with their <source> entries, so no
+    browser plays audio that does not match the spans.
+    """
+    page_audio = build.html_path.parent / "assets" / "audio" / audio_path.name
+    if not page_audio.exists():
+        return
+    shipped = TrimmedAudio().for_data(audio_path, build.data)
+    build.page_audio = [(shipped, page_audio)]
+
+    encodes = [page_audio.with_suffix(suffix) for suffix in audio_variant_suffixes()
+               if page_audio.with_suffix(suffix).exists()]
+    if not encodes:
+        return
+    entry = AudioVariants().variants(shipped)
+    if entry is not None:
+        for variant in entry['files']:
+            target = page_audio.with_name(audio_variant_name(page_audio.name, variant))
+            build.page_audio.append((Path(variant['path']), target))
+    shipped_names = {target.name for _, target in build.page_audio}
+    build.stale_audio = [path for path in encodes if path.name not in shipped_names]
+    if build.stale_audio and build.html is not None:
+        build.html = drop_audio_sources(build.html, [path.name for path in build.stale_audio])
+
+
+def stage_html(build: OedBuild) -> None:
+    if build.dry_run:
+        print(f"  Would update {build.html_path}")
+        return
+    if build.html is None:
+        return
+
+    spans = build.span_index.spans(build.html_path, build.html)
+    result = rewrite_spans(build.html, spans, build.data.get('words', []))
+    if result is not None:
+        build.html, build.html_spans = result
+        build.result['html_updated'] = True
+
+
+STAGES: Dict[str, Callable[[OedBuild], None]] = {
+    'postprocess': stage_postprocess,
+    'trim': stage_trim,
+    'audio': stage_audio,
+    'html': stage_html,
+}
+
+
+def parse_stages(spec: str) -> List[str]:
+    """
+    Parse a stage list such as "postprocess,html".
+
+    Raises:
+        ValueError: On an unknown stage
+    """
+    stages = [name.strip() for name in spec.split(',') if name.strip()]
+    for name in stages:
+        if name not in STAGES:
+            raise ValueError(f"Unknown stage '{name}' (available: {', '.join(STAGES)})")
+    return stages
+
+
+def run_pipeline(timestamp_path: Path, project_root: Path, stages: Optional[List[str]] = None,
+                 passes: Optional[list] = None, dry_run: bool = False) -> dict:
+    """
+    Build one OED: load, run the stages in order, flush.
+
+    Returns:
+        Dictionary with processing results
+    """
+    stages = stages if stages is not None else parse_stages(DEFAULT_STAGES)
+    try:
+        build = OedBuild(timestamp_path, project_root, passes, dry_run)
+        for name in stages:
+            STAGES[name](build)
+        build.flush()
+        build.result['success'] = True
+        return build.result
+    except Exception as e:
+        return {
+            'file': timestamp_path.name,
+            'success': False,
+            'gaps_fixed': 0,
+            'html_updated': False,
+            'files_modified': 0,
+            'error': str(e)
+        }
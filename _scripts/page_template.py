@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Compiled page template for the reading objects.
+
+Every page is the lgp21 page with other content: the title, the page
+label, the text blocks with their word spans and the names of the page's
+audio and image. Instead of copying lgp21 and patching the copy with
+string replaces, the template is compiled once into literal chunks and
+named slots, and each page is rendered from its data in a single join.
+
+The static files of the template (css, js, fonts, logos) are the same on
+every page. They are placed in one of these ways (the assets mode):
+
+    copy       a copy in each page folder (self-contained pages)
+    hardlink   a hard link to the template's file in each page folder
+    reflink    a copy-on-write clone in each page folder (btrfs, XFS)
+    shared     one copy in shared/, which the pages reference
+
+Only files whose bytes differ are written. A static file a page has
+customized (e.g. its own style.css) is kept and referenced locally.
+Static files can be replaced for every page (e.g. the fonts by their
+WOFF2 subsets and the css by one that loads them, see font_subset.py);
+a page with customized files keeps the template's originals instead.
+
+When the illustration has WebP/AVIF variants (image_variants.py), the
+modal and zoom images become <picture> elements with srcset; when the
+narration has Opus/AAC encodes (audio_variants.py), they are listed as
+<source> entries before the mp3.
+
+Usage:
+    python page_template.py            # List the template slots and time a render
+    python page_template.py --check    # Re-render lgp21 from its own content and compare
+"""
+
+import argparse
+import glob
+import html
+import os
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from atomic_write import copy_if_changed, link_if_changed, write_text_if_changed
+from audio_variants import variant_name as audio_variant_name, variant_suffixes as audio_variant_suffixes
+from image_variants import MIME_TYPES as IMAGE_MIME_TYPES, srcsets, variant_name as image_variant_name
+from word_alignment import align_timestamps
+
+# Default template: <project_root>/1_ano/lgp21
+DEFAULT_TEMPLATE_DIR = Path(__file__).parent.parent / "1_ano" / "lgp21"
+
+# Shared static files for the shared assets mode: <project_root>/shared
+DEFAULT_SHARED_DIR = Path(__file__).parent.parent / "shared"
+
+ASSETS_COPY = "copy"
+ASSETS_HARDLINK = "hardlink"
+ASSETS_REFLINK = "reflink"
+ASSETS_SHARED = "shared"
+ASSET_MODES = (ASSETS_COPY, ASSETS_HARDLINK, ASSETS_REFLINK, ASSETS_SHARED)
+
+# Slot name -> pattern whose first group is the slot in the template page
+SLOT_PATTERNS = {
+    'titulo': r'<title>Leitura Guiada - (.*?)</title>',
+    'artigo': r'(<h1 class="title">.*?</div>)\s*</article>',
+    'audio_source': r'(<source src="assets/audio/[^"]+" type="audio/mpeg">)',
+    'pagina': r'Texto completo - Página ([^<]+)</h2>',
+    'modal_image': r'(<img src="assets/images/(?!logo_)[^"]+"[^>]*id="modal-image">)',
+    'zoom_image': r'(<img src="assets/images/(?!logo_)[^"]+"[^>]*id="zoom-image">)',
+}
+
+# The page's own narration and illustration (not a logo)
+PAGE_AUDIO_PATTERN = r'assets/audio/([^"]+)"'
+PAGE_IMAGE_PATTERN = r'assets/images/(?!logo_)([^"]+)"'
+
+# Rendered width of the illustration, for choosing among its variants
+MODAL_IMAGE_SIZES = "90vw"
+ZOOM_IMAGE_SIZES = "100vw"
+
+# Indentation of the article markup, as in the template
+H1_INDENT = " " * 12
+BLOCK_INDENT = " " * 16
+SPAN_INDENT = " " * 20
+
+# A word and its timestamps
+Span = Tuple[str, float, float]
+
+# Line break inside a block ("\n" in the script), rendered as <br>
+LINE_BREAK = None
+
+# Item of a block: a word, a line break or words kept on one line
+Item = Union[Span, None, List[Span]]
+
+# (tipo, items, or the plain text of a block that is not narrated, inline style)
+Block = Tuple[str, Union[str, List[Item]], Optional[str]]
+
+# Words of a script line, those joined by a no-break space as one group
+NO_BREAK_GROUP = re.compile(r"\S+(?:\u00a0\S+)*")
+
+
+class PageTemplate:
+    """A template page compiled into literal chunks and named slots."""
+
+    def __init__(self, template_dir: Path = DEFAULT_TEMPLATE_DIR):
+        self.template_dir = Path(template_dir)
+        with open(self.template_dir / "index.html", 'r', encoding='utf-8') as f:
+            source = f.read()
+
+        found = []
+        for name, pattern in SLOT_PATTERNS.items():
+            matches = list(re.finditer(pattern, source, flags=re.DOTALL))
+            if not matches:
+                raise ValueError(f"Template {self.template_dir} has no '{name}' slot")
+            found.extend((m.start(1), m.end(1), name) for m in matches)
+
+        # Template files shared by every page (relative POSIX paths), i.e. not the page's own
+        own = {"index.html", "timestamps.json"}
+        own.update(re.findall(PAGE_AUDIO_PATTERN, source))
+        own.update(re.findall(PAGE_IMAGE_PATTERN, source))
+        self.static_files: List[str] = sorted(
+            path.relative_to(self.template_dir).as_posix()
+            for path in self.template_dir.rglob("*")
+            if path.is_file() and path.name not in own
+        )
+        # References to them in the page (the others, e.g. fonts, are used from the css)
+        for relative in self.static_files:
+            for m in re.finditer(rf'(?:href|src)="({re.escape(relative)})"', source):
+                found.append((m.start(1), m.end(1), f"static:{relative}"))
+        found.sort()
+
+        # Alternating literal chunks and slot names: [str, name, str, name, ..., str]
+        self._parts: List[str] = []
+        position = 0
+        for start, end, name in found:
+            if start < position:
+                raise ValueError(f"Overlapping '{name}' slot in template {self.template_dir}")
+            self._parts.append(source[position:start])
+            self._parts.append(name)
+            position = end
+        self._parts.append(source[position:])
+
+        # Values the template page itself fills its slots with
+        self.defaults: Dict[str, str] = {name: source[start:end] for start, end, name in found}
+        self.defaults['audio'] = re.search(PAGE_AUDIO_PATTERN, source).group(1)
+        self.defaults['imagem'] = re.search(PAGE_IMAGE_PATTERN, source).group(1)
+
+    @property
+    def slots(self) -> List[str]:
+        return self._parts[1::2]
+
+    @property
+    def referenced_files(self) -> List[str]:
+        """Static files the page references directly."""
+        return [name[len("static:"):] for name in self.slots if name.startswith("static:")]
+
+    def render(self, titulo: str, pagina: str, blocos: Sequence[Block],
+               audio: str, imagem: str, static_urls: Optional[Dict[str, str]] = None,
+               image_variants: Optional[dict] = None, audio_variants: Optional[dict] = None) -> str:
+        """
+        Render a page.
+
+        Args:
+            titulo: Page title
+            pagina: Page label in the book, e.g. "82 1"
+            blocos: (tipo, items, estilo) per text block, tipo being h1, h2
+                or p (see aligned_blocks)
+            audio: File name of the page audio in assets/audio
+            imagem: File name of the page image in assets/images
+            static_urls: URL of static files not used from the page folder, by
+                relative path (default: all from the page folder)
+            image_variants: Encoded variants of the image (image_variants.py),
+                referenced through <picture>/srcset (default: only the PNG)
+            audio_variants: Encodes of the audio (audio_variants.py), listed as
+                <source> entries before the mp3 (default: only the mp3)
+        """
+        alt = html.escape(f"{titulo} - Texto completo da página {pagina} do livro")
+        values = {
+            'titulo': html.escape(titulo, quote=False),
+            'artigo': render_article(blocos),
+            'audio_source': render_audio_sources(audio, audio_variants, " " * 12),
+            'pagina': pagina,
+            'modal_image': render_image(imagem, f'alt="{alt}" class="modal-image" id="modal-image"',
+                                        image_variants, MODAL_IMAGE_SIZES, " " * 12),
+            'zoom_image': render_zoom_image(imagem, 'alt="Imagem ampliada" id="zoom-image"',
+                                            image_variants, " " * 8),
+        }
+        static_urls = static_urls or {}
+        parts = self._parts[:]
+        parts[1::2] = [
+            static_urls.get(name[len("static:"):], name[len("static:"):]) if name.startswith("static:")
+            else values[name]
+            for name in self._parts[1::2]
+        ]
+        return "".join(parts)
+
+    def write_page(self, dest: Path, assets: str = ASSETS_COPY,
+                   shared_dir: Path = DEFAULT_SHARED_DIR,
+                   static_overrides: Optional[Dict[str, Optional[str]]] = None, **fields) -> int:
+        """
+        Render a page into dest, with its static files and image variants
+        placed per the assets mode.
+
+        Args:
+            dest: Page folder
+            assets: One of ASSET_MODES
+            shared_dir: Folder of the shared static files (shared mode)
+            static_overrides: Replacement file per static file (relative
+                path), None for a static file the pages no longer need; new
+                paths are added to the pages
+            **fields: Arguments of render()
+
+        Returns:
+            Number of files actually written
+        """
+        dest = Path(dest)
+        for directory in ("assets/audio", "assets/images"):
+            (dest / directory).mkdir(parents=True, exist_ok=True)
+
+        overrides = static_overrides or {}
+        sources = {relative: self.template_dir / relative for relative in self.static_files}
+        for relative, replacement in overrides.items():
+            if replacement is None:
+                sources.pop(relative, None)
+            else:
+                sources[relative] = Path(replacement)
+
+        # Files the page has customized stay in the page folder, whatever the mode
+        local = {relative for relative in self.static_files
+                 if _is_customized(self.template_dir / relative, dest / relative)
+                 and (relative not in sources or _is_customized(sources[relative], dest / relative))}
+        if dest.resolve() == self.template_dir.resolve():
+            local = set(self.static_files)
+        written = 0
+        static_urls = {}
+
+        if assets == ASSETS_SHARED:
+            for relative, source in sources.items():
+                (shared_dir / relative).parent.mkdir(parents=True, exist_ok=True)
+                written += copy_if_changed(source, shared_dir / relative)
+            for relative in set(self.static_files) - set(sources):
+                if (shared_dir / relative).exists():
+                    (shared_dir / relative).unlink()
+
+        # A customized file (e.g. css) may reference the template's originals
+        page_sources = sources
+        if local:
+            page_sources = {relative: self.template_dir / relative for relative in self.static_files}
+        for relative in set(self.static_files) - set(page_sources):
+            if (dest / relative).exists():
+                (dest / relative).unlink()
+                _remove_empty_dirs((dest / relative).parent, dest)
+
+        if assets == ASSETS_SHARED:
+            if local:
+                # A customized css still loads the fonts from the page folder
+                local.update(set(self.static_files) - set(self.referenced_files))
+            for relative in page_sources:
+                if relative in local:
+                    continue
+                static_urls[relative] = Path(os.path.relpath(shared_dir / relative, dest)).as_posix()
+                if (dest / relative).exists():
+                    (dest / relative).unlink()
+                    _remove_empty_dirs((dest / relative).parent, dest)
+
+        for relative, source in page_sources.items():
+            if relative in static_urls or (relative in local and (dest / relative).exists()):
+                continue
+            (dest / relative).parent.mkdir(parents=True, exist_ok=True)
+            written += place_file(source, dest / relative,
+                                  ASSETS_COPY if assets == ASSETS_SHARED else assets)
+
+        variant_assets = ASSETS_COPY if assets == ASSETS_SHARED else assets
+        written += _place_variants(dest / "assets" / "images", fields['imagem'],
+                                   fields.get('image_variants'), image_variant_name, "-*",
+                                   [f".{fmt}" for fmt in IMAGE_MIME_TYPES], variant_assets)
+        written += _place_variants(dest / "assets" / "audio", fields['audio'],
+                                   fields.get('audio_variants'), audio_variant_name, ".*",
+                                   audio_variant_suffixes(), variant_assets)
+        written += write_text_if_changed(dest / "index.html", self.render(static_urls=static_urls, **fields))
+        return written
+
+
+def _place_variants(directory: Path, original: str, entry: Optional[dict], name_of,
+                    stale_pattern: str, suffixes: List[str], assets: str) -> int:
+    """Place the cached variants of a page image or audio, removing variants no longer used."""
+    names = {}
+    if entry is not None:
+        names = {name_of(original, variant): Path(variant['path']) for variant in entry['files']}
+    written = 0
+    for name, path in names.items():
+        written += place_file(path, directory / name, assets)
+    for stale in directory.glob(glob.escape(Path(original).stem) + stale_pattern):
+        if stale.suffix in suffixes and stale.name not in names:
+            stale.unlink()
+    return written
+
+
+def _is_customized(template_file: Path, page_file: Path) -> bool:
+    """True if the page has its own, different version of a template file."""
+    try:
+        if os.path.samefile(template_file, page_file):
+            return False
+        if os.path.getsize(template_file) != os.path.getsize(page_file):
+            return True
+    except FileNotFoundError:
+        return False
+    with open(template_file, 'rb') as a, open(page_file, 'rb') as b:
+        return a.read() != b.read()
+
+
+def _remove_empty_dirs(directory: Path, stop: Path) -> None:
+    while directory != stop and directory.exists() and not any(directory.iterdir()):
+        directory.rmdir()
+        directory = directory.parent
+
+
+def place_file(src: Path, dest: Path, assets: str = ASSETS_COPY) -> bool:
+    """
+    Copy, hard link or clone src to dest, skipping it if dest already matches.
+
+    Returns:
+        True if dest was written
+    """
+    if assets in (ASSETS_HARDLINK, ASSETS_REFLINK):
+        return link_if_changed(src, dest, reflink=assets == ASSETS_REFLINK)
+    return copy_if_changed(src, dest)
+
+
+@lru_cache(maxsize=None)
+def load_template(template_dir: Path = DEFAULT_TEMPLATE_DIR) -> PageTemplate:
+    """The compiled template, compiled once per process."""
+    return PageTemplate(template_dir)
+
+
+def render_audio_sources(audio: str, entry: Optional[dict], indent: str) -> str:
+    """The <source> entries of the narration: its encodes, if any, then the mp3."""
+    sources = []
+    if entry is not None:
+        for variant in entry['files']:
+            sources.append(f"<source src=\"assets/audio/{audio_variant_name(audio, variant)}\" "
+                           f"type='{variant['type']}'>")
+    sources.append(f'<source src="assets/audio/{audio}" type="audio/mpeg">')
+    return f"\n{indent}".join(sources)
+
+
+def drop_audio_sources(content: str, names: Sequence[str]) -> str:
+    """A page without the <source> entries (and their lines) of the given files in assets/audio."""
+    for name in names:
+        content = re.sub(rf'\n[ \t]*<source src="assets/audio/{re.escape(name)}"[^>]*>', "", content)
+    return content
+
+
+def render_image(imagem: str, attributes: str, entry: Optional[dict], sizes: str, indent: str) -> str:
+    """
+    An illustration <img>, wrapped in a <picture> with its variants if there are any.
+
+    The <picture> is display: contents, so the page CSS keeps styling the
+    <img> as before.
+    """
+    if entry is None:
+        return f'<img src="assets/images/{imagem}" {attributes}>'
+    parts = ['<picture style="display: contents">']
+    for mime, srcset in srcsets(imagem, entry):
+        parts.append(f'{indent}    <source type="{mime}" srcset="{srcset}" sizes="{sizes}">')
+    parts.append(f'{indent}    <img src="assets/images/{imagem}" {attributes} decoding="async">')
+    parts.append(f'{indent}</picture>')
+    return "\n".join(parts)
+
+
+def render_zoom_image(imagem: str, attributes: str, entry: Optional[dict], indent: str) -> str:
+    """
+    The zoom view's <img>: the illustration at full resolution.
+
+    With variants, the full-width variant of each format and the PNG are
+    only named in data-srcset/data-src, and script.js sets them when the
+    zoom view is first opened, so the largest files are never downloaded
+    for a reader who does not zoom. Without variants the zoom view shows
+    the PNG the modal already loaded.
+    """
+    if entry is None:
+        return f'<img src="assets/images/{imagem}" {attributes}>'
+    full = dict(entry, files=[v for v in entry['files'] if v['width'] == entry['width']])
+    parts = ['<picture style="display: contents">']
+    for mime, srcset in srcsets(imagem, full):
+        parts.append(f'{indent}    <source type="{mime}" data-srcset="{srcset}" sizes="{ZOOM_IMAGE_SIZES}">')
+    parts.append(f'{indent}    <img data-src="assets/images/{imagem}" {attributes} decoding="async">')
+    parts.append(f'{indent}</picture>')
+    return "\n".join(parts)
+
+
+def _span(word: Span) -> str:
+    palavra, start, end = word
+    return f'<span data-start="{start}" data-end="{end}">{html.escape(palavra, quote=False)}</span>'
+
+
+def _spans(spans: Sequence[Item], indent: str) -> str:
+    """The spans of a block, one per line, with <br> at the line breaks and nowrap word groups."""
+    lines = [[]]
+    for item in spans:
+        if item is LINE_BREAK:
+            lines.append([])
+        elif isinstance(item, list):
+            group = f'\n{indent}'.join(_span(w) for w in item)
+            lines[-1].append(f'<span style="white-space: nowrap;">{group}</span>')
+        else:
+            lines[-1].append(_span(item))
+    return f'<br>\n{indent}'.join(f'\n{indent}'.join(line) for line in lines)
+
+
+def _block(tipo: str, spans, estilo: Optional[str], outer: str, inner: str) -> str:
+    """One block: its spans on their own lines, or the plain text of a block that is not narrated."""
+    opening = {'h1': '<h1 class="title"', 'h2': '<h2 class="subtitle"'}.get(tipo, f'<{tipo}')
+    if estilo:
+        opening += f' style="{html.escape(estilo)}"'
+    if isinstance(spans, str):
+        return f'{opening}>{html.escape(spans, quote=False)}</{tipo}>'
+    return f'{opening}>\n{inner}{_spans(spans, inner)}\n{outer}</{tipo}>'
+
+
+def render_article(blocos: Sequence[Block]) -> str:
+    """Markup of the article: the h1 blocks, if any, then the other blocks inside #lyrics."""
+    parts = []
+    for tipo, spans, estilo in blocos:
+        if tipo == 'h1':
+            parts.append(f'{_block(tipo, spans, estilo, H1_INDENT, BLOCK_INDENT)}\n{H1_INDENT}')
+    parts.append('<div class="text-content" id="lyrics" aria-live="polite">\n')
+    for tipo, spans, estilo in blocos:
+        if tipo != 'h1':
+            parts.append(f'{BLOCK_INDENT}{_block(tipo, spans, estilo, BLOCK_INDENT, SPAN_INDENT)}\n')
+    parts.append(f'{H1_INDENT}</div>')
+    return "".join(parts)
+
+
+def narrated(bloco: dict) -> bool:
+    """False for a script block that is shown but not in the recording (e.g. a title)."""
+    return bloco.get('narrado', True)
+
+
+def script_words(bloco: dict) -> List[str]:
+    """The words of a script block, whatever the line breaks and word groups."""
+    return bloco['conteudo'].split()
+
+
+def aligned_blocks(roteiro: List[dict], words: List[dict]) -> List[Block]:
+    """
+    Blocks of a script ({"tipo", "conteudo"}) with the timestamps of each word.
+
+    The script words are aligned to the transcribed words (word_alignment),
+    so a word more or less in the transcription does not shift the rest.
+    In the text, "\n" breaks the line and words joined by a no-break space
+    (U+00A0) are kept on one line. A block with "narrado": false is not
+    aligned and keeps its plain text; "estilo" is the block's inline style.
+    """
+    palavras = [palavra for bloco in roteiro if narrated(bloco) for palavra in script_words(bloco)]
+    alinhadas = iter(align_timestamps(palavras, words))
+    blocos = []
+    for bloco in roteiro:
+        estilo = bloco.get('estilo')
+        if not narrated(bloco):
+            blocos.append((bloco['tipo'], " ".join(script_words(bloco)), estilo))
+            continue
+        spans: List[Item] = []
+        for number, linha in enumerate(bloco['conteudo'].split("\n")):
+            if number:
+                spans.append(LINE_BREAK)
+            for grupo in NO_BREAK_GROUP.findall(linha):
+                grupo_spans = []
+                for palavra in grupo.split("\u00a0"):
+                    word = next(alinhadas)
+                    grupo_spans.append((palavra, word['start'], word['end']))
+                spans.append(grupo_spans if len(grupo_spans) > 1 else grupo_spans[0])
+        blocos.append((bloco['tipo'], spans, estilo))
+    return blocos
+
+
+def _blocks_of_page(content: str) -> List[Block]:
+    """Blocks and spans of a rendered page (for --check)."""
+    article = re.search(SLOT_PATTERNS['artigo'], content, flags=re.DOTALL).group(1)
+    blocos = []
+    for block in re.finditer(r'<(h1|h2|p)\b([^>]*)>(.*?)</\1>', article, flags=re.DOTALL):
+        spans: List[Item] = []
+        for m in re.finditer(r'<span data-start="([^"]*)" data-end="([^"]*)">([^<]*)</span>|<br>', block.group(3)):
+            spans.append((html.unescape(m.group(3)), m.group(1), m.group(2)) if m.group(3) is not None
+                         else LINE_BREAK)
+        if not spans and block.group(3).strip():
+            spans = html.unescape(block.group(3).strip())
+        estilo = re.search(r'style="([^"]*)"', block.group(2))
+        blocos.append((block.group(1), spans, html.unescape(estilo.group(1)) if estilo else None))
+    return blocos
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect the compiled page template"
+    )
+    parser.add_argument(
+        "--template",
+        type=Path,
+        default=DEFAULT_TEMPLATE_DIR,
+        help=f"Template page folder (default: {DEFAULT_TEMPLATE_DIR})"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Re-render the template page from its own content and compare"
+    )
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    template = load_template(args.template)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    with open(args.template / "index.html", 'r', encoding='utf-8') as f:
+        source = f.read()
+    defaults = template.defaults
+    fields = dict(titulo=html.unescape(defaults['titulo']), pagina=defaults['pagina'],
+                  blocos=_blocks_of_page(source), audio=defaults['audio'], imagem=defaults['imagem'])
+
+    if args.check:
+        if template.render(**fields) == source:
+            print(f"{args.template / 'index.html'}: identical")
+            return 0
+        print(f"{args.template / 'index.html'}: differs from its re-rendering")
+        return 1
+
+    print(f"Template: {args.template}")
+    print(f"  Slots: {', '.join(name for name in template.slots if not name.startswith('static:'))}")
+    print(f"  Static files: {', '.join(template.static_files)}")
+    rounds = 1000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        template.render(**fields)
+    print(f"  Compile: {compile_ms:.2f} ms, render: {(time.perf_counter() - start) * 1000 / rounds:.3f} ms/page")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
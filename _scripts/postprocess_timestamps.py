@@ -2,19 +2,176 @@
 """
 Post-process timestamps to fix gaps between words.
 
-This script fills gaps between consecutive words by extending the previous
-word's end time to meet the next word's start time. This ensures smooth
-continuous highlighting without "jumping" during karaoke playback.
+By default this script fills gaps between consecutive words by extending
+the previous word's end time to meet the next word's start time. This
+ensures smooth continuous highlighting without "jumping" during karaoke
+playback.
+
+The starts and ends are loaded into NumPy arrays and run through a chain
+of vectorized passes, written back into the word dicts in place. Passes:
+
+    fill_gaps           extend each word's end to the next word's start
+    split_gaps          close each gap at its midpoint
+    clamp_overlaps      cut each word's end at the next word's start
+    min_duration=S      stretch words shorter than S seconds (up to the next word)
+    lead=S              highlight every word S seconds early (replacing an earlier lead)
 
 Usage:
     python postprocess_timestamps.py <timestamp_json_file>
     python postprocess_timestamps.py --all  # Process all timestamp files
+    python postprocess_timestamps.py --all --passes clamp_overlaps,split_gaps,min_duration=0.08
+
+Timestamp files may be JSON or the binary .tsb format (see timestamp_format.py).
 """
 
 import argparse
-import json
+import sys
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not installed.")
+    print("Install with: pip install numpy")
+    sys.exit(1)
+
+from timestamp_format import load_timestamp_data, save_timestamp_data, iter_timestamp_files
+from atomic_write import modified_count
+
+DEFAULT_PASSES = "fill_gaps"
+
+
+def _fill_gaps(starts: np.ndarray, ends: np.ndarray, value: Optional[float], data: dict) -> None:
+    ends[:-1] = np.maximum(ends[:-1], starts[1:])
+
+
+def _split_gaps(starts: np.ndarray, ends: np.ndarray, value: Optional[float], data: dict) -> None:
+    gap = starts[1:] > ends[:-1]
+    middle = (ends[:-1] + starts[1:]) / 2
+    ends[:-1][gap] = middle[gap]
+    starts[1:][gap] = middle[gap]
+
+
+def _clamp_overlaps(starts: np.ndarray, ends: np.ndarray, value: Optional[float], data: dict) -> None:
+    # Never end before the word's own start, even if the next word starts earlier
+    ends[:-1] = np.maximum(starts[:-1], np.minimum(ends[:-1], starts[1:]))
+
+
+def _min_duration(starts: np.ndarray, ends: np.ndarray, value: Optional[float], data: dict) -> None:
+    target = starts + (value or 0.0)
+    # Stretch into the silence after the word, but not over the next word
+    limit = np.append(starts[1:], np.inf)
+    ends[:] = np.maximum(ends, np.minimum(target, np.maximum(limit, ends)))
+
+
+def _lead(starts: np.ndarray, ends: np.ndarray, value: Optional[float], data: dict) -> None:
+    # Words are clamped at 0; what was cut off is recorded so _unlead can restore them exactly
+    lead = value or 0.0
+    starts -= lead
+    ends -= lead
+    clamped = np.flatnonzero((starts < 0) | (ends < 0))
+    if clamped.size:
+        data['lead_clamped'] = [[int(i), round(min(float(starts[i]), 0.0), 3), round(min(float(ends[i]), 0.0), 3)]
+                                for i in clamped]
+    else:
+        data.pop('lead_clamped', None)
+    np.maximum(starts, 0.0, out=starts)
+    np.maximum(ends, 0.0, out=ends)
+    data['lead_offset'] = lead
+
+
+def _unlead(starts: np.ndarray, ends: np.ndarray, data: dict) -> None:
+    """Put words shifted by an earlier lead pass back on the audio timeline, clamped words included."""
+    lead = data.get('lead_offset', 0.0)
+    starts += lead
+    ends += lead
+    for index, start_cut, end_cut in data.get('lead_clamped', []):
+        if index < len(starts):
+            starts[index] += start_cut
+            ends[index] += end_cut
+
+
+# Pass name -> (function, needs a value)
+PASSES: Dict[str, Tuple[Callable, bool]] = {
+    'fill_gaps': (_fill_gaps, False),
+    'split_gaps': (_split_gaps, False),
+    'clamp_overlaps': (_clamp_overlaps, False),
+    'min_duration': (_min_duration, True),
+    'lead': (_lead, True),
+}
+
+
+def parse_passes(spec: str) -> List[Tuple[str, Optional[float]]]:
+    """
+    Parse a pass chain such as "clamp_overlaps,split_gaps,min_duration=0.08".
+
+    Raises:
+        ValueError: On an unknown pass or a missing/invalid value
+    """
+    passes = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, raw_value = item.partition('=')
+        if name not in PASSES:
+            raise ValueError(f"Unknown pass '{name}' (available: {', '.join(PASSES)})")
+        needs_value = PASSES[name][1]
+        if needs_value and not raw_value:
+            raise ValueError(f"Pass '{name}' needs a value, e.g. {name}=0.05")
+        if raw_value and not needs_value:
+            raise ValueError(f"Pass '{name}' takes no value")
+        passes.append((name, float(raw_value) if raw_value else None))
+    return passes
+
+
+def _word_arrays(words: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    starts = np.fromiter((w['start'] for w in words), dtype=np.float64, count=len(words))
+    ends = np.fromiter((w['end'] for w in words), dtype=np.float64, count=len(words))
+    return starts, ends
+
+
+def _gap_count(starts: np.ndarray, ends: np.ndarray) -> int:
+    return int(np.count_nonzero(starts[1:] - ends[:-1] > 0))
+
+
+def count_gaps(words: List[Dict]) -> int:
+    """Number of consecutive word pairs with silence between them."""
+    return _gap_count(*_word_arrays(words))
+
+
+def apply_passes(data: dict, passes: Optional[List[Tuple[str, Optional[float]]]] = None) -> int:
+    """
+    Run a pass chain over the words of a timestamp dict, in place.
+
+    Args:
+        data: Timestamp data with a 'words' list; the word dicts are updated in place
+        passes: Parsed pass chain (default: fill_gaps)
+
+    Returns:
+        Number of gaps before processing
+    """
+    words = data.get('words', [])
+    if passes is None:
+        passes = parse_passes(DEFAULT_PASSES)
+    if not words:
+        return 0
+
+    starts, ends = _word_arrays(words)
+    # A lead pass applies its lead to the audio timeline, not on top of the previous one
+    if any(name == 'lead' for name, _ in passes):
+        _unlead(starts, ends, data)
+    gaps_before = _gap_count(starts, ends)
+
+    for name, value in passes:
+        PASSES[name][0](starts, ends, value, data)
+
+    for word, start, end in zip(words, np.round(starts, 3).tolist(), np.round(ends, 3).tolist()):
+        word['start'] = start
+        word['end'] = end
+
+    return gaps_before
 
 
 def fix_gaps(words: List[Dict]) -> List[Dict]:
@@ -26,77 +183,74 @@ def fix_gaps(words: List[Dict]) -> List[Dict]:
 
     This ensures continuous highlighting without dead time.
     Fast words remain fast - we don't enforce minimum durations.
+    The word dicts are updated in place and the same list is returned.
     """
-    if not words or len(words) < 2:
-        return words
-
-    fixed = [word.copy() for word in words]
+    apply_passes({'words': words}, [('fill_gaps', None)])
+    return words
 
-    for i in range(len(fixed) - 1):
-        current_end = fixed[i]['end']
-        next_start = fixed[i + 1]['start']
 
-        gap = next_start - current_end
+def postprocess_data(data: dict, passes: Optional[List[Tuple[str, Optional[float]]]] = None) -> int:
+    """
+    Apply the pass chain to timestamp data and mark it as post-processed.
 
-        if gap > 0:
-            # Fill the gap by extending current word's end
-            fixed[i]['end'] = next_start
+    gaps_fixed is only updated when the passes change the words, so
+    re-running on already processed data leaves the file as it is.
 
-    return fixed
+    Returns:
+        Number of gaps before processing
+    """
+    before = [(w['start'], w['end']) for w in data.get('words', [])]
+    gaps_before = apply_passes(data, passes)
+    data['postprocessed'] = True
+    if 'gaps_fixed' not in data or before != [(w['start'], w['end']) for w in data.get('words', [])]:
+        data['gaps_fixed'] = gaps_before
+    return gaps_before
 
 
-def process_timestamp_file(input_path: str, output_path: str = None) -> dict:
+def process_timestamp_file(input_path: str, output_path: str = None,
+                           passes: Optional[List[Tuple[str, Optional[float]]]] = None) -> dict:
     """
-    Process a single timestamp JSON file.
+    Process a single timestamp file (JSON or .tsb).
 
     Args:
-        input_path: Path to input JSON file
-        output_path: Path to output JSON file (defaults to overwriting input)
+        input_path: Path to input timestamp file
+        output_path: Path to output file, format by suffix (defaults to overwriting input;
+            an unchanged file is not rewritten)
+        passes: Parsed pass chain (default: fill_gaps)
 
     Returns:
         Processed timestamp data
     """
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_timestamp_data(input_path)
 
-    original_words = data.get('words', [])
-
-    # Count gaps before processing
-    gaps_before = sum(
-        1 for i in range(len(original_words) - 1)
-        if original_words[i + 1]['start'] - original_words[i]['end'] > 0
-    )
-
-    # Apply gap fixing
-    data['words'] = fix_gaps(original_words)
-
-    # Mark as post-processed
-    data['postprocessed'] = True
-    data['gaps_fixed'] = gaps_before
+    postprocess_data(data, passes)
 
     # Save
-    output_path = output_path or input_path
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    save_timestamp_data(data, output_path or input_path)
 
     return data
 
 
-def process_all_timestamps(timestamps_dir: Path) -> None:
+def process_all_timestamps(timestamps_dir: Path,
+                           passes: Optional[List[Tuple[str, Optional[float]]]] = None) -> None:
     """Process all timestamp files in the directory."""
+    modified_before = modified_count()
+
     for year_dir in ['1_ano', '2_ano']:
         year_path = timestamps_dir / year_dir
         if not year_path.exists():
             continue
 
-        for json_file in sorted(year_path.glob('*.json')):
+        for json_file in iter_timestamp_files(year_path):
             print(f"Processing: {json_file.name}...", end=' ')
             try:
-                result = process_timestamp_file(str(json_file))
+                result = process_timestamp_file(str(json_file), passes=passes)
                 print(f"OK (fixed {result.get('gaps_fixed', 0)} gaps)")
             except Exception as e:
                 print(f"ERROR: {e}")
 
+    print(f"\nFiles modified: {modified_count() - modified_before}")
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -116,9 +270,20 @@ def main():
         "--output", "-o",
         help="Output file path (defaults to overwriting input)"
     )
+    parser.add_argument(
+        "--passes",
+        default=DEFAULT_PASSES,
+        help="Comma-separated pass chain, e.g. clamp_overlaps,split_gaps,min_duration=0.08 "
+             "(default: %(default)s)"
+    )
 
     args = parser.parse_args()
 
+    try:
+        passes = parse_passes(args.passes)
+    except ValueError as e:
+        parser.error(str(e))
+
     if args.all:
         # Find project root
         script_dir = Path(__file__).parent
@@ -129,14 +294,14 @@ def main():
             print(f"Error: Timestamps directory not found: {timestamps_dir}")
             return 1
 
-        process_all_timestamps(timestamps_dir)
+        process_all_timestamps(timestamps_dir, passes)
     elif args.file:
         input_path = Path(args.file)
         if not input_path.exists():
             print(f"Error: File not found: {input_path}")
             return 1
 
-        result = process_timestamp_file(str(input_path), args.output)
+        result = process_timestamp_file(str(input_path), args.output, passes)
         print(f"Processed: {input_path.name}")
         print(f"  Words: {len(result.get('words', []))}")
         print(f"  Gaps fixed: {result.get('gaps_fixed', 0)}")
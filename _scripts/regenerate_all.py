@@ -11,76 +11,161 @@ Usage:
     python regenerate_all.py --year 1_ano # Process only 1_ano
     python regenerate_all.py --file lgp36 # Process single file
     python regenerate_all.py --dry-run    # Show what would be done
+    python regenerate_all.py --incremental  # Rebuild only OEDs whose inputs changed
+    python regenerate_all.py --stages html  # Run only some pipeline stages
+    python regenerate_all.py --jobs 8       # Build 8 OEDs at a time
+    python regenerate_all.py --watch        # Rebuild an OED whenever one of its files changes
+
+Timestamp files may be JSON or the binary .tsb format (see timestamp_format.py).
 """
 
 import argparse
-import json
+import contextlib
+import io
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import time
 import sys
 
 # Add script directory to path for imports
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir))
 
-from postprocess_timestamps import fix_gaps, process_timestamp_file
-from update_html_timestamps import update_html_with_timestamps, find_html_for_timestamp
+from postprocess_timestamps import parse_passes, DEFAULT_PASSES
+from update_html_timestamps import find_html_for_timestamp
+from build_manifest import BuildManifest, manifest_key, oed_fingerprint
+from timestamp_format import iter_timestamp_files, companion_path, TIMESTAMP_SUFFIXES
+from oed_pipeline import run_pipeline, parse_stages, DEFAULT_STAGES, AUDIO_STAGES
+from transcription_cache import file_sha256
+from watch_mode import (OedIndex, open_watcher, watched_directories, debounced_changes,
+                        AUDIO_SUFFIXES)
 
 
-def process_single_oed(timestamp_path: Path, project_root: Path, dry_run: bool = False) -> dict:
+def process_single_oed(timestamp_path: Path, project_root: Path, dry_run: bool = False,
+                       passes: list = None, stages: list = None) -> dict:
     """
     Process a single OED: fix timestamps and update HTML.
 
+    The OED goes through the in-memory pipeline (see oed_pipeline.py): the
+    timestamps are loaded once, post-processed with the pass chain (default:
+    fill_gaps), pushed into the HTML and both files are written once.
+
     Returns:
         Dictionary with processing results
     """
-    result = {
-        'file': timestamp_path.name,
-        'success': False,
-        'gaps_fixed': 0,
-        'html_updated': False
-    }
-
-    try:
-        # Step 1: Read and analyze timestamps
-        with open(timestamp_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        words = data.get('words', [])
+    return run_pipeline(timestamp_path, project_root, stages, passes, dry_run)
 
-        # Count gaps
-        gaps = sum(
-            1 for i in range(len(words) - 1)
-            if words[i + 1]['start'] - words[i]['end'] > 0
-        )
-        result['gaps_fixed'] = gaps
 
-        if dry_run:
-            print(f"  Would fix {gaps} gaps in {timestamp_path.name}")
-            html_path = find_html_for_timestamp(timestamp_path, project_root)
-            print(f"  Would update {html_path}")
-            result['success'] = True
-            return result
-
-        # Step 2: Fix gaps and save
-        data['words'] = fix_gaps(words)
-        data['postprocessed'] = True
-        data['gaps_fixed'] = gaps
+def _build_captured(timestamp_path: Path, project_root: Path, dry_run: bool,
+                    passes: list, stages: list) -> Tuple[dict, str]:
+    """Build one OED and return its result with everything it printed."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = process_single_oed(timestamp_path, project_root, dry_run, passes, stages)
+    return result, output.getvalue()
 
-        with open(timestamp_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
 
-        # Step 3: Update HTML
-        html_path = find_html_for_timestamp(timestamp_path, project_root)
-        if html_path.exists():
-            update_html_with_timestamps(str(html_path), data['words'])
-            result['html_updated'] = True
+def build_oeds(timestamp_paths: List[Path], project_root: Path, jobs: int = 1,
+               dry_run: bool = False, passes: list = None, stages: list = None) -> Iterator[Tuple[dict, str]]:
+    """
+    Build OEDs, sequentially or over a process pool.
 
-        result['success'] = True
+    Yields (result, captured output) per OED in input order, as soon as that
+    OED and all before it are done, so the console output stays per file.
+    """
+    jobs = max(1, min(jobs, len(timestamp_paths)))
+    if jobs == 1:
+        for timestamp_path in timestamp_paths:
+            yield _build_captured(timestamp_path, project_root, dry_run, passes, stages)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(_build_captured, timestamp_path, project_root, dry_run, passes, stages)
+            for timestamp_path in timestamp_paths
+        ]
+        for future in futures:
+            yield future.result()
+
+
+def _status_line(result: dict) -> str:
+    if not result['success']:
+        return f"  -> ERROR: {result.get('error', 'Unknown error')}"
+    status = "OK"
+    if result['gaps_fixed'] > 0:
+        status += f" (fixed {result['gaps_fixed']} gaps)"
+    if result.get('html_updated'):
+        status += " [HTML updated]"
+    return f"  -> {status}"
+
+
+def watch(project_root: Path, dry_run: bool = False, passes: list = None, stages: list = None,
+          poll: bool = False) -> None:
+    """
+    Rebuild OEDs as their files change, until interrupted.
+
+    A changed timestamp file reruns every stage for its OED; a hand-edited
+    index.html reruns only the stages after post-processing; a changed
+    source audio reruns the stages that read it (trim, or else audio, which
+    places it in the page). Files this process just wrote are recognised
+    by their content hash and ignored. Page folders created meanwhile are
+    watched as well.
+    """
+    stages = stages if stages is not None else parse_stages(DEFAULT_STAGES)
+    index = OedIndex(project_root)
+    directories = watched_directories(project_root)
+    watcher = open_watcher(directories, poll)
+    print(f"Watching {len(directories)} folders for changes (Ctrl+C to stop)...")
 
-    except Exception as e:
-        result['error'] = str(e)
+    # Content hash of every file the last builds wrote
+    written: Dict[Path, str] = {}
 
-    return result
+    try:
+        for batch in debounced_changes(watcher):
+            if watcher.take_new_directories():
+                # New page folders may belong to OEDs not indexed yet
+                index.refresh()
+            builds: Dict[Path, List[str]] = {}
+            for path in sorted(batch):
+                if not path.exists() or written.get(path.resolve()) == file_sha256(str(path)):
+                    continue
+
+                timestamp_path = index.timestamp_for(path)
+                if timestamp_path is None:
+                    continue
+                if path.suffix in AUDIO_SUFFIXES:
+                    print(f"{time.strftime('%H:%M:%S')} {path.name} changed: the words still come from the "
+                          f"old audio, re-run generate_timestamps.py for {timestamp_path.name} if it was re-recorded")
+                    needed = [s for s in stages if s in AUDIO_STAGES] or ['audio']
+                elif path.name == "index.html":
+                    needed = [s for s in stages if s != 'postprocess']
+                else:
+                    needed = stages
+                merged = builds.setdefault(timestamp_path, [])
+                order = stages + [s for s in AUDIO_STAGES if s not in stages]
+                builds[timestamp_path] = [s for s in order if s in merged or s in needed]
+
+            for timestamp_path, oed_stages in builds.items():
+                if not oed_stages:
+                    continue
+                print(f"{time.strftime('%H:%M:%S')} Processing: {timestamp_path.name} ({', '.join(oed_stages)})")
+                result, output = _build_captured(timestamp_path, project_root, dry_run, passes, oed_stages)
+                print(output, end='')
+                print(_status_line(result))
+
+                html_path = find_html_for_timestamp(timestamp_path, project_root)
+                for path in [timestamp_path, companion_path(timestamp_path), html_path]:
+                    if path.exists():
+                        written[path.resolve()] = file_sha256(str(path))
+
+            if any(path.suffix in TIMESTAMP_SUFFIXES for path in batch):
+                # New timestamp files may map to new pages
+                index.refresh()
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        watcher.close()
 
 
 def main():
@@ -101,9 +186,47 @@ def main():
         action="store_true",
         help="Show what would be done without making changes"
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip OEDs whose audio, timestamps, roteiro, template, passes and stages are unchanged since the last build"
+    )
+    parser.add_argument(
+        "--passes",
+        default=DEFAULT_PASSES,
+        help="Post-processing pass chain, e.g. clamp_overlaps,split_gaps,min_duration=0.08 "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        "--stages",
+        default=DEFAULT_STAGES,
+        help="Pipeline stages to run, in order (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Number of OEDs built in parallel worker processes (default: 1)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the build, keep watching and rebuild each OED whose files change"
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll modification times instead of using inotify"
+    )
 
     args = parser.parse_args()
 
+    try:
+        passes = parse_passes(args.passes)
+        stages = parse_stages(args.stages)
+    except ValueError as e:
+        parser.error(str(e))
+
     project_root = script_dir.parent
     timestamps_dir = project_root / "_timestamps"
 
@@ -117,11 +240,11 @@ def main():
     if args.file:
         # Single file
         file_pattern = args.file
-        if not file_pattern.endswith('.json'):
+        if not file_pattern.endswith(TIMESTAMP_SUFFIXES):
             # Try to find matching file
             for year in ['1_ano', '2_ano']:
                 year_path = timestamps_dir / year
-                for json_file in year_path.glob('*.json'):
+                for json_file in iter_timestamp_files(year_path):
                     if args.file in json_file.stem:
                         files_to_process.append(json_file)
                         break
@@ -135,7 +258,7 @@ def main():
         for year in years:
             year_path = timestamps_dir / year
             if year_path.exists():
-                files_to_process.extend(sorted(year_path.glob('*.json')))
+                files_to_process.extend(iter_timestamp_files(year_path))
 
     if not files_to_process:
         print("No files to process")
@@ -145,36 +268,70 @@ def main():
 
     # Process files
     total_gaps = 0
+    files_modified = 0
     success_count = 0
     error_count = 0
+    skipped = []
+
+    manifest = BuildManifest() if args.incremental else None
 
+    # Decide what to build (and why) before any work starts
+    pending = []
     for timestamp_path in files_to_process:
-        print(f"Processing: {timestamp_path.name}")
-        result = process_single_oed(timestamp_path, project_root, args.dry_run)
+        if manifest is not None:
+            key = manifest_key(timestamp_path, project_root)
+            html_path = find_html_for_timestamp(timestamp_path, project_root)
+            fingerprint = oed_fingerprint(timestamp_path, html_path, project_root, passes, stages)
+            if manifest.is_current(key, fingerprint):
+                skipped.append(timestamp_path.name)
+                continue
+            changed = manifest.changed_inputs(key, fingerprint)
+            pending.append((timestamp_path, f"Processing: {timestamp_path.name} (changed: {', '.join(changed)})"))
+        else:
+            pending.append((timestamp_path, f"Processing: {timestamp_path.name}"))
+
+    builds = build_oeds([path for path, _ in pending], project_root, args.jobs,
+                        args.dry_run, passes, stages)
+
+    for (timestamp_path, header), (result, output) in zip(pending, builds):
+        print(header)
+        print(output, end='')
+
+        if result['success'] and manifest is not None and not args.dry_run:
+            # Record the inputs as they are after this build
+            html_path = find_html_for_timestamp(timestamp_path, project_root)
+            manifest.record(manifest_key(timestamp_path, project_root),
+                            oed_fingerprint(timestamp_path, html_path, project_root, passes, stages))
 
         if result['success']:
             success_count += 1
             total_gaps += result['gaps_fixed']
-            status = "OK"
-            if result['gaps_fixed'] > 0:
-                status += f" (fixed {result['gaps_fixed']} gaps)"
-            if result.get('html_updated'):
-                status += " [HTML updated]"
-            print(f"  -> {status}")
+            files_modified += result.get('files_modified', 0)
         else:
             error_count += 1
-            print(f"  -> ERROR: {result.get('error', 'Unknown error')}")
+        print(_status_line(result))
 
     # Summary
     print(f"\n{'='*50}")
     print(f"Summary:")
     print(f"  Files processed: {success_count}")
     print(f"  Total gaps fixed: {total_gaps}")
+    print(f"  Files modified: {files_modified}")
     print(f"  Errors: {error_count}")
+    if manifest is not None:
+        print(f"  Skipped (unchanged): {len(skipped)}")
+        if skipped:
+            print(f"    {', '.join(skipped)}")
+        if not args.dry_run:
+            manifest.save()
 
     if args.dry_run:
         print(f"\nThis was a dry run. No files were modified.")
 
+    if args.watch:
+        print()
+        watch(project_root, args.dry_run, passes, stages, args.poll)
+
     return 0 if error_count == 0 else 1
 
 
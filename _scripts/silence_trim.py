@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Trim the leading and trailing silence of the narration audio.
+
+Many recordings open with a second or more of silence, so the first
+highlighted word starts well after play is pressed. The speech bounds are
+found with the energy VAD (vad.py) on the cached 16 kHz PCM, the shipped
+mp3 is cut to them and every word is shifted by the same offset, so the
+timestamps, the data-start/data-end spans and the audio stay consistent
+without re-transcribing anything.
+
+The source audio in _assets/audios is never modified. The applied cut is
+recorded in the timestamp data (trim_offset, trim_end, in seconds of the
+source audio, and trim_clamped for words cut off at either end), so
+running the trim again shifts only the difference, and the page builder
+ships the matching trimmed mp3. Trimmed files are cached
+in _cache/trim by the SHA-256 of the source audio and the cut.
+
+Usage (from regenerate_all.py):
+    python regenerate_all.py --stages postprocess,trim,html
+
+    python silence_trim.py <audio_file> [...]   # Show the silence that would be trimmed
+"""
+
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not installed.")
+    print("Install with: pip install numpy")
+    sys.exit(1)
+
+from audio_variants import ffmpeg_available, probe_duration
+from transcription_cache import file_sha256
+from vad import SAMPLE_RATE, detect_speech
+
+# Default cache location: <project_root>/_cache/trim
+DEFAULT_TRIM_CACHE_DIR = Path(__file__).parent.parent / "_cache" / "trim"
+
+# Silence shorter than this (seconds) at either end is left alone
+MIN_TRIM = 0.15
+
+# Encoder settings of the trimmed mp3
+MP3_ARGUMENTS = ["-c:a", "libmp3lame", "-q:a", "2"]
+
+# Largest accepted difference (seconds) between the trimmed file and the cut length
+MAX_DURATION_DRIFT = 0.05
+
+
+def speech_bounds(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Optional[Tuple[float, float]]:
+    """
+    The part of a recording to keep: from the start of the first speech
+    region to the end of the last one (VAD padding included).
+
+    Returns:
+        (start, end) in seconds, rounded to milliseconds, or None if there
+        is no speech or too little silence to be worth a cut
+    """
+    regions = detect_speech(samples, sample_rate)
+    if not regions:
+        return None
+    duration = len(samples) / sample_rate
+    start, end = regions[0][0], regions[-1][1]
+    if start < MIN_TRIM:
+        start = 0.0
+    if duration - end < MIN_TRIM:
+        end = duration
+    if start == 0.0 and end == duration:
+        return None
+    return round(start, 3), round(end, 3)
+
+
+def shift_words(data: dict, bounds: Optional[Tuple[float, float]]) -> bool:
+    """
+    Move the words of timestamp data onto the timeline of the trimmed audio.
+
+    The cut already applied is read from the data and undone first, so
+    changing the cut never shifts a word twice; bounds None only undoes it.
+    Words are clamped to the trimmed audio, and what the clamp cut off is
+    recorded per word (trim_clamped), so undoing the cut restores them
+    exactly.
+
+    Returns:
+        True if the data changed
+    """
+    start, end = bounds if bounds is not None else (0.0, None)
+    previous = data.get('trim_offset', 0.0)
+    if (previous, data.get('trim_end')) == (start, end):
+        return False
+
+    cut = {index: (start_cut, end_cut) for index, start_cut, end_cut in data.get('trim_clamped', [])}
+    limit = round(end - start, 3) if end is not None else None
+    clamped = []
+    for index, word in enumerate(data.get('words', [])):
+        cut_off = cut.get(index, (0.0, 0.0))
+        shifted = []
+        for field, field_cut in zip(('start', 'end'), cut_off):
+            # Source timeline, then the new cut's timeline
+            value = round(word[field] + field_cut + previous - start, 3)
+            kept = max(0.0, min(value, limit) if limit is not None else value)
+            shifted.append(round(value - kept, 3))
+            word[field] = kept
+        if shifted != [0.0, 0.0]:
+            clamped.append([index, *shifted])
+
+    if bounds is None:
+        data.pop('trim_offset', None)
+        data.pop('trim_end', None)
+    else:
+        data['trim_offset'], data['trim_end'] = start, end
+    if clamped:
+        data['trim_clamped'] = clamped
+    else:
+        data.pop('trim_clamped', None)
+    return True
+
+
+class TrimmedAudio:
+    """Cache of trimmed mp3 files, one per source file and cut."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_TRIM_CACHE_DIR
+
+    def key(self, audio_path: Path, start: float, end: float) -> str:
+        parts = [
+            f"audio={file_sha256(str(audio_path))}",
+            f"cut={start:.3f}-{end:.3f}",
+            f"encoder={' '.join(MP3_ARGUMENTS)}",
+        ]
+        return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+    def trimmed(self, audio_path: Path, start: float, end: float) -> Path:
+        """
+        The source audio cut to [start, end], from the cache or freshly encoded.
+
+        Raises:
+            RuntimeError: If ffmpeg is missing or the result does not have the cut's length
+        """
+        output = self.cache_dir / f"{self.key(audio_path, start, end)}.mp3"
+        if output.exists():
+            return output
+        if not ffmpeg_available():
+            raise RuntimeError(f"ffmpeg not found, cannot trim {audio_path}")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_output = output.with_name(f".{output.stem}.tmp.mp3")
+        # atrim cuts at the sample, unlike seeking, which snaps to mp3 frames
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", str(audio_path),
+             "-vn", "-af", f"atrim=start={start:.3f}:end={end:.3f},asetpts=PTS-STARTPTS",
+             *MP3_ARGUMENTS, str(tmp_output)],
+            check=True
+        )
+        drift = abs(probe_duration(tmp_output) - (end - start))
+        if drift > MAX_DURATION_DRIFT:
+            tmp_output.unlink()
+            raise RuntimeError(f"Trimmed {audio_path} is {drift:.3f} s off the cut length")
+        os.replace(tmp_output, output)
+        return output
+
+    def for_data(self, audio_path: Path, data: Optional[dict]) -> Path:
+        """The audio that matches timestamp data: trimmed if the data records a cut."""
+        if not data or 'trim_offset' not in data:
+            return audio_path
+        return self.trimmed(audio_path, data['trim_offset'], data['trim_end'])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Show the leading and trailing silence of narration audio"
+    )
+    parser.add_argument("audio_files", nargs="+", help="Narration mp3 files")
+
+    args = parser.parse_args()
+
+    from audio_cache import PcmCache
+
+    cache = PcmCache()
+    total = 0.0
+    for audio_file in args.audio_files:
+        samples = cache.load(audio_file)
+        duration = len(samples) / SAMPLE_RATE
+        bounds = speech_bounds(samples)
+        if bounds is None:
+            print(f"  {Path(audio_file).name}: nothing to trim ({duration:.2f}s)")
+            continue
+        start, end = bounds
+        total += start + duration - end
+        print(f"  {Path(audio_file).name}: keep {start:.2f}s - {end:.2f}s of {duration:.2f}s "
+              f"(lead {start:.2f}s, tail {duration - end:.2f}s)")
+    print(f"\nSilence to trim: {total:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Sidecar index of the word spans of each generated index.html.
+
+Updating timestamps only needs to know where the word spans are and which
+word each holds. This index keeps those positions per page in
+_cache/span_index, together with the SHA-256 of the HTML they were taken
+from. A page whose hash still matches is updated straight from the index,
+without running the span regex over the document; after an update the
+index is refreshed with the new positions. A hand-edited page no longer
+matches its hash and is simply re-scanned.
+
+Usage:
+    python span_index.py <html_file> [...]   # Build (or validate) the index of pages
+    python span_index.py --clear             # Remove every index entry
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import List, Optional
+
+from atomic_write import write_text_if_changed
+from update_html_timestamps import Span, scan_spans
+
+# Default index location: <project_root>/_cache/span_index
+DEFAULT_SPAN_INDEX_DIR = Path(__file__).parent.parent / "_cache" / "span_index"
+
+# Format version of the index entries; bump to invalidate old entries
+INDEX_FORMAT = 1
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class SpanIndex:
+    """Span positions per HTML page, validated by the page's hash."""
+
+    def __init__(self, index_dir: Optional[Path] = None):
+        self.index_dir = Path(index_dir) if index_dir else DEFAULT_SPAN_INDEX_DIR
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, html_path) -> Path:
+        html_path = Path(html_path).resolve()
+        # e.g. 1_ano/lgp21/index.html -> 1_ano_lgp21.json
+        return self.index_dir / f"{html_path.parent.parent.name}_{html_path.parent.name}.json"
+
+    def _load(self, html_path) -> Optional[dict]:
+        try:
+            with open(self._entry_path(html_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def spans(self, html_path, content: str) -> List[Span]:
+        """
+        Span positions of a page, from the index if it matches the content,
+        else scanned. A scan is not stored here: callers store the positions
+        of the content they end up writing (see store()).
+        """
+        entry = self._load(html_path)
+        if entry is not None and entry.get('format') == INDEX_FORMAT \
+                and entry.get('html_sha256') == content_hash(content):
+            self.hits += 1
+            return [tuple(span) for span in entry['spans']]
+
+        self.misses += 1
+        return scan_spans(content)
+
+    def store(self, html_path, content: str, spans: List[Span]) -> None:
+        """Record the span positions of a page's current content."""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        entry = {
+            'format': INDEX_FORMAT,
+            'html': str(html_path),
+            'html_sha256': content_hash(content),
+            'spans': spans,
+        }
+        write_text_if_changed(self._entry_path(html_path), json.dumps(entry, ensure_ascii=False))
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number of entries removed."""
+        if not self.index_dir.exists():
+            return 0
+        removed = 0
+        for path in self.index_dir.glob("*.json"):
+            path.unlink()
+            removed += 1
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or clear the span index of HTML pages"
+    )
+    parser.add_argument(
+        "html_file",
+        nargs="*",
+        help="HTML pages to index"
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Remove every index entry"
+    )
+
+    args = parser.parse_args()
+    index = SpanIndex()
+
+    if args.clear:
+        print(f"Removed {index.clear()} index entries from {index.index_dir}")
+    elif args.html_file:
+        for html_file in args.html_file:
+            with open(html_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            spans = index.spans(html_file, content)
+            index.store(html_file, content, spans)
+            print(f"  {html_file}: {len(spans)} spans")
+        print(f"Up to date: {index.hits}, rebuilt: {index.misses}")
+    else:
+        parser.print_help()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,57 @@
+"""Cached variants are keyed by the formats they hold, and the zoom view names its image only in data-*."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import image_variants  # noqa: E402
+from image_variants import ImageVariants  # noqa: E402
+from page_template import render_image, render_zoom_image  # noqa: E402
+
+
+def cache_entry(cache, image, formats, widths=(640, 1000)):
+    entry_dir = cache.cache_dir / cache.key(image, formats)
+    entry_dir.mkdir(parents=True)
+    files = []
+    for width in widths:
+        for fmt in formats:
+            (entry_dir / f"{width}.{fmt}").write_bytes(b"variant")
+            files.append({'format': fmt, 'width': width, 'path': f"{width}.{fmt}"})
+    (entry_dir / "variants.json").write_text(json.dumps({'width': widths[-1], 'height': 700, 'files': files}))
+
+
+def test_a_cached_format_set_is_not_reused_for_another(tmp_path, monkeypatch):
+    image = tmp_path / "11_lgp99.png"
+    image.write_bytes(b"png")
+    cache = ImageVariants(tmp_path / "images")
+    assert cache.key(image, ['webp']) != cache.key(image, ['avif', 'webp'])
+
+    cache_entry(cache, image, ['webp'])
+    monkeypatch.setattr(image_variants, "available_formats", lambda: [])
+    entry = cache.variants(image)
+    assert {v['format'] for v in entry['files']} == {'webp'}
+
+    # Without Pillow the richest cached set wins
+    cache_entry(cache, image, ['avif', 'webp'])
+    entry = cache.variants(image)
+    assert {v['format'] for v in entry['files']} == {'avif', 'webp'}
+
+
+def test_only_the_zoom_image_is_deferred_and_it_is_full_width(tmp_path):
+    entry = {'width': 1000, 'height': 700, 'files': [
+        {'format': fmt, 'width': width, 'path': f"{width}.{fmt}"} for width in (640, 1000) for fmt in ('avif', 'webp')
+    ]}
+    modal = render_image("11_lgp99.png", 'id="modal-image"', entry, "90vw", "")
+    assert 'loading="lazy"' not in modal
+    assert 'srcset="assets/images/11_lgp99-640.avif 640w, assets/images/11_lgp99-1000.avif 1000w"' in modal
+
+    zoom = render_zoom_image("11_lgp99.png", 'id="zoom-image"', entry, "")
+    assert " srcset=" not in zoom and " src=" not in zoom
+    assert 'data-srcset="assets/images/11_lgp99-1000.avif 1000w"' in zoom
+    assert 'data-srcset="assets/images/11_lgp99-1000.webp 1000w"' in zoom
+    assert '<img data-src="assets/images/11_lgp99.png" id="zoom-image"' in zoom
+
+    assert render_zoom_image("11_lgp99.png", 'id="zoom-image"', None, "") == \
+        '<img src="assets/images/11_lgp99.png" id="zoom-image">'
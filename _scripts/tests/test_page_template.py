@@ -0,0 +1,51 @@
+"""Pages render the manifest's blocks: line breaks, word groups, styles and titles not in the recording."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from page_template import LINE_BREAK, aligned_blocks, render_article  # noqa: E402
+
+WORDS = [
+    {'word': "A", 'start': 0.12, 'end': 0.26},
+    {'word': "PIA", 'start': 0.26, 'end': 0.48},
+    {'word': "PINGA,", 'start': 0.48, 'end': 1.1},
+    {'word': "O", 'start': 1.1, 'end': 1.3},
+    {'word': "PINTO", 'start': 1.3, 'end': 1.6},
+    {'word': "PIA.", 'start': 1.6, 'end': 2.0},
+]
+
+
+def test_line_breaks_and_word_groups():
+    blocos = aligned_blocks([{'tipo': "p", 'conteudo': "A PIA PINGA,\nO PINTO PIA."}], WORDS)
+    assert blocos == [("p", [
+        ("A", 0.12, 0.26), ("PIA", 0.26, 0.48), ("PINGA,", 0.48, 1.1),
+        LINE_BREAK,
+        [("O", 1.1, 1.3), ("PINTO", 1.3, 1.6)], ("PIA.", 1.6, 2.0),
+    ], None)]
+
+    article = render_article(blocos)
+    assert '<span data-start="0.48" data-end="1.1">PINGA,</span><br>\n' in article
+    assert ('<span style="white-space: nowrap;"><span data-start="1.1" data-end="1.3">O</span>\n'
+            '                    <span data-start="1.3" data-end="1.6">PINTO</span></span>') in article
+
+
+def test_title_not_in_the_recording_is_not_aligned():
+    roteiro = [
+        {'tipo': "h1", 'conteudo': "A PIA E O PINTO", 'narrado': False},
+        {'tipo': "p", 'conteudo': "A PIA PINGA, O PINTO PIA.", 'estilo': "text-align: right;"},
+    ]
+    blocos = aligned_blocks(roteiro, WORDS)
+    assert blocos[0] == ("h1", "A PIA E O PINTO", None)
+    assert blocos[1][1][0] == ("A", 0.12, 0.26)
+
+    article = render_article(blocos)
+    assert article.startswith('<h1 class="title">A PIA E O PINTO</h1>\n')
+    assert '<p style="text-align: right;">\n' in article
+
+
+def test_page_without_title_has_no_h1():
+    article = render_article(aligned_blocks([{'tipo': "p", 'conteudo': "A PIA"}], WORDS))
+    assert "<h1" not in article
+    assert article.startswith('<div class="text-content" id="lyrics" aria-live="polite">\n')
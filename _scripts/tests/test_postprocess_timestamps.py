@@ -0,0 +1,61 @@
+"""The pass chain is idempotent, and a lead can be changed or undone without losing words."""
+
+import copy
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from postprocess_timestamps import parse_passes, postprocess_data  # noqa: E402
+
+
+def timestamps():
+    return {'words': [
+        {'word': "A", 'start': 0.05, 'end': 0.1},
+        {'word': "PIA", 'start': 0.3, 'end': 0.62},
+        {'word': "PINGA", 'start': 0.6, 'end': 1.0},
+        {'word': "O", 'start': 1.4, 'end': 1.42},
+    ]}
+
+
+def spans(data):
+    return [(w['start'], w['end']) for w in data['words']]
+
+
+@pytest.mark.parametrize("chain", [
+    "fill_gaps",
+    "split_gaps",
+    "clamp_overlaps,split_gaps,min_duration=0.08",
+    "fill_gaps,lead=0.2",
+])
+def test_rerunning_a_chain_changes_nothing(chain):
+    data = timestamps()
+    postprocess_data(data, parse_passes(chain))
+    processed = copy.deepcopy(data)
+    postprocess_data(data, parse_passes(chain))
+    assert data == processed
+    assert json.dumps(data) == json.dumps(processed)
+
+
+def test_gaps_fixed_keeps_the_count_of_the_run_that_fixed_them():
+    data = timestamps()
+    assert postprocess_data(data) == 2
+    assert list(data)[-2:] == ['postprocessed', 'gaps_fixed']
+    assert postprocess_data(data) == 0
+    assert data['gaps_fixed'] == 2
+
+
+def test_lead_clamped_at_zero_is_undone_exactly():
+    data = timestamps()
+    postprocess_data(data, parse_passes("lead=0.2"))
+    assert spans(data)[:2] == [(0.0, 0.0), (0.1, 0.42)]
+
+    postprocess_data(data, parse_passes("lead=0.3"))
+    assert spans(data)[:2] == [(0.0, 0.0), (0.0, 0.32)]
+
+    postprocess_data(data, parse_passes("lead=0"))
+    assert spans(data) == spans(timestamps())
+    assert 'lead_clamped' not in data
@@ -0,0 +1,142 @@
+"""The trim stage keeps the shipped audio, its encodes and the word spans in sync."""
+
+import copy
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import oed_pipeline  # noqa: E402
+from audio_variants import AudioVariants  # noqa: E402
+from silence_trim import TrimmedAudio, shift_words  # noqa: E402
+from span_index import SpanIndex  # noqa: E402
+
+CUT = (1.3, 4.7)
+
+PAGE = """<html>
+<body>
+        <audio id="audio">
+            <source src="assets/audio/11_lgp99.webm" type='audio/webm; codecs="opus"'>
+            <source src="assets/audio/11_lgp99.m4a" type='audio/mp4; codecs="mp4a.40.2"'>
+            <source src="assets/audio/11_lgp99.mp3" type="audio/mpeg">
+        </audio>
+        <h1 class="title"><span data-start="1.5" data-end="2.0">OLA</span> <span data-start="2.0" data-end="4.5">MUNDO</span></h1>
+</body>
+</html>
+"""
+
+
+def fake_trimmed(self, audio_path, start, end):
+    """A "trimmed" file whose bytes name the source and the cut."""
+    output = self.cache_dir / f"{start:.3f}-{end:.3f}.mp3"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(Path(audio_path).read_bytes() + f"[{start:.3f}-{end:.3f}]".encode())
+    return output
+
+
+def fake_variants(self, audio_path):
+    """Encodes whose bytes are the bytes of the audio they were encoded from."""
+    files = []
+    for encoding, suffix in (('opus', ".webm"), ('aac', ".m4a")):
+        output = self.cache_dir / f"{Path(audio_path).stem}-{encoding}{suffix}"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(Path(audio_path).read_bytes() + f"|{encoding}".encode())
+        files.append({'encoding': encoding, 'type': "audio/x", 'suffix': suffix, 'path': str(output)})
+    return {'duration': CUT[1] - CUT[0], 'files': files}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "_timestamps" / "1_ano").mkdir(parents=True)
+    (tmp_path / "_timestamps" / "1_ano" / "11_lgp99.json").write_text(json.dumps({'words': [
+        {'word': "OLA", 'start': 1.5, 'end': 2.0},
+        {'word': "MUNDO", 'start': 2.0, 'end': 4.5},
+    ]}))
+    (tmp_path / "_assets" / "audios" / "1_ano").mkdir(parents=True)
+    (tmp_path / "_assets" / "audios" / "1_ano" / "11_lgp99.mp3").write_bytes(b"source")
+
+    page = tmp_path / "1_ano" / "lgp99"
+    (page / "assets" / "audio").mkdir(parents=True)
+    (page / "index.html").write_text(PAGE, encoding='utf-8')
+    for suffix in (".mp3", ".webm", ".m4a"):
+        (page / "assets" / "audio" / f"11_lgp99{suffix}").write_bytes(b"source" + suffix.encode())
+
+    class Samples:
+        def load(self, audio_path):
+            return None
+
+    monkeypatch.setattr(oed_pipeline, "PcmCache", Samples)
+    monkeypatch.setattr(oed_pipeline, "speech_bounds", lambda samples: CUT)
+    monkeypatch.setattr(oed_pipeline, "SpanIndex", lambda: SpanIndex(tmp_path / "_cache" / "span_index"))
+    monkeypatch.setattr(oed_pipeline, "TrimmedAudio", lambda: TrimmedAudio(tmp_path / "_cache" / "trim"))
+    monkeypatch.setattr(oed_pipeline, "AudioVariants", lambda: AudioVariants(tmp_path / "_cache" / "audio"))
+    monkeypatch.setattr(TrimmedAudio, "trimmed", fake_trimmed)
+    return tmp_path
+
+
+def run_trim(project):
+    result = oed_pipeline.run_pipeline(project / "_timestamps" / "1_ano" / "11_lgp99.json", project, ['trim'])
+    assert result['success'], result.get('error')
+    return (project / "1_ano" / "lgp99" / "index.html").read_text(encoding='utf-8')
+
+
+def span_starts(content):
+    return [float(start) for start in re.findall(r'data-start="([\d.]+)"', content)]
+
+
+def test_encodes_are_rebuilt_from_the_trimmed_audio(project, monkeypatch):
+    monkeypatch.setattr(AudioVariants, "variants", fake_variants)
+    content = run_trim(project)
+
+    audio = project / "1_ano" / "lgp99" / "assets" / "audio"
+    trimmed = (audio / "11_lgp99.mp3").read_bytes()
+    assert trimmed == b"source[1.300-4.700]"
+    assert (audio / "11_lgp99.webm").read_bytes() == trimmed + b"|opus"
+    assert (audio / "11_lgp99.m4a").read_bytes() == trimmed + b"|aac"
+    assert span_starts(content) == [0.2, 0.7]
+    assert "11_lgp99.webm" in content and "11_lgp99.m4a" in content
+
+    data = json.loads((project / "_timestamps" / "1_ano" / "11_lgp99.json").read_text())
+    assert (data['trim_offset'], data['trim_end']) == CUT
+    assert [w['start'] for w in data['words']] == span_starts(content)
+
+
+def test_encodes_that_cannot_be_rebuilt_are_dropped(project, monkeypatch):
+    monkeypatch.setattr(AudioVariants, "variants", lambda self, audio_path: None)
+    content = run_trim(project)
+
+    audio = project / "1_ano" / "lgp99" / "assets" / "audio"
+    assert (audio / "11_lgp99.mp3").read_bytes() == b"source[1.300-4.700]"
+    assert not (audio / "11_lgp99.webm").exists()
+    assert not (audio / "11_lgp99.m4a").exists()
+    assert re.findall(r'<source src="assets/audio/([^"]+)"', content) == ["11_lgp99.mp3"]
+    assert span_starts(content) == [0.2, 0.7]
+
+
+def test_trim_is_idempotent(project, monkeypatch):
+    monkeypatch.setattr(AudioVariants, "variants", fake_variants)
+    first = run_trim(project)
+    assert run_trim(project) == first
+
+
+def test_words_clamped_by_the_cut_are_restored_exactly():
+    data = {'words': [
+        {'word': "UM", 'start': 0.05, 'end': 0.1},
+        {'word': "OLA", 'start': 1.5, 'end': 2.0},
+        {'word': "MUNDO", 'start': 4.6, 'end': 5.0},
+    ]}
+    source = copy.deepcopy(data)
+
+    assert shift_words(data, CUT)
+    assert [(w['start'], w['end']) for w in data['words']] == [(0.0, 0.0), (0.2, 0.7), (3.3, 3.4)]
+    assert not shift_words(data, CUT)
+
+    assert shift_words(data, (1.0, 4.8))
+    assert [(w['start'], w['end']) for w in data['words']] == [(0.0, 0.0), (0.5, 1.0), (3.6, 3.8)]
+
+    assert shift_words(data, None)
+    assert data == source
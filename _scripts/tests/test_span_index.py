@@ -0,0 +1,73 @@
+"""Span rewriting patches only changed spans, and the index tracks the positions it leaves."""
+
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from span_index import SpanIndex  # noqa: E402
+from update_html_timestamps import rewrite_spans, scan_spans  # noqa: E402
+
+PAGE = """<h1 class="title"><span data-start="0.12" data-end="0.26">A</span> <span data-start="0.26" data-end="0.48">PIA</span></h1>
+<p>
+    <span data-start="0.48" data-end="1.1">PINGA,</span><br>
+    <span style="white-space: nowrap;"><span data-start="1.1" data-end="1.3">O</span>
+    <span data-start="1.3" data-end="1.6">PINTO</span></span> <span data-start="1.6" data-end="2.0">PIA.</span>
+</p>
+"""
+
+WORDS = [
+    {'word': "A", 'start': 0.12, 'end': 0.26},
+    {'word': "PIA", 'start': 0.26, 'end': 0.48},
+    {'word': "PINGA,", 'start': 0.48, 'end': 1.1},
+    {'word': "O", 'start': 1.1, 'end': 1.3},
+    {'word': "PINTO", 'start': 1.3, 'end': 1.6},
+    {'word': "PIA.", 'start': 1.6, 'end': 2.0},
+]
+
+
+def shifted(words, offset):
+    return [dict(w, start=round(w['start'] + offset, 3), end=round(w['end'] + offset, 3)) for w in words]
+
+
+def without_times(content):
+    return re.sub(r'data-(start|end)="[\d.]+"', "", content)
+
+
+def test_unchanged_timestamps_return_the_page_as_is():
+    spans = scan_spans(PAGE)
+    content, new_spans = rewrite_spans(PAGE, spans, WORDS)
+    assert content is PAGE
+    assert new_spans == spans
+
+
+def test_rewrite_round_trip_keeps_the_span_positions_exact():
+    content, spans = rewrite_spans(PAGE, scan_spans(PAGE), shifted(WORDS, 10.0))
+    assert spans == scan_spans(content)
+    assert '<span data-start="11.1" data-end="11.3">O</span>' in content
+
+    # Only the timestamps changed: the markup around the spans is intact
+    assert without_times(content) == without_times(PAGE)
+
+    content, spans = rewrite_spans(content, spans, WORDS)
+    assert content == PAGE
+    assert spans == scan_spans(PAGE)
+
+
+def test_index_serves_the_positions_of_the_content_it_stored(tmp_path):
+    index = SpanIndex(tmp_path / "span_index")
+    html_path = tmp_path / "1_ano" / "lgp99" / "index.html"
+
+    spans = index.spans(html_path, PAGE)
+    content, spans = rewrite_spans(PAGE, spans, shifted(WORDS, 0.5))
+    index.store(html_path, content, spans)
+    assert (index.hits, index.misses) == (0, 1)
+
+    assert index.spans(html_path, content) == scan_spans(content)
+    assert index.hits == 1
+
+    # A hand-edited page no longer matches its hash and is re-scanned
+    edited = content.replace("<p>", "<p>\n    ")
+    assert index.spans(html_path, edited) == scan_spans(edited)
+    assert (index.hits, index.misses) == (1, 2)
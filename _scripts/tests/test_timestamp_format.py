@@ -0,0 +1,63 @@
+"""A .tsb companion holds exactly the JSON data, and saving unchanged data writes nothing."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from timestamp_format import (  # noqa: E402
+    companion_path, convert, load_timestamp_data, save_timestamp_data,
+)
+
+
+def timestamps(confidence=False):
+    words = [
+        {'word': "A", 'start': 0.0, 'end': 0.0},
+        {'word': "PIA", 'start': 0.1, 'end': 0.42},
+        {'word': "PINGA,", 'start': 0.42, 'end': 1.001},
+        {'word': "PÓS-GRADUADA", 'start': 1.2, 'end': 2.345},
+    ]
+    if confidence:
+        for word, value in zip(words, (0.5, 0.912, 1.0, 0.0)):
+            word['confidence'] = value
+    return {
+        'audio_file': "11_lgp99.mp3",
+        'words': words,
+        'postprocessed': True,
+        'gaps_fixed': 2,
+        'lead_offset': 0.2,
+        'lead_clamped': [[0, -0.15, -0.1]],
+        'trim_offset': 1.3,
+        'trim_end': 4.7,
+    }
+
+
+@pytest.mark.parametrize("confidence", [False, True])
+def test_json_to_tsb_and_back_is_lossless(tmp_path, confidence):
+    data = timestamps(confidence)
+    source = tmp_path / "11_lgp99.json"
+    source.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    binary = convert(source, to_binary=True)
+    assert binary == companion_path(source)
+    loaded = load_timestamp_data(binary)
+    assert loaded == data
+    assert list(loaded) == list(data)
+
+    source.unlink()
+    assert convert(binary, to_binary=False) == source
+    assert source.read_text(encoding='utf-8') == json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def test_saving_unchanged_data_writes_nothing(tmp_path):
+    path = tmp_path / "11_lgp99.tsb"
+    assert save_timestamp_data(timestamps(), path) == 1
+    companion_path(path).write_text("{}", encoding='utf-8')
+
+    # The stale companion is brought in sync, then both are left alone
+    assert save_timestamp_data(load_timestamp_data(path), path) == 1
+    assert save_timestamp_data(load_timestamp_data(path), path) == 0
+    assert load_timestamp_data(companion_path(path)) == timestamps()
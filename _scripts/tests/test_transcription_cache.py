@@ -0,0 +1,50 @@
+"""Temp files of interrupted writes are swept and count toward the cache's size bound."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from transcription_cache import STALE_TEMP_SECONDS, TranscriptionCache  # noqa: E402
+
+
+def temp_file(directory, name, size, age):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    then = time.time() - age
+    os.utime(path, (then, then))
+    return path
+
+
+def test_stale_temp_files_are_swept_on_put(tmp_path):
+    cache = TranscriptionCache(tmp_path, max_bytes=10_000)
+    stale = temp_file(tmp_path, "stale.tmp", 5_000, STALE_TEMP_SECONDS + 60)
+    fresh = temp_file(tmp_path, "fresh.tmp", 100, 0)
+
+    cache.put("a", {'words': []})
+    assert not stale.exists()
+    assert fresh.exists()
+    assert cache.get("a") == {'words': []}
+    assert cache.size() == fresh.stat().st_size + (tmp_path / "a.json").stat().st_size
+
+
+def test_writes_in_progress_count_toward_the_bound(tmp_path):
+    cache = TranscriptionCache(tmp_path, max_bytes=1_000)
+    cache.put("old", {'words': []})
+    os.utime(tmp_path / "old.json", (time.time() - 10, time.time() - 10))
+    temp_file(tmp_path, "fresh.tmp", 980, 0)
+
+    cache.put("new", {'words': []})
+    assert cache.get("old") is None
+    assert cache.get("new") == {'words': []}
+
+
+def test_a_failed_write_leaves_no_temp_file(tmp_path):
+    cache = TranscriptionCache(tmp_path)
+    with pytest.raises(TypeError):
+        cache.put("a", {'words': object()})
+    assert list(tmp_path.iterdir()) == []
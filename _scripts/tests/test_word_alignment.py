@@ -0,0 +1,47 @@
+"""Whisper words that were dropped, inserted or split only affect their own spans."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from word_alignment import align_timestamps, similarity_ratio  # noqa: E402
+
+
+def whisper(*words):
+    return [{'word': word, 'start': start, 'end': end} for word, start, end in words]
+
+
+def timing(aligned):
+    return [(a['start'], a['end'], a['matched']) for a in aligned]
+
+
+def test_dropped_word_is_interpolated_and_the_rest_stays_paired():
+    aligned = align_timestamps(
+        ["A", "PIA", "PINGA,", "O", "PINTO", "PIA."],
+        whisper(("A", 0.0, 0.2), ("pia", 0.2, 0.4), ("pinga", 0.4, 0.8), ("pinto", 1.0, 1.3), ("pia", 1.3, 1.6)),
+    )
+    assert timing(aligned) == [
+        (0.0, 0.2, True), (0.2, 0.4, True), (0.4, 0.8, True),
+        (0.8, 1.0, False),
+        (1.0, 1.3, True), (1.3, 1.6, True),
+    ]
+    assert similarity_ratio(aligned) == 5 / 6
+
+
+def test_inserted_word_is_skipped_and_accents_are_folded():
+    aligned = align_timestamps(["AVÓ", "PIA"], whisper(("avo", 0.0, 0.2), ("e", 0.2, 0.3), ("pia", 0.3, 0.6)))
+    assert timing(aligned) == [(0.0, 0.2, True), (0.3, 0.6, True)]
+
+
+def test_split_word_spans_both_parts():
+    aligned = align_timestamps(
+        ["O", "GUARDA-CHUVA", "É"],
+        whisper(("o", 0.0, 0.2), ("guarda", 0.2, 0.5), ("chuva", 0.5, 0.9), ("é", 0.9, 1.0)),
+    )
+    assert timing(aligned) == [(0.0, 0.2, True), (0.2, 0.9, True), (0.9, 1.0, True)]
+
+
+def test_punctuation_gets_a_zero_length_stamp_at_the_next_word():
+    aligned = align_timestamps(["A", "-", "PIA"], whisper(("a", 0.0, 0.2), ("pia", 0.5, 0.8)))
+    assert timing(aligned)[1] == (0.5, 0.5, False)
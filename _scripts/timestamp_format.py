@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Compact binary companion format for timestamp files (.tsb).
+
+The JSON files in _timestamps/ store one dict per word. The .tsb format
+stores the same data as packed arrays that can be memory-mapped:
+
+    header      magic "LGTS", version, flags, word count,
+                metadata length, string table length (little-endian)
+    metadata    the top-level JSON fields, with "words" as a null
+                placeholder, as UTF-8 JSON (padded to 4 bytes)
+    starts      int32[word count], milliseconds
+    ends        int32[word count], milliseconds
+    confidence  uint16[word count], per mille (only with FLAG_CONFIDENCE)
+    offsets     uint32[word count + 1] into the string table
+    strings     UTF-8 words, back to back
+
+Timestamps are rounded to 3 decimals everywhere, so milliseconds are
+lossless. Every tool reads either format through load_timestamp_data();
+save_timestamp_data() writes the format of the given path and keeps an
+existing companion in the other format in sync.
+
+Usage:
+    python timestamp_format.py to-binary <json_file> [...]   # Write .tsb next to each JSON
+    python timestamp_format.py to-json <tsb_file> [...]      # Write .json next to each .tsb
+    python timestamp_format.py to-binary --all               # Convert all of _timestamps/
+    python timestamp_format.py info <file>                   # Show header and first words
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not installed.")
+    print("Install with: pip install numpy")
+    sys.exit(1)
+
+from atomic_write import write_bytes_if_changed, write_text_if_changed
+
+MAGIC = b"LGTS"
+VERSION = 1
+
+# Header: magic, version, flags, word count, metadata bytes, string table bytes
+HEADER = struct.Struct("<4sHHIII")
+
+FLAG_CONFIDENCE = 1
+
+JSON_SUFFIX = ".json"
+BINARY_SUFFIX = ".tsb"
+TIMESTAMP_SUFFIXES = (BINARY_SUFFIX, JSON_SUFFIX)
+
+
+def _padded(length: int) -> int:
+    return (length + 3) & ~3
+
+
+class TimestampFile:
+    """
+    Memory-mapped reader for a .tsb file.
+
+    starts/ends are int32 millisecond views into the map; nothing is copied
+    until words() or to_dict() is called. Use as a context manager, or call
+    close(), before the file is replaced.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, count, metadata_length, strings_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a binary timestamp file: {self.path}")
+        if version > VERSION:
+            self._map.close()
+            raise ValueError(f"Unsupported timestamp format version {version}: {self.path}")
+
+        position = HEADER.size
+        self.metadata = json.loads(bytes(self._map[position:position + metadata_length]).decode('utf-8'))
+        position += _padded(metadata_length)
+
+        self.starts = np.frombuffer(self._map, dtype='<i4', count=count, offset=position)
+        position += 4 * count
+        self.ends = np.frombuffer(self._map, dtype='<i4', count=count, offset=position)
+        position += 4 * count
+
+        self.confidence = None
+        if flags & FLAG_CONFIDENCE:
+            self.confidence = np.frombuffer(self._map, dtype='<u2', count=count, offset=position)
+            position += _padded(2 * count)
+
+        self._offsets = np.frombuffer(self._map, dtype='<u4', count=count + 1, offset=position)
+        position += 4 * (count + 1)
+        self._strings = position
+        self._strings_length = strings_length
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        # Drop the array views first; an exported buffer keeps the map open
+        self.starts = self.ends = self.confidence = self._offsets = None
+        self._map.close()
+
+    def word(self, index: int) -> str:
+        start = self._strings + int(self._offsets[index])
+        end = self._strings + int(self._offsets[index + 1])
+        return self._map[start:end].decode('utf-8')
+
+    def words(self) -> List[Dict]:
+        """Word dicts as in the JSON format."""
+        raw = self._map[self._strings:self._strings + self._strings_length]
+        # Offsets count bytes: pure-ASCII tables can be decoded once and sliced as text
+        ascii_only = raw.isascii()
+        text = raw.decode('ascii') if ascii_only else None
+        offsets = self._offsets.tolist()
+        starts = (self.starts / 1000).tolist()
+        ends = (self.ends / 1000).tolist()
+        confidence = (self.confidence / 1000).tolist() if self.confidence is not None else None
+
+        words = []
+        for i in range(len(starts)):
+            if ascii_only:
+                token = text[offsets[i]:offsets[i + 1]]
+            else:
+                token = raw[offsets[i]:offsets[i + 1]].decode('utf-8')
+            word = {"word": token, "start": round(starts[i], 3), "end": round(ends[i], 3)}
+            if confidence is not None:
+                word["confidence"] = round(confidence[i], 3)
+            words.append(word)
+        return words
+
+    def to_dict(self) -> dict:
+        """The full timestamp data, in the same shape as the JSON format."""
+        data = dict(self.metadata)
+        data['words'] = self.words()
+        return data
+
+
+def encode_binary(data: dict) -> bytes:
+    """Serialize timestamp data to the .tsb layout."""
+    words = data.get('words', [])
+    count = len(words)
+    # "words" stays in the metadata as a null placeholder, which keeps the key order
+    metadata = json.dumps({k: (None if k == 'words' else v) for k, v in data.items()},
+                          ensure_ascii=False).encode('utf-8')
+
+    encoded = [w['word'].encode('utf-8') for w in words]
+    offsets = np.zeros(count + 1, dtype='<u4')
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    strings = b"".join(encoded)
+
+    starts = np.rint(np.fromiter((w['start'] for w in words), dtype=np.float64, count=count) * 1000)
+    ends = np.rint(np.fromiter((w['end'] for w in words), dtype=np.float64, count=count) * 1000)
+
+    flags = 0
+    has_confidence = count > 0 and all('confidence' in w for w in words)
+    if has_confidence:
+        flags |= FLAG_CONFIDENCE
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, flags, count, len(metadata), len(strings)),
+        metadata.ljust(_padded(len(metadata)), b" "),
+        starts.astype('<i4').tobytes(),
+        ends.astype('<i4').tobytes(),
+    ]
+    if has_confidence:
+        confidence = np.rint(np.fromiter((w['confidence'] for w in words), dtype=np.float64,
+                                         count=count) * 1000).astype('<u2').tobytes()
+        parts.append(confidence.ljust(_padded(len(confidence)), b"\0"))
+    parts.append(offsets.tobytes())
+    parts.append(strings)
+    return b"".join(parts)
+
+
+def is_binary(path) -> bool:
+    """True for .tsb files (by suffix, falling back to the magic bytes)."""
+    path = Path(path)
+    if path.suffix == BINARY_SUFFIX:
+        return True
+    if path.suffix == JSON_SUFFIX:
+        return False
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_timestamp_data(path) -> dict:
+    """Load a timestamp file in either format."""
+    if is_binary(path):
+        with TimestampFile(path) as ts:
+            return ts.to_dict()
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_format(data: dict, path: Path) -> bool:
+    if path.suffix == BINARY_SUFFIX:
+        return write_bytes_if_changed(path, encode_binary(data))
+    return write_text_if_changed(path, json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def save_timestamp_data(data: dict, path) -> int:
+    """
+    Write timestamp data in the format given by the path's suffix.
+
+    If the file has a companion in the other format, it is rewritten too,
+    so the two never disagree. Files whose content would not change are
+    left untouched.
+
+    Returns:
+        Number of files actually written
+    """
+    path = Path(path)
+    written = int(_write_format(data, path))
+    companion = companion_path(path)
+    if companion.exists():
+        written += _write_format(data, companion)
+    return written
+
+
+def companion_path(path) -> Path:
+    """The same timestamp file in the other format."""
+    path = Path(path)
+    return path.with_suffix(JSON_SUFFIX if path.suffix == BINARY_SUFFIX else BINARY_SUFFIX)
+
+
+def iter_timestamp_files(directory: Path) -> Iterator[Path]:
+    """
+    Timestamp files in a directory, sorted by name, one per OED.
+
+    When both formats exist the binary one is returned: it is faster to
+    load, and save_timestamp_data() keeps the JSON in sync.
+    """
+    chosen = {}
+    for suffix in reversed(TIMESTAMP_SUFFIXES):
+        for path in directory.glob(f"*{suffix}"):
+            chosen[path.stem] = path
+    for stem in sorted(chosen):
+        yield chosen[stem]
+
+
+def convert(path: Path, to_binary: bool) -> Optional[Path]:
+    """Write the other-format companion of a timestamp file. Returns its path."""
+    if is_binary(path) == to_binary:
+        return None
+    target = companion_path(path)
+    _write_format(load_timestamp_data(path), target)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert timestamp files between JSON and the binary .tsb format"
+    )
+    parser.add_argument(
+        "command",
+        choices=["to-binary", "to-json", "info"],
+        help="Conversion direction, or info to inspect a file"
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Timestamp files to convert"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Convert every timestamp file in _timestamps/"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "info":
+        for path in args.files:
+            data = load_timestamp_data(path)
+            print(f"{path}: {'binary' if is_binary(path) else 'JSON'}, "
+                  f"{os.path.getsize(path)} bytes, {len(data.get('words', []))} words")
+            for word in data.get('words', [])[:5]:
+                print(f"  {word['start']:8.3f} {word['end']:8.3f}  {word['word']}")
+        return 0
+
+    files = [Path(f) for f in args.files]
+    if args.all:
+        timestamps_dir = Path(__file__).parent.parent / "_timestamps"
+        suffix = JSON_SUFFIX if args.command == "to-binary" else BINARY_SUFFIX
+        for year in ['1_ano', '2_ano']:
+            files.extend(sorted((timestamps_dir / year).glob(f"*{suffix}")))
+
+    if not files:
+        parser.print_help()
+        return 1
+
+    for path in files:
+        target = convert(path, to_binary=args.command == "to-binary")
+        if target is not None:
+            print(f"  {path.name} ({os.path.getsize(path)} bytes) -> "
+                  f"{target.name} ({os.path.getsize(target)} bytes)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
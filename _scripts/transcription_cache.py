@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for Whisper transcriptions.
+
+Entries are keyed by the SHA-256 of the audio bytes plus the model name,
+language and whisper-timestamped version, so an unchanged mp3 never has to
+be transcribed twice. Each entry stores the raw word list (before any
+post-processing) as a small JSON file. The cache is bounded in size and
+evicts the least recently used entries first; temp files left behind by
+interrupted writes are swept at the same time.
+
+Usage:
+    python transcription_cache.py --stats   # Show cache size and entry count
+    python transcription_cache.py --clear   # Remove every cached entry
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# Default cache location: <project_root>/_cache/transcriptions
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "_cache" / "transcriptions"
+
+# Default size bound (bytes) before least recently used entries are evicted
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Format version of the cache entries; bump to invalidate old entries
+CACHE_FORMAT = 1
+
+# Temp files older than this are left over from an interrupted write
+STALE_TEMP_SECONDS = 60 * 60
+
+# In-memory memo of file hashes, keyed by (path, size, mtime)
+_hash_memo: Dict[tuple, str] = {}
+
+
+def file_sha256(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _hash_memo:
+        return _hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    _hash_memo[memo_key] = digest.hexdigest()
+    return _hash_memo[memo_key]
+
+
+def whisper_timestamped_version() -> str:
+    """Return the installed whisper-timestamped version without importing it."""
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        return "unknown"
+    try:
+        return version("whisper-timestamped")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def sweep_temp_files(directory: Path, max_age: float = STALE_TEMP_SECONDS) -> int:
+    """
+    Delete the *.tmp files of writes that never finished, i.e. older than max_age.
+
+    Returns:
+        Total size in bytes of the temp files that are left (writes in progress)
+    """
+    now = time.time()
+    left = 0
+    for path in directory.glob("*.tmp"):
+        try:
+            stat = path.stat()
+            if now - stat.st_mtime > max_age:
+                path.unlink()
+            else:
+                left += stat.st_size
+        except FileNotFoundError:
+            continue
+    return left
+
+
+def write_entry(directory: Path, path: Path, write) -> None:
+    """
+    Write a cache entry through a temp file and a rename, so concurrent
+    readers never see a partial entry; the temp file is removed if the
+    write fails.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=str(directory), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def evict_lru(directory: Path, max_bytes: int, pattern: str = "*") -> int:
+    """
+    Delete the least recently used files in a directory until it fits in max_bytes.
+
+    Recency is the file's mtime, which cache readers bump on every hit.
+    Temp files left by interrupted writes are swept first (see
+    sweep_temp_files()); those of writes still in progress count toward
+    max_bytes.
+
+    Returns:
+        Number of files removed
+    """
+    in_progress = sweep_temp_files(directory)
+    entries = []
+    for path in directory.glob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = in_progress + sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+
+    return removed
+
+
+class TranscriptionCache:
+    """Size-bounded LRU cache of raw transcription results."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 refresh: bool = False):
+        """
+        Args:
+            cache_dir: Directory for cache entries (default: _cache/transcriptions)
+            max_bytes: Size bound for the whole cache directory
+            refresh: Ignore existing entries (but still store new results)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, audio_path: str, model_name: str, language: str, extra: str = "") -> str:
+        """Build the cache key for an audio file and transcription settings."""
+        parts = [
+            f"format={CACHE_FORMAT}",
+            f"audio={file_sha256(audio_path)}",
+            f"model={model_name}",
+            f"language={language}",
+            f"whisper_timestamped={whisper_timestamped_version()}",
+            f"extra={extra}",
+        ]
+        return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached transcription for a key, or None on a miss."""
+        path = self._entry_path(key)
+        if self.refresh or not path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Mark as recently used
+        os.utime(path, None)
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: dict) -> None:
+        """Store a transcription, then evict old entries if over the size bound."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        write_entry(self.cache_dir, self._entry_path(key), lambda f: f.write(payload))
+
+        evict_lru(self.cache_dir, self.max_bytes, "*.json")
+
+    def size(self) -> int:
+        """Total size in bytes of the cache entries and pending temp files."""
+        if not self.cache_dir.exists():
+            return 0
+        return sum(p.stat().st_size for pattern in ("*.json", "*.tmp") for p in self.cache_dir.glob(pattern))
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number of entries removed."""
+        if not self.cache_dir.exists():
+            return 0
+        return evict_lru(self.cache_dir, 0, "*.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect or clear the transcription cache"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=f"Cache directory (default: {DEFAULT_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Show cache size and entry count"
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Remove every cached entry"
+    )
+
+    args = parser.parse_args()
+    cache = TranscriptionCache(args.cache_dir)
+
+    if args.clear:
+        removed = cache.clear()
+        print(f"Removed {removed} cache entries from {cache.cache_dir}")
+    elif args.stats:
+        entries = len(list(cache.cache_dir.glob("*.json"))) if cache.cache_dir.exists() else 0
+        print(f"Cache directory: {cache.cache_dir}")
+        print(f"  Entries: {entries}")
+        print(f"  Size: {cache.size() / (1024 * 1024):.2f} MB")
+    else:
+        parser.print_help()
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -4,79 +4,139 @@ Update HTML files with timestamps from JSON files.
 
 This script reads timestamp JSON files and updates the corresponding HTML files
 with the correct data-start and data-end attributes on each word span.
+JSON words are matched to HTML spans with word_alignment, so a word that
+Whisper inserted or dropped does not shift the rest of the page.
 
 Usage:
     python update_html_timestamps.py <timestamp_json> <html_file>
     python update_html_timestamps.py --all  # Update all HTML files from timestamps
+
+Timestamp files may be JSON or the binary .tsb format (see timestamp_format.py).
 """
 
 import argparse
-import json
 import re
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+from word_alignment import align_timestamps, similarity_ratio, MIN_SIMILAR_RATIO
+from timestamp_format import load_timestamp_data, iter_timestamp_files
+from atomic_write import write_text_if_changed, modified_count
+
+# Pattern: <span data-start="X.XX" data-end="Y.YY">WORD</span>
+SPAN_PATTERN = re.compile(
+    r'<span\s+data-start="[\d.]+"(?:\s+data-end="[\d.]+")?>([^<]+)</span>',
+    re.IGNORECASE
+)
+
+
+# (start, end, word) of one word span in a document
+Span = Tuple[int, int, str]
 
 
-def update_html_with_timestamps(html_path: str, words: List[Dict]) -> bool:
+def scan_spans(content: str) -> List[Span]:
+    """Find every word span with data-start/data-end attributes."""
+    return [(match.start(), match.end(), match.group(1)) for match in SPAN_PATTERN.finditer(content)]
+
+
+def rewrite_spans(content: str, spans: List[Span], words: List[Dict]) -> Optional[Tuple[str, List[Span]]]:
     """
-    Update HTML file with new timestamp data.
+    Rewrite known word spans of an HTML string with new timestamps.
 
-    Matches words from JSON to spans in HTML and updates data-start/data-end.
+    Aligns words from JSON to the spans and updates data-start/data-end.
+    Spans without a matching JSON word get interpolated timestamps. Only
+    the spans whose timestamps change are patched, at their known offsets;
+    a page whose timestamps are already current is returned as is, without
+    copying the document.
 
     Args:
-        html_path: Path to HTML file
+        content: HTML document
+        spans: Word spans of the document, as returned by scan_spans()
         words: List of word dictionaries with 'word', 'start', 'end' keys
 
     Returns:
-        True if successful, False otherwise
+        The updated HTML and the positions of its spans, or None if the
+        transcription does not match the page
     """
-    with open(html_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    if len(spans) != len(words):
+        print(f"  Warning: Word count mismatch - HTML has {len(spans)} spans, JSON has {len(words)} words")
+
+    aligned = align_timestamps([word for _, _, word in spans], words)
+    ratio = similarity_ratio(aligned)
+    if ratio < MIN_SIMILAR_RATIO:
+        print(f"  Skipping: only {ratio:.0%} of the spans match the transcription")
+        return None
+
+    interpolated = sum(1 for word in aligned if not word['matched'])
+    if interpolated:
+        print(f"  Interpolated timestamps for {interpolated} unmatched spans")
+
+    parts = []
+    new_spans = []
+    position = 0
+    shift = 0
+    for (start, end, word), word_data in zip(spans, aligned):
+        span = f'<span data-start="{word_data["start"]}" data-end="{word_data["end"]}">{word}</span>'
+        if content.startswith(span, start) and end - start == len(span):
+            new_spans.append((start + shift, end + shift, word))
+            continue
+        parts.append(content[position:start])
+        parts.append(span)
+        new_spans.append((start + shift, start + shift + len(span), word))
+        shift += len(span) - (end - start)
+        position = end
 
-    # Find all spans with data-start attributes
-    # Pattern: <span data-start="X.XX" data-end="Y.YY">WORD</span>
-    span_pattern = re.compile(
-        r'<span\s+data-start="[\d.]+"(?:\s+data-end="[\d.]+")?>([^<]+)</span>',
-        re.IGNORECASE
-    )
+    if not parts:
+        return content, new_spans
+    parts.append(content[position:])
+    return ''.join(parts), new_spans
 
-    matches = list(span_pattern.finditer(content))
 
-    if len(matches) != len(words):
-        print(f"  Warning: Word count mismatch - HTML has {len(matches)} spans, JSON has {len(words)} words")
-        # Try to proceed anyway if counts are close
-        if abs(len(matches) - len(words)) > 5:
-            print(f"  Skipping due to large mismatch")
-            return False
+def update_html_content(content: str, words: List[Dict], spans: Optional[List[Span]] = None) -> Optional[str]:
+    """
+    Rewrite the word spans of an HTML string with new timestamps.
 
-    # Build replacement map
-    new_content = content
-    offset = 0  # Track offset as we modify the string
+    See rewrite_spans(); the spans are found with the span regex unless
+    already known (e.g. from span_index.SpanIndex).
 
-    for i, match in enumerate(matches):
-        if i >= len(words):
-            break
+    Returns:
+        The updated HTML, or None if the transcription does not match the page
+    """
+    result = rewrite_spans(content, spans if spans is not None else scan_spans(content), words)
+    return result[0] if result is not None else None
 
-        word_data = words[i]
-        original_span = match.group(0)
-        word_text = match.group(1)
 
-        # Create new span with updated timestamps
-        new_span = f'<span data-start="{word_data["start"]}" data-end="{word_data["end"]}">{word_text}</span>'
+def update_html_with_timestamps(html_path: str, words: List[Dict], span_index=None) -> bool:
+    """
+    Update HTML file with new timestamp data.
+
+    See rewrite_spans() for how words are matched to spans. The span
+    positions come from the sidecar index (see span_index.py), so an HTML
+    file that only ever had its timestamps rewritten is never re-scanned.
+
+    Args:
+        html_path: Path to HTML file
+        words: List of word dictionaries with 'word', 'start', 'end' keys
+        span_index: Span index to use (default: the one in _cache/span_index)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    from span_index import SpanIndex
 
-        # Calculate positions with offset
-        start_pos = match.start() + offset
-        end_pos = match.end() + offset
+    span_index = span_index or SpanIndex()
 
-        # Replace in content
-        new_content = new_content[:start_pos] + new_span + new_content[end_pos:]
+    with open(html_path, 'r', encoding='utf-8') as f:
+        content = f.read()
 
-        # Update offset for next replacement
-        offset += len(new_span) - len(original_span)
+    result = rewrite_spans(content, span_index.spans(html_path, content), words)
+    if result is None:
+        return False
 
-    # Write updated content
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(new_content)
+    # Write updated content (only if it changed)
+    new_content, new_spans = result
+    write_text_if_changed(html_path, new_content)
+    span_index.store(html_path, new_content, new_spans)
 
     return True
 
@@ -111,10 +171,7 @@ def process_single(timestamp_path: str, html_path: str = None) -> bool:
     """Process a single timestamp/HTML pair."""
     timestamp_path = Path(timestamp_path)
 
-    with open(timestamp_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    words = data.get('words', [])
+    words = load_timestamp_data(timestamp_path).get('words', [])
 
     if html_path:
         html_path = Path(html_path)
@@ -134,6 +191,7 @@ def process_single(timestamp_path: str, html_path: str = None) -> bool:
 def process_all(project_root: Path) -> None:
     """Process all timestamp files and update corresponding HTML files."""
     timestamps_dir = project_root / "_timestamps"
+    modified_before = modified_count()
 
     for year_dir in ['1_ano', '2_ano']:
         year_path = timestamps_dir / year_dir
@@ -141,7 +199,7 @@ def process_all(project_root: Path) -> None:
             continue
 
         print(f"\nProcessing {year_dir}:")
-        for json_file in sorted(year_path.glob('*.json')):
+        for json_file in iter_timestamp_files(year_path):
             print(f"  {json_file.name}...", end=' ')
             try:
                 success = process_single(str(json_file))
@@ -149,6 +207,8 @@ def process_all(project_root: Path) -> None:
             except Exception as e:
                 print(f"ERROR: {e}")
 
+    print(f"\nFiles modified: {modified_count() - modified_before}")
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -157,7 +217,7 @@ def main():
     parser.add_argument(
         "timestamp_file",
         nargs='?',
-        help="Path to timestamp JSON file"
+        help="Path to timestamp file (JSON or .tsb)"
     )
     parser.add_argument(
         "html_file",
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Cheap energy-based voice activity detection for narration audio.
+
+Frames of 16 kHz mono PCM are scored by RMS energy in dB. Frames well
+above the recording's noise floor count as speech. Short pauses are
+bridged, short blips are dropped and the regions are padded a little so
+word edges are not clipped. Energy is computed block by block, so memory
+use stays flat even for memory-mapped audiobook-length files.
+
+Usage:
+    python vad.py <audio_file> [--margin-db 12] [--min-silence 0.6]
+"""
+
+import argparse
+import sys
+from typing import Iterator, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy not installed.")
+    print("Install with: pip install numpy")
+    sys.exit(1)
+
+SAMPLE_RATE = 16000
+
+# Analysis frame length (seconds)
+FRAME_SECONDS = 0.03
+
+# Speech is anything this many dB above the noise floor
+DEFAULT_MARGIN_DB = 12.0
+
+# Pauses shorter than this (seconds) do not split a speech region
+DEFAULT_MIN_SILENCE = 0.6
+
+# Regions shorter than this (seconds) are treated as noise
+DEFAULT_MIN_SPEECH = 0.15
+
+# Padding (seconds) added on both sides of each region
+DEFAULT_PADDING = 0.2
+
+# Chunks handed to the model are built from regions up to this length (seconds)
+DEFAULT_MAX_CHUNK = 30.0
+
+# Frames analysed per block
+_BLOCK_FRAMES = 4096
+
+
+def frame_energy_db(samples: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                    frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """RMS energy in dB of consecutive non-overlapping frames."""
+    frame = max(1, int(sample_rate * frame_seconds))
+    n_frames = len(samples) // frame
+    energy = np.empty(n_frames, dtype=np.float32)
+
+    for start in range(0, n_frames, _BLOCK_FRAMES):
+        stop = min(n_frames, start + _BLOCK_FRAMES)
+        block = np.asarray(samples[start * frame:stop * frame], dtype=np.float32).reshape(-1, frame)
+        energy[start:stop] = np.mean(block * block, axis=1)
+
+    return 10.0 * np.log10(energy + 1e-10)
+
+
+def detect_speech(samples: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                  margin_db: float = DEFAULT_MARGIN_DB,
+                  min_silence: float = DEFAULT_MIN_SILENCE,
+                  min_speech: float = DEFAULT_MIN_SPEECH,
+                  padding: float = DEFAULT_PADDING) -> List[Tuple[float, float]]:
+    """
+    Find speech regions in an audio signal.
+
+    Args:
+        samples: Mono PCM samples
+        sample_rate: Sample rate of the samples
+        margin_db: dB above the noise floor (10th percentile frame) that counts as speech
+        min_silence: Shorter pauses are bridged
+        min_speech: Shorter regions are dropped
+        padding: Seconds added before and after each region
+
+    Returns:
+        List of (start, end) times in seconds, sorted and non-overlapping
+    """
+    energy = frame_energy_db(samples, sample_rate)
+    if len(energy) == 0:
+        return []
+
+    threshold = np.percentile(energy, 10) + margin_db
+    voiced = energy > threshold
+
+    # Run boundaries: +1 where speech starts, -1 where it stops
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * FRAME_SECONDS
+    ends = np.flatnonzero(edges == -1) * FRAME_SECONDS
+
+    regions: List[Tuple[float, float]] = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < min_silence:
+            regions[-1] = (regions[-1][0], float(end))
+        else:
+            regions.append((float(start), float(end)))
+
+    duration = len(samples) / sample_rate
+    padded: List[Tuple[float, float]] = []
+    for start, end in regions:
+        if end - start < min_speech:
+            continue
+        start, end = max(0.0, start - padding), min(duration, end + padding)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+
+    return padded
+
+
+def speech_chunks(regions: List[Tuple[float, float]],
+                  max_chunk: float = DEFAULT_MAX_CHUNK) -> Iterator[Tuple[float, float]]:
+    """
+    Group consecutive speech regions into chunks of at most max_chunk seconds.
+
+    The silence between grouped regions stays in the chunk (Whisper handles
+    short pauses fine); long pauses between chunks are skipped. A single
+    region longer than max_chunk becomes a chunk of its own.
+    """
+    chunk = None
+    for start, end in regions:
+        if chunk is not None and end - chunk[0] <= max_chunk:
+            chunk = (chunk[0], end)
+            continue
+        if chunk is not None:
+            yield chunk
+        chunk = (start, end)
+    if chunk is not None:
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Show the speech regions detected in an audio file"
+    )
+    parser.add_argument("audio_file", help="Path to the audio file")
+    parser.add_argument(
+        "--margin-db",
+        type=float,
+        default=DEFAULT_MARGIN_DB,
+        help="dB above the noise floor that counts as speech (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--min-silence",
+        type=float,
+        default=DEFAULT_MIN_SILENCE,
+        help="Shortest pause in seconds that splits speech (default: %(default)s)"
+    )
+
+    args = parser.parse_args()
+
+    from audio_cache import PcmCache
+
+    samples = PcmCache().load(args.audio_file)
+    regions = detect_speech(samples, margin_db=args.margin_db, min_silence=args.min_silence)
+    duration = len(samples) / SAMPLE_RATE
+    speech = sum(end - start for start, end in regions)
+
+    for start, end in regions:
+        print(f"  {start:7.2f}s - {end:7.2f}s")
+    print(f"\nSpeech: {speech:.2f}s of {duration:.2f}s ({speech / duration:.0%})" if duration else "\nEmpty audio")
+    print(f"Chunks: {len(list(speech_chunks(regions)))}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+File watching for regenerate_all.py --watch.
+
+Watches _timestamps/, _assets/audios/ and the page folders of each year,
+groups bursts of events (an editor saving, a script rewriting several
+files) into one batch and maps every changed file to the OED it belongs
+to. On Linux the kernel's inotify is used directly; elsewhere, or if
+inotify is unavailable, the folders are polled for modification times.
+Page folders created while watching (e.g. by batch_create_lg.py) are
+picked up and watched too.
+
+Usage (from regenerate_all.py):
+    python regenerate_all.py --watch
+    python regenerate_all.py --watch --poll   # Force the polling fallback
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from timestamp_format import TIMESTAMP_SUFFIXES, iter_timestamp_files
+from update_html_timestamps import find_html_for_timestamp
+
+YEARS = ['1_ano', '2_ano']
+
+# Quiet time (seconds) that ends a burst of events
+DEFAULT_DEBOUNCE = 0.3
+
+# Polling fallback: seconds between scans
+DEFAULT_POLL_INTERVAL = 1.0
+
+AUDIO_SUFFIXES = ('.mp3',)
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_ISDIR = 0x40000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_relevant(path: Path) -> bool:
+    """Files that feed an OED build."""
+    return path.suffix in TIMESTAMP_SUFFIXES or path.suffix in AUDIO_SUFFIXES \
+        or path.name == "index.html"
+
+
+def is_page_folder(path: Path) -> bool:
+    """A folder in a year folder, e.g. 1_ano/lgp40."""
+    return path.parent.name in YEARS and path.parent.parent.name != "_timestamps" \
+        and path.parent.parent.name != "audios"
+
+
+def watched_directories(project_root: Path) -> List[Path]:
+    """Folders holding timestamps, source audio and page HTML, and the year folders holding the pages."""
+    directories = []
+    for year in YEARS:
+        directories.append(project_root / "_timestamps" / year)
+        directories.append(project_root / "_assets" / "audios" / year)
+        year_dir = project_root / year
+        if year_dir.exists():
+            directories.append(year_dir)
+            directories.extend(sorted(p for p in year_dir.iterdir() if p.is_dir()))
+    return [d for d in directories if d.exists()]
+
+
+class InotifyWatcher:
+    """Change events from inotify(7), via libc."""
+
+    def __init__(self, directories: List[Path]):
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._directories: Dict[int, Path] = {}
+        # Folders created since the last call to take_new_directories()
+        self.new_directories: List[Path] = []
+        for directory in directories:
+            self._add_watch(directory)
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)),
+                                          IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+        if wd >= 0:
+            self._directories[wd] = directory
+
+    def take_new_directories(self) -> List[Path]:
+        new, self.new_directories = self.new_directories, []
+        return new
+
+    def read(self, timeout: float) -> List[Path]:
+        """
+        Files changed within the next `timeout` seconds (empty if none).
+
+        A new folder is watched from then on; the files it already holds
+        (written before the watch existed) are reported as changed.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+
+        buffer = os.read(self._fd, 64 * 1024)
+        changed = []
+        position = 0
+        while position + _EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, position)
+            position += _EVENT_HEADER.size
+            name = buffer[position:position + length].rstrip(b"\0")
+            position += length
+            if wd not in self._directories or not name:
+                continue
+            path = self._directories[wd] / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if not is_page_folder(path):
+                    continue
+                self._add_watch(path)
+                self.new_directories.append(path)
+                changed.extend(p for p in path.iterdir() if p.is_file())
+            else:
+                changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Change events from comparing modification times between scans."""
+
+    def __init__(self, directories: List[Path]):
+        self._directories = list(directories)
+        self.new_directories: List[Path] = []
+        self._snapshot = self._scan()
+        self.new_directories = []
+
+    def take_new_directories(self) -> List[Path]:
+        new, self.new_directories = self.new_directories, []
+        return new
+
+    def _scan(self) -> Dict[Path, int]:
+        snapshot = {}
+        # The list grows while scanning when a year folder holds a new page folder
+        for directory in self._directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_file():
+                    snapshot[Path(entry.path)] = entry.stat().st_mtime_ns
+                elif entry.is_dir() and is_page_folder(Path(entry.path)) \
+                        and Path(entry.path) not in self._directories:
+                    self._directories.append(Path(entry.path))
+                    self.new_directories.append(Path(entry.path))
+        return snapshot
+
+    def read(self, timeout: float) -> List[Path]:
+        """Files changed since the previous scan, scanning again after `timeout` seconds."""
+        time.sleep(timeout)
+        snapshot = self._scan()
+        changed = [path for path, mtime in snapshot.items() if self._snapshot.get(path) != mtime]
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(directories: List[Path], poll: bool = False):
+    """inotify where available, polling otherwise."""
+    if not poll:
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            print("inotify unavailable, polling for changes")
+    return PollingWatcher(directories)
+
+
+def debounced_changes(watcher, debounce: float = DEFAULT_DEBOUNCE,
+                      poll_interval: float = DEFAULT_POLL_INTERVAL) -> Iterator[Set[Path]]:
+    """Yield sets of changed relevant files, one per burst of events."""
+    while True:
+        batch = {path for path in watcher.read(poll_interval) if is_relevant(path)}
+        if not batch:
+            continue
+        # Keep collecting until the files have been quiet for `debounce` seconds
+        while True:
+            more = watcher.read(debounce)
+            if not more:
+                break
+            batch.update(path for path in more if is_relevant(path))
+        yield batch
+
+
+class OedIndex:
+    """Maps changed files back to the timestamp file of their OED."""
+
+    def __init__(self, project_root: Path):
+        self.project_root = project_root
+        self.refresh()
+
+    def refresh(self) -> None:
+        self._by_stem: Dict[tuple, Path] = {}
+        self._by_html: Dict[Path, Path] = {}
+        for year in YEARS:
+            year_path = self.project_root / "_timestamps" / year
+            if not year_path.exists():
+                continue
+            for timestamp_path in iter_timestamp_files(year_path):
+                self._by_stem[(year, timestamp_path.stem)] = timestamp_path
+                html_path = find_html_for_timestamp(timestamp_path, self.project_root)
+                self._by_html[html_path.resolve()] = timestamp_path
+
+    def timestamp_for(self, path: Path) -> Optional[Path]:
+        """The timestamp file to rebuild for a changed file, or None if it belongs to no OED."""
+        if path.suffix in TIMESTAMP_SUFFIXES:
+            # Build from the file that was edited, whichever format it is
+            return path
+        if path.suffix in AUDIO_SUFFIXES:
+            return self._by_stem.get((path.parent.name, path.stem))
+        if path.name == "index.html":
+            return self._by_html.get(path.resolve())
+        return None
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Align Whisper words to roteiro/HTML words with a banded edit distance.
+
+Pairing words by position breaks as soon as Whisper inserts or drops a
+single word: every later span shifts. This module aligns the two word
+sequences on normalized, accent-folded tokens, so local differences stay
+local. The dynamic programming only explores a band around the (scaled)
+diagonal, which keeps it near-linear for realistic pages. Roteiro words
+without a Whisper counterpart get timestamps interpolated between their
+aligned neighbours.
+
+Usage:
+    python word_alignment.py <timestamp_json> <html_file>  # Report how the words align
+"""
+
+import argparse
+import json
+import re
+import unicodedata
+from typing import List, Dict, Optional, Tuple
+
+# Extra cells explored on each side of the diagonal
+DEFAULT_BAND = 25
+
+# Edit costs
+GAP_COST = 1.0
+SUBSTITUTION_COST = 1.0
+PARTIAL_MATCH_COST = 0.5
+
+# Shortest token that counts as part of a longer word ('CHUVA' in 'GUARDACHUVA', not 'A' in 'FILHA')
+MIN_PARTIAL_LENGTH = 3
+
+# Duration given to each trailing roteiro word that has nothing to align to
+TRAILING_WORD_DURATION = 0.5
+
+# Below this share of similar words, the transcription does not describe the page
+MIN_SIMILAR_RATIO = 0.5
+
+_NON_ALNUM = re.compile(r'[^0-9A-Z]')
+
+
+def normalize_word(word: str) -> str:
+    """Upper-case, fold accents and drop punctuation: 'Mãe,' -> 'MAE'."""
+    decomposed = unicodedata.normalize('NFKD', word.upper())
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub('', folded)
+
+
+def _is_part_of(part: str, word: str) -> bool:
+    return len(part) >= MIN_PARTIAL_LENGTH and part in word
+
+
+def _substitution_cost(a: str, b: str) -> float:
+    if not a or not b:
+        # Punctuation-only tokens ('-') never take another word's timestamp
+        return float('inf')
+    if a == b:
+        return 0.0
+    if _is_part_of(a, b) or _is_part_of(b, a):
+        return PARTIAL_MATCH_COST
+    return SUBSTITUTION_COST
+
+
+def _gap_cost(a: str) -> float:
+    return GAP_COST if a else 0.0
+
+
+def align_sequences(source: List[str], target: List[str],
+                    band: Optional[int] = None) -> List[Tuple[Optional[int], Optional[int]]]:
+    """
+    Banded edit-distance alignment of two normalized token sequences.
+
+    Only cells within `band` of the diagonal (scaled to the two lengths) are
+    computed, so the cost is O(len(source) * band).
+
+    Args:
+        source: Normalized tokens (e.g. Whisper words)
+        target: Normalized tokens (e.g. roteiro words)
+        band: Half-width of the band (default: DEFAULT_BAND + length difference)
+
+    Returns:
+        List of (source_index, target_index) pairs in order; None marks a gap
+    """
+    n, m = len(source), len(target)
+    if band is None:
+        band = DEFAULT_BAND + abs(n - m)
+
+    inf = float('inf')
+
+    def row_range(i: int) -> Tuple[int, int]:
+        center = (i * m) // n if n else 0
+        return max(0, center - band), min(m, center + band)
+
+    # cost[i] / move[i] hold row i for columns lo..hi
+    ranges = [row_range(i) for i in range(n + 1)]
+    cost: List[List[float]] = []
+    move: List[bytearray] = []  # 0 = diagonal, 1 = up (skip source), 2 = left (skip target)
+
+    for i in range(n + 1):
+        lo, hi = ranges[i]
+        row = [inf] * (hi - lo + 1)
+        moves = bytearray(hi - lo + 1)
+
+        if i > 0:
+            prev_lo, prev_hi = ranges[i - 1]
+            prev_row = cost[i - 1]
+            token = source[i - 1]
+
+        for j in range(lo, hi + 1):
+            k = j - lo
+            if i == 0:
+                # First row: skip target[0..j-1]
+                row[k] = row[k - 1] + _gap_cost(target[j - 1]) if j > 0 else 0.0
+                moves[k] = 2
+                continue
+
+            best = inf
+            best_move = 0
+            # Diagonal: pair source[i-1] with target[j-1]
+            if j > 0 and prev_lo <= j - 1 <= prev_hi:
+                value = prev_row[j - 1 - prev_lo] + _substitution_cost(token, target[j - 1])
+                if value < best:
+                    best, best_move = value, 0
+            # Up: source[i-1] has no counterpart
+            if prev_lo <= j <= prev_hi:
+                value = prev_row[j - prev_lo] + _gap_cost(token)
+                if value < best:
+                    best, best_move = value, 1
+            # Left: target[j-1] has no counterpart
+            if j > lo:
+                value = row[k - 1] + _gap_cost(target[j - 1])
+                if value < best:
+                    best, best_move = value, 2
+
+            row[k] = best
+            moves[k] = best_move
+
+        cost.append(row)
+        move.append(moves)
+
+    # Backtrack from (n, m)
+    pairs = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        lo, _ = ranges[i]
+        step = move[i][j - lo] if i > 0 else 2
+        if step == 0:
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif step == 1:
+            pairs.append((i - 1, None))
+            i -= 1
+        else:
+            pairs.append((None, j - 1))
+            j -= 1
+
+    pairs.reverse()
+    return pairs
+
+
+def align_timestamps(target_words: List[str], words: List[Dict],
+                     band: Optional[int] = None) -> List[Dict]:
+    """
+    Give every target (roteiro/HTML) word a timestamp from the Whisper words.
+
+    Args:
+        target_words: Words as they appear in the roteiro or HTML spans
+        words: Whisper word dicts with 'word', 'start', 'end' keys
+        band: Half-width of the alignment band (see align_sequences)
+
+    Returns:
+        One dict per target word with 'word', 'start', 'end', 'matched'
+        (False when the timestamp was interpolated) and 'similar' (True when
+        the paired Whisper word is the same or part of the same word)
+    """
+    source = [normalize_word(w['word']) for w in words]
+    target = [normalize_word(w) for w in target_words]
+    pairs = align_sequences(source, target, band)
+
+    timing: List[Optional[Tuple[float, float]]] = [None] * len(target_words)
+    similar = [False] * len(target_words)
+    last_target = None
+    leading: List[int] = []  # Whisper words without a partner, right before the next pair
+    for source_index, target_index in pairs:
+        if source_index is not None and target_index is not None:
+            start = words[source_index]['start']
+            # A Whisper word split in two ('GUARDA' 'CHUVA' for 'GUARDA-CHUVA'):
+            # the target word absorbs the parts left without a partner, before...
+            while leading and _is_part_of(source[leading[-1]], target[target_index]):
+                start = words[leading.pop()]['start']
+            timing[target_index] = (start, words[source_index]['end'])
+            similar[target_index] = _substitution_cost(source[source_index], target[target_index]) < SUBSTITUTION_COST
+            last_target = target_index
+            leading = []
+        elif source_index is not None and last_target is not None \
+                and _is_part_of(source[source_index], target[last_target]):
+            # ...and after the part it was paired with
+            start, _ = timing[last_target]
+            timing[last_target] = (start, words[source_index]['end'])
+        else:
+            leading = leading + [source_index] if source_index is not None else []
+            last_target = None
+
+    result = []
+    i = 0
+    while i < len(target_words):
+        if timing[i] is not None:
+            start, end = timing[i]
+            result.append({
+                'word': target_words[i], 'start': start, 'end': end,
+                'matched': True, 'similar': similar[i]
+            })
+            i += 1
+            continue
+
+        # Interpolate a run of unmatched words between the aligned neighbours
+        run_end = i
+        while run_end < len(target_words) and timing[run_end] is None:
+            run_end += 1
+        prev_end = timing[i - 1][1] if i > 0 else None
+        next_start = timing[run_end][0] if run_end < len(target_words) else None
+        # Punctuation-only words ('-') get a zero-length stamp at the next word
+        remaining = sum(1 for k in range(i, run_end) if target[k])
+
+        if prev_end is None and next_start is None:
+            low, high = 0.0, 0.0
+        elif prev_end is None:
+            low = high = next_start
+        elif next_start is None:
+            low, high = prev_end, prev_end + TRAILING_WORD_DURATION * remaining
+        else:
+            low, high = prev_end, max(prev_end, next_start)
+
+        step = (high - low) / remaining if remaining else 0.0
+        position = low
+        for k in range(i, run_end):
+            if target[k]:
+                start, end = position, position + step
+                position = end
+                remaining -= 1
+            else:
+                start = end = position if remaining else high
+            result.append({
+                'word': target_words[k],
+                'start': round(start, 3),
+                'end': round(end, 3),
+                'matched': False,
+                'similar': False
+            })
+        i = run_end
+
+    return result
+
+
+def similarity_ratio(aligned: List[Dict]) -> float:
+    """Share of spoken target words paired with a similar Whisper word."""
+    spoken = [a for a in aligned if normalize_word(a['word'])]
+    if not spoken:
+        return 1.0
+    return sum(1 for a in spoken if a['similar']) / len(spoken)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report how Whisper words align to the word spans of an HTML file"
+    )
+    parser.add_argument("timestamp_file", help="Path to timestamp JSON file")
+    parser.add_argument("html_file", help="Path to HTML file")
+    args = parser.parse_args()
+
+    from update_html_timestamps import SPAN_PATTERN
+
+    with open(args.timestamp_file, 'r', encoding='utf-8') as f:
+        words = json.load(f).get('words', [])
+    with open(args.html_file, 'r', encoding='utf-8') as f:
+        target_words = [m.group(1) for m in SPAN_PATTERN.finditer(f.read())]
+
+    aligned = align_timestamps(target_words, words)
+    unmatched = [a['word'] for a in aligned if not a['matched']]
+
+    print(f"HTML spans: {len(target_words)}")
+    print(f"JSON words: {len(words)}")
+    print(f"Aligned: {len(aligned) - len(unmatched)}")
+    print(f"Interpolated: {len(unmatched)}")
+    print(f"Similar words: {similarity_ratio(aligned):.0%}")
+    if unmatched:
+        print(f"  {' '.join(unmatched)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())